@@ -0,0 +1,70 @@
+"""Benchmark: transaction timestamps via ``datetime.strptime`` vs. :mod:`app.utils.dates`.
+
+Usage::
+
+    python benchmarks/bench_dates.py --rows 50000
+
+Takes the (date, time) pairs of a synthetic statement (many rows per day) and
+converts each to an ISO string both ways — the previous strptime + isoformat per
+field, and the slicing + per-day memoised helpers — checking that they agree.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from app.parsers import tbank_cashflow as tb
+from app.utils.dates import _parse_day, ddmmyyyy_hhmm_to_iso, ddmmyyyy_hhmm_to_minutes
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from synthetic import synthetic_pages  # noqa: E402
+
+
+def _strptime_iso(d: str, t: str) -> str:
+    return datetime.strptime(f"{d} {t}", "%d.%m.%Y %H:%M").isoformat(timespec="minutes")
+
+
+def _best(fn: Any, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--rows", type=int, default=50_000)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    pairs: list[tuple[str, str]] = []
+    for row in tb._iter_rows(synthetic_pages(args.rows)):
+        pairs += [(row[0], row[1]), (row[2], row[3])]
+    assert [_strptime_iso(d, t) for d, t in pairs] == [
+        ddmmyyyy_hhmm_to_iso(d, t) for d, t in pairs
+    ], "implementations disagree"
+
+    def cold_iso() -> None:
+        _parse_day.cache_clear()
+        for d, t in pairs:
+            ddmmyyyy_hhmm_to_iso(d, t)
+
+    t_old = _best(lambda: [_strptime_iso(d, t) for d, t in pairs], args.repeat)
+    t_iso = _best(cold_iso, args.repeat)
+    t_min = _best(lambda: [ddmmyyyy_hhmm_to_minutes(d, t) for d, t in pairs], args.repeat)
+    days = len({d for d, _ in pairs})
+    print(f"{len(pairs)} timestamps, {days} distinct days")
+    print(f"{'strptime + isoformat':<24}{t_old * 1000:8.1f} ms")
+    print(f"{'dates: ISO (cold cache)':<24}{t_iso * 1000:8.1f} ms  ({t_old / t_iso:.2f}x)")
+    print(f"{'dates: epoch minutes':<24}{t_min * 1000:8.1f} ms  ({t_old / t_min:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Benchmark: TBank header fields read from their regions vs. searched in the whole text.
+
+Usage::
+
+    python benchmarks/bench_header_fields.py --rows 8000
+
+Builds a synthetic statement with a full header on its first page, checks that the
+previous approach (join every page, ten ``search`` calls), a single fused
+alternation pass and ``tbank_cashflow._FIELDS`` find the same values, and prints
+their best-of-N timings.
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import sys
+import time
+from collections.abc import Callable, Sequence
+from pathlib import Path
+
+from app.parsers import tbank_cashflow as tb
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from synthetic import synthetic_pages  # noqa: E402
+
+_HEADER = [
+    "Иванов Иван Иванович",
+    "Адрес места жительства: г. Москва, ул. Тверская, д. 1",
+    "Дата заключения договора: 12.03.2019",
+    "Номер договора: 5123456789",
+    "Номер лицевого счета: 40817810000001234567",
+    "22.01.2026",
+    "Движение средств за период с 01.01.2026 по 22.01.2026",
+    "Сумма доступного остатка на 22.01.2026: 12 345,67 ₽",
+]
+
+Found = dict[str, tuple[str, ...] | None]
+
+
+def legacy_fields(text_pages: Sequence[str]) -> Found:
+    # The parser's header block before FieldSet: one join, ten whole-text searches.
+    all_text = "\n".join(text_pages)
+    return {
+        f.name: (m.groups() if (m := f.pattern.search(all_text)) else None)
+        for f in tb._FIELDS.fields
+    }
+
+
+def _fused() -> Callable[[Sequence[str]], Found]:
+    # Every pattern as a lookahead branch of one alternation, so the text is scanned
+    # once; a match is attributed to its field by the branch's outer group.
+    fields = tb._FIELDS.fields
+    parts, spans = [], []
+    group = 1
+    for f in fields:
+        flags = "i" if f.pattern.flags & re.I else ""
+        parts.append(f"(?=((?{flags}:{f.pattern.pattern})))")
+        spans.append((group, range(group + 1, group + 1 + f.pattern.groups)))
+        group += 1 + f.pattern.groups
+    fused = re.compile("|".join(parts))
+
+    def run(text_pages: Sequence[str]) -> Found:
+        all_text = "\n".join(text_pages)
+        out: Found = {f.name: None for f in fields}
+        left = len(fields)
+        for m in fused.finditer(all_text):
+            for f, (outer, inner) in zip(fields, spans, strict=True):
+                if out[f.name] is None and m.group(outer) is not None:
+                    out[f.name] = tuple(m.group(g) for g in inner)
+                    left -= 1
+            if not left:
+                break
+        return out
+
+    return run
+
+
+def regional_fields(text_pages: Sequence[str]) -> Found:
+    return {name: (m.groups() if m else None) for name, m in tb._FIELDS.extract(text_pages).items()}
+
+
+def _best(fn: Callable[[Sequence[str]], Found], pages: Sequence[str], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(pages)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--rows", type=int, default=8000)
+    ap.add_argument("--rows-per-page", type=int, default=40)
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args()
+
+    pages = synthetic_pages(args.rows, args.rows_per_page, seed=1)
+    first = pages[0].split("\n")
+    pages[0] = "\n".join(first[:2] + _HEADER + first[2:])
+    size = sum(len(p) for p in pages)
+    print(f"{len(pages)} pages, {size / 1024:.0f} KiB of text")
+
+    expected = legacy_fields(pages)
+    assert all(v is not None for v in expected.values()), expected
+    candidates = [
+        ("whole text, 10 searches", legacy_fields),
+        ("whole text, fused", _fused()),
+        ("FieldSet (head/tail)", regional_fields),
+    ]
+    baseline = None
+    for label, fn in candidates:
+        assert fn(pages) == expected, f"{label}: fields differ"
+        elapsed = _best(fn, pages, args.repeat)
+        baseline = baseline or elapsed
+        print(f"{label:<26}{elapsed * 1000:9.2f} ms  ({baseline / elapsed:7.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Benchmark: parsing a re-issued statement with and without the page cache.
+
+Usage::
+
+    python benchmarks/bench_page_cache.py --pages 40 --extra-pages 2
+
+Parses a synthetic statement into an empty :class:`app.page_cache.PageCache`, then
+the same statement again and a re-issue of it extended by ``--extra-pages`` pages
+(same rows, so only the last pages differ). Each result is checked against an
+uncached parse; timings are one run each, counters come from the cache.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from io import BytesIO
+from pathlib import Path
+
+from app.page_cache import PageCache
+from app.pipeline import encode_result, parse_pdf
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from synthetic import synthetic_pdf  # noqa: E402
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--pages", type=int, default=40)
+    ap.add_argument("--extra-pages", type=int, default=2)
+    ap.add_argument("--rows-per-page", type=int, default=12)
+    args = ap.parse_args()
+
+    rows = args.pages * args.rows_per_page
+    original = synthetic_pdf(rows, args.rows_per_page, seed=1)
+    reissue = synthetic_pdf(
+        rows + args.extra_pages * args.rows_per_page, args.rows_per_page, seed=1
+    )
+
+    started = time.perf_counter()
+    encode_result(parse_pdf(BytesIO(original)))
+    uncached = time.perf_counter() - started
+    print(f"{'no page cache':<24}{uncached * 1000:9.1f} ms")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = PageCache(Path(tmp), max_bytes=256 * 1024 * 1024)
+        for label, blob in [("cold", original), ("same file", original), ("re-issue", reissue)]:
+            before = cache.snapshot()
+            started = time.perf_counter()
+            payload = encode_result(parse_pdf(BytesIO(blob), page_cache=cache))
+            elapsed = time.perf_counter() - started
+            assert payload == encode_result(parse_pdf(BytesIO(blob))), f"{label}: output differs"
+            after = cache.snapshot()
+            reused = after["text_reused"] - before["text_reused"]
+            extracted = after["text_extracted"] - before["text_extracted"]
+            print(
+                f"{label:<24}{elapsed * 1000:9.1f} ms  ({uncached / elapsed:5.1f}x)"
+                f"  pages reused {reused}, extracted {extracted}"
+            )
+        cache.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Benchmark: JSON backends on a large parsed TBank statement.
+
+Usage::
+
+    python benchmarks/bench_serialization.py --rows 50000
+
+Compares the previous output path (amounts pre-stringified per row, then
+``json.dumps``) with each available :mod:`app.serialization` backend, compact and
+pretty.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+from typing import Any
+
+from app.parsers.registry import parse_document
+from app.serialization import OrjsonSerializer, Serializer, StdlibSerializer
+from app.utils.money import decimal_to_str
+from app.utils.pdf import PdfMeta
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from synthetic import synthetic_pages  # noqa: E402
+
+
+def _legacy(doc: dict[str, Any]) -> bytes:
+    data = dict(doc["data"])
+    # Parsers used to return Decimal amounts; rebuild them to keep the old per-row cost.
+    data["transactions"] = [
+        {**tx, "amount_rub": decimal_to_str(Decimal(tx["amount_rub"]))}
+        for tx in data["transactions"]
+    ]
+    return json.dumps({**doc, "data": data}, ensure_ascii=False, default=str).encode("utf-8")
+
+
+def _best(fn: Any, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--rows", type=int, default=50_000)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    pages = synthetic_pages(args.rows)
+    meta = PdfMeta(
+        pages=len(pages), title=None, author=None, producer=None, creator=None, subject=None
+    )
+    doc = parse_document(pages, meta).to_dict()
+
+    backends: list[Serializer] = [StdlibSerializer()]
+    try:
+        backends.append(OrjsonSerializer())
+    except ImportError:
+        print("orjson not installed; `pip install .[fast]` to compare it")
+
+    t_legacy = _best(lambda: _legacy(doc), args.repeat)
+    print(f"{len(doc['data']['transactions'])} transactions")
+    print(f"{'legacy (stringify + json)':<28}{t_legacy * 1000:9.1f} ms")
+    for backend in backends:
+        for pretty in (False, True):
+            t = _best(lambda b=backend, p=pretty: b.dumps(doc, pretty=p), args.repeat)
+            label = f"{backend.name} ({'pretty' if pretty else 'compact'})"
+            print(f"{label:<28}{t * 1000:9.1f} ms  ({t_legacy / t:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Benchmark: TBank text-heuristic vs. column-geometry transaction extraction.
+
+Usage::
+
+    python benchmarks/bench_tbank_geometry.py --rows 400
+
+Renders a columnar TBank statement PDF (the test suite's layout), checks that both
+modes return identical transactions and prints best-of-N timings for each, from a
+freshly opened document (so pdfplumber's layout pass is included), plus the row
+assembly cost alone on already extracted text / words.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from io import BytesIO
+from pathlib import Path
+from typing import Any
+
+from app.parsers.tbank_cashflow import (
+    TBankCashflowParser,
+    iter_transactions,
+    iter_transactions_geometry,
+)
+from app.utils.pdf import open_session
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from synthetic import synthetic_columns_pdf  # noqa: E402
+
+
+def _parse(blob: bytes, mode: str) -> list[dict[str, Any]]:
+    with open_session(BytesIO(blob)) as session:
+        parsed = TBankCashflowParser(mode).parse(session.pages, session.meta, session)
+    return list(parsed["data"]["transactions"])
+
+
+def _best(fn: Any, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--rows", type=int, default=400)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    blob = synthetic_columns_pdf(args.rows)
+    text = _parse(blob, "text")
+    assert _parse(blob, "geometry") == text, "modes disagree"
+
+    t_text = _best(lambda: _parse(blob, "text"), args.repeat)
+    t_geom = _best(lambda: _parse(blob, "geometry"), args.repeat)
+    print(f"{len(text)} transactions, {len(blob) / 1024:.0f} KiB PDF")
+    print(f"text mode:     {t_text * 1000:8.1f} ms")
+    print(f"geometry mode: {t_geom * 1000:8.1f} ms  ({t_text / t_geom:.2f}x)")
+
+    # Row assembly alone, with every page's text and words already computed.
+    with open_session(BytesIO(blob)) as session:
+        text_pages = list(session.pages)
+        word_pages = [session.layout(i).words for i in range(len(session))]
+    t_text_rows = _best(lambda: list(iter_transactions(text_pages)), args.repeat)
+    t_geom_rows = _best(lambda: list(iter_transactions_geometry(word_pages)), args.repeat)
+    print(
+        f"row assembly only: text {t_text_rows * 1000:.1f} ms, geometry {t_geom_rows * 1000:.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
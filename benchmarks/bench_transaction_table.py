@@ -0,0 +1,100 @@
+"""Benchmark: columnar TransactionTable vs. a list of per-row dicts.
+
+Usage::
+
+    python benchmarks/bench_transaction_table.py --rows 50000
+
+Parses a synthetic statement both ways and prints memory per transaction (traced
+with :mod:`tracemalloc`, after the parse), parse throughput, and the cost of the
+money conversion alone (Decimal vs. integer kopecks).
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any
+
+from app.parsers import tbank_cashflow as tb
+from app.serialization import dumps
+from app.utils.money import decimal_to_str, parse_money_to_decimal, parse_money_to_kopecks
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from bench_transactions import legacy_extract_transactions  # noqa: E402
+from synthetic import synthetic_pages  # noqa: E402
+
+
+def _records(pages: list[str]) -> list[dict[str, Any]]:
+    return tb._extract_transactions(pages)
+
+
+def _table(pages: list[str]) -> tb.TransactionTable:
+    return tb._table(tb._iter_rows(pages))
+
+
+def _retained(fn: Any, pages: list[str]) -> tuple[Any, int]:
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = fn(pages)
+        return result, tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+
+def _best(fn: Any, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--rows", type=int, default=50_000)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    pages = synthetic_pages(args.rows)
+    statement = ["\n".join(pages)]
+    table = _table(pages)
+    assert dumps(table) == dumps(_records(pages)), "table and records disagree"
+    assert dumps(table) == dumps(legacy_extract_transactions(statement)), "legacy disagrees"
+    n = len(table)
+    del table
+
+    print(f"{n} transactions, {len(pages)} pages")
+    print("memory per transaction (retained after parse):")
+    for label, fn in (
+        ("legacy (Decimal, datetime)", legacy_extract_transactions),
+        ("records (str)", _records),
+        ("TransactionTable", _table),
+    ):
+        src = statement if fn is legacy_extract_transactions else pages
+        result, size = _retained(fn, src)
+        del result
+        print(f"  {label:<28}{size / n:8.1f} B")
+
+    print("parse throughput:")
+    for label, fn in (
+        ("records", lambda: _records(pages)),
+        ("TransactionTable", lambda: _table(pages)),
+    ):
+        t = _best(fn, args.repeat)
+        print(f"  {label:<28}{n / t:10.0f} tx/s  ({t * 1000:.1f} ms)")
+
+    amounts = [row[4] for row in tb._iter_rows(pages)]
+    t_dec = _best(lambda: [decimal_to_str(parse_money_to_decimal(a)) for a in amounts], args.repeat)
+    t_int = _best(lambda: [parse_money_to_kopecks(a) for a in amounts], args.repeat)
+    print("money parsing:")
+    print(f"  {'Decimal + str':<28}{n / t_dec:10.0f} /s")
+    print(f"  {'kopecks':<28}{n / t_int:10.0f} /s  ({t_dec / t_int:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+"""Benchmark suite: the main pipeline stages on synthetic TBank statements.
+
+Usage::
+
+    python benchmarks/run.py                          # all benchmarks, default sizes
+    python benchmarks/run.py --pages 100 --only parse_document api_parse
+    python benchmarks/run.py --compare benchmarks/results/<earlier>.json
+
+Every run is stored as JSON in ``benchmarks/results/`` (git commit, interpreter,
+sizes, best/median seconds and throughput per benchmark). ``--compare`` prints the
+change against an earlier run and exits with status 1 if any benchmark got slower
+than ``--threshold``.
+
+Benchmarks:
+
+* ``extract_text_pages`` — pdfplumber text extraction of a synthetic PDF;
+* ``parse_document`` — detection + TBank parser on extracted text pages;
+* ``extract_transactions`` — ``tbank_cashflow._extract_transactions`` alone;
+* ``parse_money_to_decimal`` / ``parse_money_to_kopecks`` — every amount of the statement;
+* ``api_parse`` — ``POST /v1/parse`` of the PDF through an in-process client
+  (``Settings(workers=0)``, result cache bypassed).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from collections.abc import Callable
+from contextlib import ExitStack
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime
+from io import BytesIO
+from pathlib import Path
+from typing import Any
+
+from app.parsers import tbank_cashflow as tb
+from app.parsers.registry import parse_document
+from app.utils.money import parse_money_to_decimal, parse_money_to_kopecks
+from app.utils.pdf import PdfMeta, extract_text_pages
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from synthetic import synthetic_pdf  # noqa: E402
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+@dataclass(frozen=True)
+class Result:
+    name: str
+    items: int
+    unit: str
+    best_s: float
+    median_s: float
+
+    @property
+    def per_second(self) -> float:
+        return self.items / self.best_s if self.best_s else float("inf")
+
+
+@dataclass
+class Inputs:
+    pdf: bytes
+    text_pages: list[str]
+    meta: PdfMeta
+    amounts: list[str]
+    transactions: int
+    # Closes whatever benchmarks set up (e.g. the API client's lifespan).
+    stack: ExitStack
+
+
+def _prepare(
+    pages: int, rows_per_page: int, split_ratio: float, seed: int, stack: ExitStack
+) -> Inputs:
+    rows = pages * rows_per_page
+    pdf = synthetic_pdf(rows, rows_per_page, seed, split_ratio)
+    text_pages, meta = extract_text_pages(BytesIO(pdf))
+    amounts = [row[4] for row in tb._iter_rows(text_pages)]
+    parsed = parse_document(text_pages, meta)
+    # Guard against the generator and the parser drifting apart: a benchmark of a
+    # parser that silently finds nothing measures nothing.
+    assert parsed.doc_type == tb.TBankCashflowParser.doc_type, parsed.doc_type
+    assert len(amounts) == rows, f"parsed {len(amounts)} of {rows} rows"
+    return Inputs(pdf, text_pages, meta, amounts, len(amounts), stack)
+
+
+def _time(fn: Callable[[], Any], repeat: int) -> tuple[float, float]:
+    fn()  # warm-up: imports, caches, first-call setup
+    runs = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - started)
+    return min(runs), statistics.median(runs)
+
+
+def _api_parse(inputs: Inputs) -> Callable[[], Any]:
+    from fastapi.testclient import TestClient
+
+    from app.api.server import create_app
+    from app.settings import Settings
+
+    client = inputs.stack.enter_context(TestClient(create_app(Settings(workers=0))))
+    files = {"file": ("statement.pdf", inputs.pdf, "application/pdf")}
+    headers = {"Cache-Control": "no-cache, no-store"}
+
+    def run() -> None:
+        r = client.post("/v1/parse", files=files, headers=headers)
+        r.raise_for_status()
+
+    return run
+
+
+# name -> (unit, items per run, factory returning the timed callable)
+_Benchmark = tuple[str, Callable[[Inputs], int], Callable[[Inputs], Callable[[], Any]]]
+BENCHMARKS: dict[str, _Benchmark] = {
+    "extract_text_pages": (
+        "pages",
+        lambda i: len(i.text_pages),
+        lambda i: lambda: extract_text_pages(BytesIO(i.pdf)),
+    ),
+    "parse_document": (
+        "rows",
+        lambda i: i.transactions,
+        lambda i: lambda: parse_document(i.text_pages, i.meta),
+    ),
+    "extract_transactions": (
+        "rows",
+        lambda i: i.transactions,
+        lambda i: lambda: tb._extract_transactions(i.text_pages),
+    ),
+    "parse_money_to_decimal": (
+        "amounts",
+        lambda i: len(i.amounts),
+        lambda i: lambda: [parse_money_to_decimal(a) for a in i.amounts],
+    ),
+    "parse_money_to_kopecks": (
+        "amounts",
+        lambda i: len(i.amounts),
+        lambda i: lambda: [parse_money_to_kopecks(a) for a in i.amounts],
+    ),
+    "api_parse": ("pages", lambda i: len(i.text_pages), _api_parse),
+}
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).resolve().parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def _compare(results: list[Result], baseline_path: Path, threshold: float) -> bool:
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    before = {r["name"]: r for r in baseline["results"]}
+    print(f"\nvs. {baseline_path.name} (commit {baseline.get('commit') or '?'}):")
+    regressed = False
+    for r in results:
+        old = before.get(r.name)
+        if old is None:
+            print(f"  {r.name:<26}      new")
+            continue
+        if old["items"] != r.items:
+            print(f"  {r.name:<26}      sizes differ ({old['items']} vs {r.items} {r.unit})")
+            continue
+        change = r.best_s / old["best_s"] - 1
+        flag = ""
+        if change > threshold:
+            flag, regressed = "  REGRESSION", True
+        print(f"  {r.name:<26}{change * 100:+8.1f}%{flag}")
+    return regressed
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--pages", type=int, default=20, help="Statement pages")
+    ap.add_argument("--rows-per-page", type=int, default=12)
+    ap.add_argument(
+        "--split-ratio", type=float, default=0.5, help="Share of pages in the split row layout"
+    )
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="Run only these")
+    ap.add_argument(
+        "--output", type=Path, help=f"Result file (default: {RESULTS_DIR}/<stamp>.json)"
+    )
+    ap.add_argument("--compare", type=Path, help="Earlier result file to compare against")
+    ap.add_argument(
+        "--threshold", type=float, default=0.10, help="Slowdown reported as a regression"
+    )
+    args = ap.parse_args()
+
+    results: list[Result] = []
+    with ExitStack() as stack:
+        inputs = _prepare(args.pages, args.rows_per_page, args.split_ratio, args.seed, stack)
+        print(
+            f"{len(inputs.text_pages)} pages, {inputs.transactions} transactions, "
+            f"{len(inputs.pdf) / 1024:.0f} KiB PDF"
+        )
+        for name in args.only or BENCHMARKS:
+            unit, items, factory = BENCHMARKS[name]
+            best, median = _time(factory(inputs), args.repeat)
+            result = Result(name, items(inputs), unit, best, median)
+            results.append(result)
+            print(
+                f"  {name:<26}{best * 1000:9.1f} ms  (median {median * 1000:.1f})"
+                f"{result.per_second:12.0f} {unit}/s"
+            )
+
+    stamp = datetime.now(UTC)
+    commit = _git_commit()
+    record = {
+        "commit": commit,
+        "timestamp": stamp.isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": {
+            "pages": args.pages,
+            "rows_per_page": args.rows_per_page,
+            "split_ratio": args.split_ratio,
+            "seed": args.seed,
+            "repeat": args.repeat,
+        },
+        "results": [{**asdict(r), "per_second": r.per_second} for r in results],
+    }
+    output = args.output or RESULTS_DIR / f"{stamp:%Y%m%dT%H%M%S}-{commit or 'nogit'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(record, indent=2) + "\n", encoding="utf-8")
+    print(f"saved {output}")
+
+    if args.compare is not None and _compare(results, args.compare, args.threshold):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
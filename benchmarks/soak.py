@@ -0,0 +1,473 @@
+"""Soak test: sustained concurrent ``POST /v1/parse`` load, latency and memory growth.
+
+Usage::
+
+    python benchmarks/soak.py                                    # create_app() in-process
+    python benchmarks/soak.py --iterations 20 --concurrency 16 --pages 40
+    python benchmarks/soak.py --serve --workers 2 --parse-workers 2
+
+Uploads generated TBank statements (``--distinct`` PDFs of ``--pages`` pages, cycled)
+in ``--iterations`` rounds of ``--requests`` uploads, ``--concurrency`` at a time,
+to a server on a free local port: ``create_app()`` under uvicorn in a thread of
+this process, or with ``--serve`` a ``pdf-parser serve`` subprocess (its flags come
+from ``PDF_PARSER_*`` variables plus ``--workers``/``--parse-workers``). Uploads
+bypass the result cache (``Cache-Control: no-cache, no-store``) unless ``--cache``.
+
+Reports per round and overall p50/p95/p99 latency and throughput, and the RSS of
+the server and every process under it (HTTP and parse workers), sampled every
+``--sample-interval`` seconds. In-process, ``tracemalloc`` also tracks the Python
+heap of this process; with ``--parse-workers 0`` (the in-process default) parsing
+runs there too, so growth is attributed to source lines. Tracing makes parsing
+several times slower: take latency figures with ``--no-tracemalloc`` or ``--serve``.
+
+Growth is measured from the end of the ``--warmup`` rounds (caches, pools and
+allocator arenas fill up there) to the end of the run. The run is stored as JSON
+in ``benchmarks/results/`` and exits with status 1 if any upload failed, a process
+grew more than ``--max-rss-growth`` MiB or the traced heap more than
+``--max-heap-growth`` MiB, so it can gate a release.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import json
+import math
+import os
+import platform
+import socket
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from run import RESULTS_DIR, _git_commit  # noqa: E402
+from synthetic import synthetic_pdf  # noqa: E402
+
+_MIB = 1024 * 1024
+# Statuses of an overloaded server: counted as rejected, not failed.
+_REJECTED = (429, 503)
+
+
+@dataclass
+class Round:
+    index: int
+    seconds: float
+    latencies: list[float] = field(default_factory=list)
+    rejected: int = 0
+    failed: int = 0
+    # label -> RSS bytes at the end of the round
+    rss: dict[str, int] = field(default_factory=dict)
+    heap: int | None = None
+
+    @property
+    def ok(self) -> int:
+        return len(self.latencies)
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile (``q`` in 0..100); 0.0 for no values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def _rss(pid: int) -> int | None:
+    try:
+        with open(f"/proc/{pid}/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def _children() -> dict[int, list[int]]:
+    tree: dict[int, list[int]] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", encoding="ascii", errors="replace") as f:
+                # "pid (comm) state ppid ...": comm may contain spaces.
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        tree.setdefault(ppid, []).append(int(entry))
+    return tree
+
+
+def _is_helper(pid: int) -> bool:
+    # multiprocessing's resource tracker holds no parse state.
+    try:
+        with open(f"/proc/{pid}/cmdline", "rb") as f:
+            return b"resource_tracker" in f.read()
+    except OSError:
+        return True
+
+
+def process_rss(root: int, http_workers: bool) -> dict[str, int]:
+    """RSS of ``root`` and its descendants, labelled ``server``, ``http-<pid>``
+    (prefork children when ``http_workers``) and ``parse-<pid>``."""
+    tree = _children()
+    out: dict[str, int] = {}
+    stack = [(root, 0)]
+    while stack:
+        pid, depth = stack.pop()
+        if depth and _is_helper(pid):
+            continue
+        rss = _rss(pid)
+        if rss is None:
+            continue
+        if depth == 0:
+            label = "server"
+        elif depth == 1 and http_workers:
+            label = f"http-{pid}"
+        else:
+            label = f"parse-{pid}"
+        out[label] = rss
+        stack += [(child, depth + 1) for child in tree.get(pid, ())]
+    return out
+
+
+class Sampler(threading.Thread):
+    """Records process RSS every ``interval`` seconds until stopped."""
+
+    def __init__(self, root: int, http_workers: bool, interval: float) -> None:
+        super().__init__(daemon=True)
+        self.root, self.http_workers, self.interval = root, http_workers, interval
+        self.timeline: list[dict[str, Any]] = []
+        self._done = threading.Event()
+        self._t0 = time.monotonic()
+
+    def sample(self) -> dict[str, int]:
+        rss = process_rss(self.root, self.http_workers)
+        self.timeline.append({"t": round(time.monotonic() - self._t0, 3), "rss": rss})
+        return rss
+
+    def run(self) -> None:
+        while not self._done.wait(self.interval):
+            self.sample()
+
+    def stop(self) -> None:
+        self._done.set()
+        self.join()
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return int(s.getsockname()[1])
+
+
+class InProcessServer:
+    """``create_app()`` served by uvicorn from a thread of this process."""
+
+    def __init__(self, parse_workers: int | None) -> None:
+        import uvicorn
+
+        from app.api.server import create_app
+        from app.engine import preload
+        from app.settings import Settings
+
+        preload()
+        self.port = _free_port()
+        settings = Settings.from_env(workers=parse_workers)
+        config = uvicorn.Config(
+            create_app(settings), host="127.0.0.1", port=self.port, log_level="warning"
+        )
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+        self.pid = os.getpid()
+
+    def start(self) -> None:
+        self._thread.start()
+        while not self._server.started:
+            if not self._thread.is_alive():
+                raise SystemExit("server failed to start")
+            time.sleep(0.05)
+
+    def stop(self) -> None:
+        self._server.should_exit = True
+        self._thread.join()
+
+
+class ServeProcess:
+    """``pdf-parser serve`` in a subprocess."""
+
+    def __init__(self, workers: int, parse_workers: int | None) -> None:
+        self.port = _free_port()
+        self._cmd = [
+            sys.executable, "-m", "app", "serve",
+            "--port", str(self.port), "--log-level", "warning", "--workers", str(workers),
+        ]  # fmt: skip
+        if parse_workers is not None:
+            self._cmd += ["--parse-workers", str(parse_workers)]
+        self._proc: subprocess.Popen[bytes] | None = None
+
+    @property
+    def pid(self) -> int:
+        assert self._proc is not None
+        return self._proc.pid
+
+    def start(self) -> None:
+        self._proc = subprocess.Popen(self._cmd)
+        deadline = time.monotonic() + 60
+        while time.monotonic() < deadline:
+            if self._proc.poll() is not None:
+                raise SystemExit(f"server exited with {self._proc.returncode}")
+            try:
+                if httpx.get(f"http://127.0.0.1:{self.port}/health", timeout=1).is_success:
+                    return
+            except httpx.TransportError:
+                pass
+            time.sleep(0.2)
+        self.stop()
+        raise SystemExit("server did not become healthy within 60 s")
+
+    def stop(self) -> None:
+        if self._proc is not None and self._proc.poll() is None:
+            self._proc.terminate()
+            try:
+                self._proc.wait(30)
+            except subprocess.TimeoutExpired:
+                self._proc.kill()
+                self._proc.wait()
+
+
+async def _round(
+    client: httpx.AsyncClient,
+    pdfs: list[bytes],
+    index: int,
+    requests: int,
+    concurrency: int,
+    headers: dict[str, str],
+) -> Round:
+    result = Round(index, 0.0)
+    counter = iter(range(requests))
+
+    async def uploader() -> None:
+        for n in counter:
+            files = {"file": (f"statement-{n}.pdf", pdfs[n % len(pdfs)], "application/pdf")}
+            started = time.perf_counter()
+            try:
+                r = await client.post("/v1/parse", files=files, headers=headers)
+            except httpx.HTTPError as e:
+                print(f"  upload {n}: {e!r}", file=sys.stderr)
+                result.failed += 1
+                continue
+            if r.is_success:
+                result.latencies.append(time.perf_counter() - started)
+            elif r.status_code in _REJECTED:
+                result.rejected += 1
+            else:
+                print(f"  upload {n}: HTTP {r.status_code} {r.text[:200]}", file=sys.stderr)
+                result.failed += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(uploader() for _ in range(concurrency)))
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+def _growth(before: dict[str, int], after: dict[str, int]) -> dict[str, int]:
+    # Only processes alive throughout: a respawned worker starts from scratch.
+    return {label: after[label] - before[label] for label in before if label in after}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--serve", action="store_true", help="Run `pdf-parser serve` in a subprocess")
+    ap.add_argument("--workers", type=int, default=1, help="Server processes (with --serve)")
+    ap.add_argument(
+        "--parse-workers",
+        type=int,
+        help="Extraction worker processes (default: 0 in-process, the server's with --serve)",
+    )
+    ap.add_argument("--iterations", type=int, default=10)
+    ap.add_argument("--warmup", type=int, default=2, help="Rounds before the growth baseline")
+    ap.add_argument("--requests", type=int, default=40, help="Uploads per round")
+    ap.add_argument("--concurrency", type=int, default=8)
+    ap.add_argument("--pages", type=int, default=10, help="Pages per statement")
+    ap.add_argument("--rows-per-page", type=int, default=12)
+    ap.add_argument("--distinct", type=int, default=4, help="Different statements uploaded")
+    ap.add_argument("--cache", action="store_true", help="Let the result cache answer repeats")
+    ap.add_argument(
+        "--sample-interval", type=float, default=0.5, help="Seconds between RSS samples"
+    )
+    ap.add_argument(
+        "--tracemalloc",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="Track this process's Python heap (default: on in-process)",
+    )
+    ap.add_argument("--max-rss-growth", type=float, default=64.0, help="MiB per process")
+    ap.add_argument("--max-heap-growth", type=float, default=16.0, help="MiB, traced heap")
+    ap.add_argument(
+        "--output", type=Path, help=f"Result file (default: {RESULTS_DIR}/soak-<stamp>.json)"
+    )
+    args = ap.parse_args()
+    if args.warmup >= args.iterations:
+        ap.error("--warmup must be smaller than --iterations")
+    trace = not args.serve if args.tracemalloc is None else args.tracemalloc
+
+    pdfs = [
+        synthetic_pdf(args.pages * args.rows_per_page, args.rows_per_page, seed)
+        for seed in range(args.distinct)
+    ]
+    if trace:
+        tracemalloc.start()
+    server: InProcessServer | ServeProcess
+    if args.serve:
+        server = ServeProcess(args.workers, args.parse_workers)
+    else:
+        server = InProcessServer(0 if args.parse_workers is None else args.parse_workers)
+    server.start()
+    sampler = Sampler(server.pid, args.serve and args.workers > 1, args.sample_interval)
+    sampler.start()
+    headers = {} if args.cache else {"Cache-Control": "no-cache, no-store"}
+    print(
+        f"{'serve' if args.serve else 'in-process'} server on port {server.port}: "
+        f"{args.iterations} rounds x {args.requests} uploads, concurrency {args.concurrency}, "
+        f"{args.distinct} x {args.pages}-page PDFs ({sum(map(len, pdfs)) / len(pdfs) / 1024:.0f} KiB)"
+    )
+
+    # Growth is measured from the end of this round.
+    base_index = max(args.warmup - 1, 0)
+    rounds: list[Round] = []
+    baseline_heap: tracemalloc.Snapshot | None = None
+    try:
+
+        async def soak() -> None:
+            nonlocal baseline_heap
+            limits = httpx.Limits(max_connections=args.concurrency)
+            async with httpx.AsyncClient(
+                base_url=f"http://127.0.0.1:{server.port}", limits=limits, timeout=300
+            ) as client:
+                for index in range(args.iterations):
+                    r = await _round(client, pdfs, index, args.requests, args.concurrency, headers)
+                    if trace:
+                        gc.collect()
+                        r.heap = tracemalloc.get_traced_memory()[0]
+                        if index == base_index:
+                            baseline_heap = tracemalloc.take_snapshot()
+                    r.rss = sampler.sample()
+                    rounds.append(r)
+                    rss = "  ".join(f"{k} {v / _MIB:.0f}" for k, v in sorted(r.rss.items()))
+                    heap = f"  heap {r.heap / _MIB:.1f}" if r.heap is not None else ""
+                    print(
+                        f"round {index + 1:>3}{' (warm-up)' if index < args.warmup else ''}: "
+                        f"{r.ok / r.seconds:6.1f} req/s  p50 {percentile(r.latencies, 50) * 1000:6.0f}"
+                        f"  p95 {percentile(r.latencies, 95) * 1000:6.0f}"
+                        f"  p99 {percentile(r.latencies, 99) * 1000:6.0f} ms"
+                        f"  rejected {r.rejected}  failed {r.failed}  RSS MiB: {rss}{heap}"
+                    )
+
+        asyncio.run(soak())
+        final_heap = tracemalloc.take_snapshot() if trace else None
+    finally:
+        sampler.stop()
+        server.stop()
+        if trace:
+            tracemalloc.stop()
+
+    measured = rounds[args.warmup :]
+    latencies = [x for r in measured for x in r.latencies]
+    seconds = sum(r.seconds for r in measured)
+    base = rounds[base_index]
+    rss_growth = _growth(base.rss, rounds[-1].rss)
+    heap_growth = (
+        rounds[-1].heap - base.heap
+        if rounds[-1].heap is not None and base.heap is not None
+        else None
+    )
+    failed = sum(r.failed for r in rounds)
+    print(
+        f"\nafter warm-up: {len(latencies) / seconds if seconds else 0:.1f} req/s, "
+        f"p50 {percentile(latencies, 50) * 1000:.0f} ms, p95 {percentile(latencies, 95) * 1000:.0f} ms, "
+        f"p99 {percentile(latencies, 99) * 1000:.0f} ms, "
+        f"{sum(r.rejected for r in measured)} rejected, {failed} failed"
+    )
+    problems: list[str] = []
+    if failed:
+        problems.append(f"{failed} uploads failed")
+    for label, grown in sorted(rss_growth.items()):
+        flag = ""
+        if grown > args.max_rss_growth * _MIB:
+            flag = "  GROWTH"
+            problems.append(f"{label} RSS grew {grown / _MIB:.1f} MiB")
+        print(f"  RSS {label:<14}{grown / _MIB:+8.1f} MiB{flag}")
+    if heap_growth is not None:
+        flag = ""
+        if heap_growth > args.max_heap_growth * _MIB:
+            flag = "  GROWTH"
+            problems.append(f"traced heap grew {heap_growth / _MIB:.1f} MiB")
+        print(f"  traced heap       {heap_growth / _MIB:+8.1f} MiB{flag}")
+    top: list[str] = []
+    if final_heap is not None and baseline_heap is not None:
+        # Leave out the harness itself (its RSS timeline grows by design).
+        ignore = [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ]
+        stats = final_heap.filter_traces(ignore).compare_to(
+            baseline_heap.filter_traces(ignore), "lineno"
+        )
+        top = [str(s) for s in stats[:10] if s.size_diff > 0]
+        if heap_growth is not None and heap_growth > args.max_heap_growth * _MIB:
+            print("  largest heap growth since warm-up:")
+            for line in top:
+                print(f"    {line}")
+
+    stamp = datetime.now(UTC)
+    commit = _git_commit()
+    record = {
+        "commit": commit,
+        "timestamp": stamp.isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": {k: str(v) if isinstance(v, Path) else v for k, v in vars(args).items()},
+        "summary": {
+            "requests_per_second": len(latencies) / seconds if seconds else 0.0,
+            "p50_s": percentile(latencies, 50),
+            "p95_s": percentile(latencies, 95),
+            "p99_s": percentile(latencies, 99),
+            "rss_growth_bytes": rss_growth,
+            "heap_growth_bytes": heap_growth,
+            "heap_growth_top": top,
+            "problems": problems,
+        },
+        "rounds": [
+            {
+                **{k: v for k, v in asdict(r).items() if k != "latencies"},
+                "ok": r.ok,
+                "p50_s": percentile(r.latencies, 50),
+                "p95_s": percentile(r.latencies, 95),
+                "p99_s": percentile(r.latencies, 99),
+            }
+            for r in rounds
+        ],
+        "rss_timeline": sampler.timeline,
+    }
+    output = args.output or RESULTS_DIR / f"soak-{stamp:%Y%m%dT%H%M%S}-{commit or 'nogit'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(record, indent=2) + "\n", encoding="utf-8")
+    print(f"saved {output}")
+    if problems:
+        print("FAILED: " + "; ".join(problems))
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
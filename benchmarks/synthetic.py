@@ -0,0 +1,109 @@
+"""Synthetic TBank statements for the benchmarks.
+
+* :func:`synthetic_pages` — extracted-text pages, mixing the Line-A/Line-B and the
+  five-line split row layouts (one layout per page, as real exports do), with
+  wrapped descriptions, repeated column headers and page footers;
+* :func:`synthetic_pdf` — the same statement rendered as a real PDF, one text line
+  per line, so extraction, detection and parsing all run on it;
+* :func:`synthetic_rows` / :func:`synthetic_columns_pdf` — rows for the columnar
+  layout of the test suite (``tbank_statement_cells``), used by geometry mode.
+
+Everything is deterministic for a given ``seed``.
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tests"))
+from pdf_factory import Row, build_pdf, tbank_statement_cells  # noqa: E402
+
+_DESCRIPTIONS = [
+    "Оплата в MAGNIT MM",
+    "Внешний перевод по номеру телефона",
+    "Пополнение. Система быстрых платежей",
+    "Оплата услуг mBank.Megafon",
+]
+_COLUMN_DESCRIPTIONS = (
+    ["Оплата в MAGNIT"],
+    ["Внешний перевод по", "номеру телефона", "+79522362282"],
+    ["Пополнение. Система", "быстрых платежей"],
+    ["Оплата в KOFEMANIYA"],
+)
+
+
+def _rub(kopecks: int) -> str:
+    # "126 191,00 ₽", as in the statement's totals block.
+    return f"{kopecks // 100:,}".replace(",", " ") + f",{kopecks % 100:02d} ₽"
+
+
+def synthetic_pages(
+    rows: int, rows_per_page: int = 40, seed: int = 0, split_ratio: float = 0.5
+) -> list[str]:
+    """Text pages of a statement with ``rows`` transactions.
+
+    Each page holds ``rows_per_page`` rows in the split layout with probability
+    ``split_ratio``, otherwise in the Line-A/Line-B layout. The totals block matches
+    the generated amounts.
+    """
+    rnd = random.Random(seed)
+    pages: list[str] = []
+    lines = ["АО «ТБАНК»", "Справка о движении средств"]
+    split_layout = False
+    income = expense = 0
+    for k in range(rows):
+        if k % rows_per_page == 0:
+            if k:
+                lines += ["АО «ТБанк» универсальная лицензия Банка России № 2673", "БИК 044525974"]
+                pages.append("\n".join(lines))
+                lines = []
+            lines.append("Дата и время операции Дата списания Сумма в валюте операции")
+            # Exports keep one row layout per page.
+            split_layout = rnd.random() < split_ratio
+        day = f"{rnd.randint(1, 28):02d}.{rnd.randint(1, 12):02d}.2026"
+        tm = f"{rnd.randint(0, 23):02d}:{rnd.randint(0, 59):02d}"
+        sign, rubles = rnd.choice("+-"), rnd.randint(1, 999_999)
+        kopecks = rnd.randint(0, 99)
+        amount = f"{sign}{rubles:,}".replace(",", " ") + f".{kopecks:02d} ₽"
+        if sign == "+":
+            income += rubles * 100 + kopecks
+        else:
+            expense += rubles * 100 + kopecks
+        desc = rnd.choice(_DESCRIPTIONS)
+        card = rnd.choice(["9824", "4417", "—"])
+        if not split_layout:
+            lines.append(f"{day} {day} {amount} {amount} {desc} {card}")
+            lines.append(f"{tm} {tm} операция {k}")
+            lines += [f"+7952{k:07d}"] * rnd.randint(0, 2)
+        else:
+            lines += [day, tm, day, tm, f"{amount} {amount} {desc}"]
+            lines += [f"продолжение описания {k}"] * rnd.randint(0, 2)
+            lines.append(card)
+    lines += [f"Пополнения: {_rub(income)}", f"Расходы: {_rub(expense)}"]
+    pages.append("\n".join(lines))
+    return pages
+
+
+def synthetic_pdf(
+    rows: int, rows_per_page: int = 12, seed: int = 0, split_ratio: float = 0.5
+) -> bytes:
+    """:func:`synthetic_pages` rendered as a PDF (a page holds ~70 lines)."""
+    return build_pdf(synthetic_pages(rows, rows_per_page, seed, split_ratio), producer="synthetic")
+
+
+def synthetic_rows(n: int, seed: int = 0) -> list[Row]:
+    rnd = random.Random(seed)
+    rows: list[Row] = []
+    for i in range(n):
+        day = f"{1 + i % 28:02d}.01.2026"
+        amount = f"{rnd.choice('+-')}{rnd.randint(1, 9_999)}.{rnd.randint(0, 99):02d} ₽"
+        card = rnd.choice(("4417", "9824", "—"))
+        rows.append((day, "10:00", day, "10:01", amount, rnd.choice(_COLUMN_DESCRIPTIONS), card))
+    return rows
+
+
+def synthetic_columns_pdf(rows: int, rows_per_page: int = 20, seed: int = 0) -> bytes:
+    """A statement laid out in real columns (text mode sees Line-A rows only)."""
+    return build_pdf(tbank_statement_cells(synthetic_rows(rows, seed), rows_per_page=rows_per_page))
@@ -2,18 +2,57 @@ from __future__ import annotations
 
 import argparse
 import json
-from pathlib import Path
+import os
 import sys
+import time
+from collections.abc import Iterable
+from contextlib import nullcontext
+from pathlib import Path
+from typing import TYPE_CHECKING
 
-import uvicorn
+from app.settings import Settings
 
-from app.api.server import create_app
-from app.parsers.registry import parse_document
-from app.utils.pdf import extract_text_pages
+if TYPE_CHECKING:
+    from app.cache import ResultCache
+    from app.page_cache import PageCache
+    from app.parsers.manifest import ParserOptions
+
+# Subcommands import what they need when they run: `parse` never loads the web
+# stack, and `--help` loads neither it nor pdfplumber.
 
 
 def _cmd_serve(args: argparse.Namespace) -> int:
-    app = create_app()
+    settings = Settings.from_env(
+        workers=args.parse_workers,
+        queue_depth=args.queue_depth,
+        queue_timeout=args.queue_timeout,
+        max_concurrent_parses=args.max_concurrent_parses,
+        adaptive_concurrency=args.adaptive_concurrency,
+        max_inflight_upload_bytes=args.max_inflight_upload_bytes,
+        job_timeout=args.job_timeout,
+        cache_dir=args.cache_dir,
+        page_jobs=args.page_jobs,
+        jobs_dir=args.jobs_dir,
+        page_cache_dir=args.page_cache_dir,
+        tbank_mode=args.tbank_mode,
+    )
+    if args.workers > 1:
+        if args.reload:
+            print("--reload cannot be combined with --workers", file=sys.stderr)
+            return 2
+        from app.api.prefork import serve_prefork
+
+        return serve_prefork(
+            settings, args.workers, host=args.host, port=args.port, log_level=args.log_level
+        )
+
+    import uvicorn
+
+    from app.api.server import create_app
+    from app.engine import preload
+
+    preload()
+    app = create_app(settings)
     uvicorn.run(
         app,
         host=args.host,
@@ -24,32 +63,146 @@ def _cmd_serve(args: argparse.Namespace) -> int:
     return 0
 
 
+def _parse_cached(
+    pdf_path: Path,
+    cache: ResultCache | None,
+    page_jobs: int,
+    aggregate: bool = False,
+    page_cache: PageCache | None = None,
+    options: ParserOptions | None = None,
+) -> bytes:
+    from app.cache import cache_key_for_file, result_variant
+    from app.pipeline import parse_pdf_path_to_json
+    from app.utils.timing import span
+
+    if cache is None:
+        return parse_pdf_path_to_json(str(pdf_path), page_jobs, aggregate, page_cache, options)
+    with span("cache"):
+        with pdf_path.open("rb") as fh:
+            key = cache_key_for_file(fh, result_variant(aggregate, options))
+        payload = cache.get(key)
+    if payload is None:
+        payload = parse_pdf_path_to_json(str(pdf_path), page_jobs, aggregate, page_cache, options)
+        with span("cache"):
+            cache.put(key, payload)
+    return payload
+
+
 def _cmd_parse(args: argparse.Namespace) -> int:
+    from app.cache import ResultCache
+    from app.utils.timing import collect_stages, format_profile
+
     pdf_path = Path(args.file)
     if not pdf_path.exists():
         print(f"File not found: {pdf_path}", file=sys.stderr)
         return 2
+    if args.aggregate and args.format == "ndjson":
+        print("--aggregate is only available with --format json", file=sys.stderr)
+        return 2
+
+    settings = Settings.from_env(
+        cache_dir=args.cache_dir,
+        page_jobs=args.page_jobs,
+        page_cache_dir=args.page_cache_dir,
+        tbank_mode=args.tbank_mode,
+    )
+    cache: ResultCache | None = None
+    if settings.cache_dir and not args.no_cache:
+        # A one-shot process only benefits from the on-disk tier.
+        cache = ResultCache(max_entries=0, max_bytes=0, disk_dir=Path(settings.cache_dir))
+    page_cache: PageCache | None = None
+    if settings.page_cache_dir and not args.no_cache:
+        from app.page_cache import PageCache
+
+        page_cache = PageCache(Path(settings.page_cache_dir), settings.page_cache_max_bytes)
+
+    started = time.perf_counter()
+    try:
+        with collect_stages() if args.profile else nullcontext() as timer:
+            code = _parse_to_stdout(args, pdf_path, settings, cache, page_cache)
+    finally:
+        if cache is not None:
+            cache.close()
+        if page_cache is not None:
+            page_cache.close()
+    if timer is not None:
+        print(format_profile(timer.ordered(), time.perf_counter() - started), file=sys.stderr)
+    return code
 
-    text_pages, meta = extract_text_pages(pdf_path)
 
-    if all(not t.strip() for t in text_pages):
+def _parse_to_stdout(
+    args: argparse.Namespace,
+    pdf_path: Path,
+    settings: Settings,
+    cache: ResultCache | None,
+    page_cache: PageCache | None,
+) -> int:
+    from app.pipeline import NoTextLayerError, stream_pdf
+    from app.serialization import dumps
+    from app.utils.timing import span
+
+    try:
+        if args.format == "ndjson":
+            # Streamed straight from the parser; the cache only holds whole results.
+            for line in stream_pdf(
+                pdf_path, settings.page_jobs, page_cache, settings.parser_options
+            ):
+                sys.stdout.buffer.write(line)
+            sys.stdout.flush()
+            return 0
+        payload = _parse_cached(
+            pdf_path, cache, settings.page_jobs, args.aggregate, page_cache, settings.parser_options
+        )
+    except NoTextLayerError:
         print(
             "No extractable text found (likely scanned PDF). OCR is not enabled.",
             file=sys.stderr,
         )
         return 3
 
-    result = parse_document(text_pages, meta)
-    out = {
-        "doc_type": result.doc_type,
-        "meta": result.meta,
-        "data": result.data,
-    }
-    json.dump(out, sys.stdout, ensure_ascii=False, indent=2)
-    sys.stdout.write("\n")
+    if args.pretty:
+        with span("encode"):
+            payload = dumps(json.loads(payload), pretty=True)
+    sys.stdout.buffer.write(payload + b"\n")
+    sys.stdout.flush()
     return 0
 
 
+def _cmd_batch(args: argparse.Namespace) -> int:
+    from functools import partial
+
+    from app.batch import already_done, iter_inputs, parse_file_record, run_batch
+
+    specs: Iterable[str] = args.inputs or ["-"]
+    if specs == ["-"]:
+        specs = sys.stdin
+    paths = iter_inputs(specs)
+    options = Settings.from_env(tbank_mode=args.tbank_mode).parser_options
+    record = partial(parse_file_record, options=options)
+
+    if args.output is None:
+        report = run_batch(paths, sys.stdout, jobs=args.jobs, record=record)
+    else:
+        output = Path(args.output)
+        skip = already_done(output) if args.resume else set()
+        with output.open("a" if args.resume else "w", encoding="utf-8") as out:
+            report = run_batch(paths, out, jobs=args.jobs, skip=skip, record=record)
+
+    print(report.summary(), file=sys.stderr)
+    return 0 if report.errors == 0 else 1
+
+
+def _cmd_detect(args: argparse.Namespace) -> int:
+    from app.batch import detect_file_record, iter_inputs, run_batch
+
+    specs: Iterable[str] = args.inputs or ["-"]
+    if specs == ["-"]:
+        specs = sys.stdin
+    report = run_batch(iter_inputs(specs), sys.stdout, jobs=args.jobs, record=detect_file_record)
+    print(report.summary(), file=sys.stderr)
+    return 0 if report.errors == 0 else 1
+
+
 def build_parser() -> argparse.ArgumentParser:
     p = argparse.ArgumentParser(prog="pdf-parser", description="PDF → JSON parser service")
     sub = p.add_subparsers(dest="cmd", required=True)
@@ -59,18 +212,141 @@ def build_parser() -> argparse.ArgumentParser:
     s.add_argument("--port", default=8000, type=int)
     s.add_argument("--log-level", default="info")
     s.add_argument("--reload", action="store_true", help="Auto-reload on code changes (dev only)")
+    s.add_argument(
+        "--parse-workers",
+        type=int,
+        help="Extraction worker processes (0 = run in a thread; default: min(4, CPUs))",
+    )
+    s.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Server processes sharing the port, forked after preloading parsers (POSIX)",
+    )
+    s.add_argument("--queue-depth", type=int, help="Jobs allowed to wait for a worker before 503")
+    s.add_argument(
+        "--queue-timeout", type=float, help="Seconds a job may wait in that queue before 503"
+    )
+    s.add_argument(
+        "--max-concurrent-parses",
+        type=int,
+        help="Parses run at once per server process (default: one per parse worker)",
+    )
+    s.add_argument(
+        "--adaptive-concurrency",
+        action="store_true",
+        default=None,
+        help="Lower/raise the concurrent-parse limit following per-page parse latency",
+    )
+    s.add_argument(
+        "--max-inflight-upload-bytes",
+        type=int,
+        help="Upload bytes held by requests at once before 429 (0 = unlimited)",
+    )
+    s.add_argument("--job-timeout", type=float, help="Seconds before a stuck parse job is killed")
+    s.add_argument("--cache-dir", help="Persist parse results in this directory (SQLite)")
+    s.add_argument(
+        "--page-cache-dir", help="Reuse text and rows of pages seen before (SQLite, by page hash)"
+    )
+    s.add_argument(
+        "--jobs-dir", help="Keep /v1/jobs state and queued uploads here, across restarts"
+    )
+    s.add_argument(
+        "--page-jobs",
+        type=int,
+        help="Page-extraction processes per document with --parse-workers 0 (default: 1)",
+    )
+    s.add_argument(
+        "--tbank-mode",
+        choices=("auto", "text", "geometry"),
+        help="How TBank transactions are read (default: $PDF_PARSER_TBANK_MODE or auto)",
+    )
     s.set_defaults(func=_cmd_serve)
 
     c = sub.add_parser("parse", help="Parse a PDF file locally and print JSON")
     c.add_argument("--file", required=True, help="Path to PDF")
+    c.add_argument(
+        "--cache-dir",
+        help="Directory of the on-disk result cache (default: $PDF_PARSER_CACHE_DIR, off if unset)",
+    )
+    c.add_argument(
+        "--page-cache-dir",
+        help="Per-page text/row cache directory (default: $PDF_PARSER_PAGE_CACHE_DIR, off if unset)",
+    )
+    c.add_argument(
+        "--no-cache", action="store_true", help="Ignore the result cache and the page cache"
+    )
+    c.add_argument(
+        "--format",
+        choices=("json", "ndjson"),
+        default="json",
+        help="ndjson: header record, then one line per transaction/page, streamed",
+    )
+    c.add_argument("--pretty", action="store_true", help="Indent JSON output (default: compact)")
+    c.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print time spent per stage (open, extract, detect, parser, encode, ...) to stderr",
+    )
+    c.add_argument(
+        "--aggregate",
+        action="store_true",
+        help="Print totals by date/month/card/merchant and a reconciliation instead of rows",
+    )
+    c.add_argument(
+        "--page-jobs",
+        type=int,
+        help="Extract pages of long PDFs with N processes (default: $PDF_PARSER_PAGE_JOBS or 1)",
+    )
+    c.add_argument(
+        "--tbank-mode",
+        choices=("auto", "text", "geometry"),
+        help="How TBank transactions are read (default: $PDF_PARSER_TBANK_MODE or auto)",
+    )
     c.set_defaults(func=_cmd_parse)
 
+    b = sub.add_parser("batch", help="Parse many PDFs into JSON Lines (one object per file)")
+    b.add_argument(
+        "inputs",
+        nargs="*",
+        help="PDF files, directories or globs; '-' or nothing reads paths from stdin",
+    )
+    b.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    b.add_argument("-o", "--output", help="Write JSON Lines here instead of stdout")
+    b.add_argument(
+        "--resume",
+        action="store_true",
+        help="Append to --output, skipping files already recorded in it",
+    )
+    b.add_argument(
+        "--tbank-mode",
+        choices=("auto", "text", "geometry"),
+        help="How TBank transactions are read (default: $PDF_PARSER_TBANK_MODE or auto)",
+    )
+    b.set_defaults(func=_cmd_batch)
+
+    d = sub.add_parser(
+        "detect",
+        help="Print doc type, parser version and metadata of PDFs without parsing them",
+    )
+    d.add_argument(
+        "inputs",
+        nargs="*",
+        help="PDF files, directories or globs; '-' or nothing reads paths from stdin",
+    )
+    d.add_argument(
+        "-j", "--jobs", type=int, default=1, help="Worker processes (detection takes ms per file)"
+    )
+    d.set_defaults(func=_cmd_detect)
+
     return p
 
 
 def main() -> None:
     parser = build_parser()
     args = parser.parse_args()
+    if args.cmd == "batch" and args.resume and args.output is None:
+        parser.error("batch --resume needs -o/--output (the file to resume)")
     code = int(args.func(args))
     raise SystemExit(code)
 
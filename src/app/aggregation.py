@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import re
+from collections.abc import Hashable, Iterable, Mapping, Sequence
+from dataclasses import replace
+from typing import Any, TypeVar
+
+from app.parsers.registry import ParseResult
+from app.parsers.transactions import TransactionTable
+from app.utils.dates import MINUTES_PER_DAY, days_to_date
+from app.utils.money import kopecks_to_str, parse_money_to_kopecks
+
+K = TypeVar("K", bound=Hashable)
+
+# Card masks, phone numbers, terminal and order ids: runs of 4+ digits (optionally
+# split by spaces, dashes or "*"), plus punctuation.
+_MERCHANT_NOISE_RE = re.compile(r"\d[\d\s*-]{2,}\d|[^\w\s]")
+
+
+def normalize_merchant(description: str) -> str:
+    """Grouping key for a description: lowercase, without ids, digit runs and punctuation.
+
+    ``"Оплата в MAGNIT MM 1234"`` and ``"Оплата в Magnit MM 5678"`` share a key.
+    """
+    key = " ".join(_MERCHANT_NOISE_RE.sub(" ", description.lower()).split())
+    return key or " ".join(description.lower().split())
+
+
+# A group: [count, income kopecks, expense kopecks (positive)].
+_Sums = list[int]
+
+
+def _factorize(values: Iterable[K]) -> tuple[list[int], list[K]]:
+    """Dense group codes for ``values`` plus the distinct values, in first-seen order."""
+    index: dict[K, int] = {}
+    codes = [index.setdefault(v, len(index)) for v in values]
+    return codes, list(index)
+
+
+def _group_sums(codes: Iterable[int], groups: int, amounts: Iterable[int]) -> list[_Sums]:
+    # One pass over two columns; the per-group work happens on plain lists.
+    counts = [0] * groups
+    income = [0] * groups
+    expense = [0] * groups
+    for code, amount in zip(codes, amounts, strict=True):
+        counts[code] += 1
+        if amount >= 0:
+            income[code] += amount
+        else:
+            expense[code] -= amount
+    return [list(sums) for sums in zip(counts, income, expense, strict=True)]
+
+
+def _merge(codes: Sequence[int], groups: int, sums: Sequence[_Sums]) -> list[_Sums]:
+    # Roll finer groups up into coarser ones (days into months).
+    out = [[0, 0, 0] for _ in range(groups)]
+    for code, (count, income, expense) in zip(codes, sums, strict=True):
+        acc = out[code]
+        acc[0] += count
+        acc[1] += income
+        acc[2] += expense
+    return out
+
+
+def _row(key: Any, sums: _Sums) -> dict[str, Any]:
+    count, income, expense = sums
+    return {
+        "key": key,
+        "count": count,
+        "income_rub": kopecks_to_str(income),
+        "expense_rub": kopecks_to_str(expense),
+        "net_rub": kopecks_to_str(income - expense),
+    }
+
+
+def _by_key(keys: Sequence[Any], sums: Sequence[_Sums]) -> list[dict[str, Any]]:
+    return [_row(k, s) for k, s in sorted(zip(keys, sums, strict=True), key=lambda p: p[0])]
+
+
+def _by_turnover(keys: Sequence[Any], sums: Sequence[_Sums]) -> list[dict[str, Any]]:
+    # Biggest groups first; ties (and None keys) ordered deterministically.
+    pairs = sorted(
+        zip(keys, sums, strict=True),
+        key=lambda p: (-(p[1][1] + p[1][2]), p[0] is None, p[0] or ""),
+    )
+    return [_row(k, s) for k, s in pairs]
+
+
+def _reconcile(computed: int, statement: str | None) -> dict[str, Any] | None:
+    if statement is None:
+        return None
+    stated = parse_money_to_kopecks(statement)
+    return {
+        "statement_rub": kopecks_to_str(stated),
+        "computed_rub": kopecks_to_str(computed),
+        "difference_rub": kopecks_to_str(computed - stated),
+        "match": computed == stated,
+    }
+
+
+def aggregate(
+    table: TransactionTable, totals: Mapping[str, str | None] | None = None
+) -> dict[str, Any]:
+    """Totals and breakdowns of ``table`` by operation date, month, card and merchant.
+
+    Work is done per column: every grouping turns one column into dense group codes
+    and sums the amount column by code in a single pass. Labels are computed once
+    per distinct value (a date per day, a normalised merchant per pooled
+    description), never per row. Expenses are reported as positive sums, like the
+    statement's own "Расходы" line; ``totals`` (the statement's ``income_rub`` /
+    ``expense_rub``) are reconciled against the computed sums.
+    """
+    amounts = table.amounts
+    day_codes, days = _factorize(m // MINUTES_PER_DAY for m in table.op_minutes)
+    day_sums = _group_sums(day_codes, len(days), amounts)
+    _, income, expense = _merge([0] * len(days), 1, day_sums)[0]
+    day_labels = [days_to_date(d) for d in days]
+    month_codes, months = _factorize(d.strftime("%Y-%m") for d in day_labels)
+    month_sums = _merge(month_codes, len(months), day_sums)
+
+    card_codes, cards = _factorize(table.cards)
+    card_sums = _group_sums(card_codes, len(cards), amounts)
+    card_labels = [None if c < 0 else table.pool[c] for c in cards]
+
+    # Descriptions are already pool ids: normalise each distinct one once.
+    desc_codes, descs = _factorize(table.descriptions)
+    merchant_of_desc, merchants = _factorize(normalize_merchant(table.pool[d]) for d in descs)
+    merchant_sums = _group_sums((merchant_of_desc[c] for c in desc_codes), len(merchants), amounts)
+
+    totals = totals or {}
+    checks = {
+        "income": _reconcile(income, totals.get("income_rub")),
+        "expense": _reconcile(expense, totals.get("expense_rub")),
+    }
+    found = [c["match"] for c in checks.values() if c is not None]
+    return {
+        "count": len(table),
+        "income_rub": kopecks_to_str(income),
+        "expense_rub": kopecks_to_str(expense),
+        "net_rub": kopecks_to_str(income - expense),
+        "by_date": _by_key([d.isoformat() for d in day_labels], day_sums),
+        "by_month": _by_key(months, month_sums),
+        "by_card": _by_turnover(card_labels, card_sums),
+        "by_merchant": _by_turnover(merchants, merchant_sums),
+        "reconciliation": {**checks, "ok": all(found) if found else None},
+    }
+
+
+def aggregate_result(result: ParseResult) -> ParseResult:
+    """Replace ``data.transactions`` with ``data.aggregates``.
+
+    Documents without a transaction table (e.g. generic text) get ``aggregates: null``.
+    """
+    data = dict(result.data)
+    transactions = data.pop("transactions", None)
+    totals = data.get("totals")
+    data["aggregates"] = (
+        aggregate(transactions, totals if isinstance(totals, Mapping) else None)
+        if isinstance(transactions, TransactionTable)
+        else None
+    )
+    return replace(result, data=data)
@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Iterable, Sequence
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Prometheus text exposition format, version 0.0.4.
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+SECONDS_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+PAGES_PER_SECOND_BUCKETS = (1.0, 2.0, 5.0, 10.0, 20.0, 50.0, 100.0, 200.0, 500.0, 1000.0)
+
+_Labels = tuple[tuple[str, str], ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(labels: _Labels, extra: str = "") -> str:
+    parts = [f'{k}="{_escape(v)}"' for k, v in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> _Labels:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {sorted(labels)}")
+        return tuple((k, str(labels[k])) for k in self.labelnames)
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, help, labelnames)
+        self._values: dict[_Labels, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            yield f"{self.name}{_label_text(labels)} {_number(value)}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = SECONDS_BUCKETS,
+    ) -> None:
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: non-cumulative bucket counts (last one is +Inf), sum.
+        self._series: dict[_Labels, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            counts, total = series
+            counts[bisect_left(self.buckets, value)] += 1
+            total[0] += value
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            items = sorted((k, (list(c), s[0])) for k, (c, s) in self._series.items())
+        for labels, (counts, total) in items:
+            running = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts, strict=True):
+                running += count
+                le = f'le="{_number(bound)}"'
+                yield f"{self.name}_bucket{_label_text(labels, le)} {running}"
+            yield f"{self.name}_sum{_label_text(labels)} {_number(total)}"
+            yield f"{self.name}_count{_label_text(labels)} {running}"
+
+
+class Metrics:
+    """The service's metrics, rendered for Prometheus at ``GET /metrics``.
+
+    Kept in process memory with no external dependency; with several uvicorn
+    processes, each exposes its own values (scrape them per process).
+    """
+
+    def __init__(self) -> None:
+        self.stage_seconds = Histogram(
+            "pdf_parser_stage_seconds",
+            "Time spent in each parse stage.",
+            ("stage", "doc_type"),
+        )
+        self.parse_seconds = Histogram(
+            "pdf_parser_parse_seconds",
+            "End-to-end /v1/parse handling time by document type (cache hits included).",
+            ("doc_type",),
+        )
+        self.pages_per_second = Histogram(
+            "pdf_parser_pages_per_second",
+            "Per-document parse throughput.",
+            ("doc_type",),
+            buckets=PAGES_PER_SECOND_BUCKETS,
+        )
+        self.pages = Counter("pdf_parser_pages_total", "Pages parsed.", ("doc_type",))
+        self.bytes = Counter("pdf_parser_upload_bytes_total", "PDF bytes received for parsing.")
+        self.requests = Counter(
+            "pdf_parser_http_requests_total",
+            "HTTP requests by route and status.",
+            ("route", "status"),
+        )
+        self.request_seconds = Histogram(
+            "pdf_parser_http_request_seconds",
+            "HTTP request duration, until the response body is sent.",
+            ("route",),
+        )
+        self.in_flight = Gauge("pdf_parser_in_flight_requests", "HTTP requests being handled.")
+        # Admission state, sampled when /metrics is scraped.
+        self.concurrency_limit = Gauge(
+            "pdf_parser_concurrency_limit", "Parses allowed to run at once (adaptive or fixed)."
+        )
+        self.parses_waiting = Gauge("pdf_parser_parses_waiting", "Parses queued for a slot.")
+
+    def all(self) -> list[_Metric]:
+        return [m for m in vars(self).values() if isinstance(m, _Metric)]
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self.all():
+            lines += metric.header()
+            lines += metric.samples()
+        return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """Count HTTP requests, their duration and how many are in flight.
+
+    Requests are labelled by route template (``/v1/jobs/{job_id}``, not the raw
+    path) to keep label cardinality bounded; unmatched paths count as ``other``.
+    A streamed response stays in flight until its last chunk is sent.
+    """
+
+    def __init__(self, app: ASGIApp, metrics: Metrics) -> None:
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        metrics = self.metrics
+        status = "500"
+        started = time.perf_counter()
+        # Lets handlers time the whole request, body upload included.
+        scope.setdefault("state", {})["started"] = started
+        metrics.in_flight.inc()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            metrics.in_flight.dec()
+            route = getattr(scope.get("route"), "path", "other")
+            metrics.requests.inc(route=route, status=status)
+            metrics.request_seconds.observe(time.perf_counter() - started, route=route)
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import dataclasses
+import logging
+import os
+import signal
+import tempfile
+import time
+from contextlib import suppress
+from pathlib import Path
+from types import FrameType
+
+import uvicorn
+
+from app.api.server import create_app
+from app.engine import preload
+from app.jobs import JobStore
+from app.settings import Settings
+
+logger = logging.getLogger("uvicorn.error")
+
+# uvicorn's exit code for an app whose startup (lifespan) failed.
+_STARTUP_FAILURE = 3
+
+
+def serve_prefork(settings: Settings, workers: int, host: str, port: int, log_level: str) -> int:
+    """Serve the app from ``workers`` forked processes accepting on one shared socket.
+
+    uvicorn's own ``--workers`` spawns fresh interpreters that import everything
+    again; here the parent preloads pdfplumber and the parser modules, builds the
+    app and binds the socket, then forks, so children start warm and share those
+    pages copy-on-write. Each child runs its own event loop and lifespan (extraction
+    pool, caches, job runner), so engine and upload limits apply per child. The
+    parent only supervises: a child that dies is replaced, SIGINT/SIGTERM stop all
+    of them. POSIX only.
+    """
+    scratch: tempfile.TemporaryDirectory[str] | None = None
+    if settings.jobs_dir is None:
+        # Children must share one job store, or a job would only be visible in the
+        # process that accepted it.
+        scratch = tempfile.TemporaryDirectory(prefix="pdf-parser-jobs-")
+        settings = dataclasses.replace(settings, jobs_dir=scratch.name)
+    assert settings.jobs_dir is not None
+    # Requeue items interrupted by the previous run once, before any child claims work.
+    JobStore(Path(settings.jobs_dir)).close()
+
+    preload()
+    config = uvicorn.Config(
+        create_app(settings, recover_jobs=False), host=host, port=port, log_level=log_level
+    )
+    sock = config.bind_socket()
+    children: dict[int, float] = {}
+    stopping = False
+    code = 0
+
+    def spawn() -> None:
+        pid = os.fork()
+        if pid == 0:
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                signal.signal(sig, signal.SIG_DFL)
+            server = uvicorn.Server(config)
+            try:
+                server.run(sockets=[sock])
+            except BaseException:
+                logger.exception("Worker %d crashed", os.getpid())
+                os._exit(1)
+            os._exit(0 if server.started else _STARTUP_FAILURE)
+        children[pid] = time.monotonic()
+
+    def stop(signum: int = signal.SIGTERM, frame: FrameType | None = None) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            with suppress(ProcessLookupError):
+                os.kill(pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    logger.info("Starting %d workers (parent process %d)", workers, os.getpid())
+    for _ in range(workers):
+        spawn()
+    try:
+        while children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            started = children.pop(pid, None)
+            if started is None or stopping:
+                continue
+            exit_code = os.waitstatus_to_exitcode(status)
+            if exit_code == _STARTUP_FAILURE:
+                logger.error("Worker %d failed to start, stopping", pid)
+                code = _STARTUP_FAILURE
+                stop()
+                continue
+            logger.warning("Worker %d exited with %d, restarting", pid, exit_code)
+            # A worker crashing right after start would otherwise be respawned in a loop.
+            if time.monotonic() - started < 1.0:
+                time.sleep(1.0)
+            spawn()
+    finally:
+        sock.close()
+        if scratch is not None:
+            scratch.cleanup()
+    return code
@@ -1,56 +1,535 @@
 from __future__ import annotations
 
-from io import BytesIO
+import asyncio
+import os
+import tempfile
+import time
+import zipfile
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, Literal
 
-from fastapi import FastAPI, File, HTTPException, UploadFile
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, File, HTTPException, Query, Request, UploadFile
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from starlette.types import Receive, Scope, Send
 
-from app.parsers.registry import parse_document
-from app.utils.pdf import extract_text_pages
+from app.api.metrics import CONTENT_TYPE, Metrics, MetricsMiddleware
+from app.api.uploads import (
+    MULTIPART_OVERHEAD_BYTES,
+    UPLOAD_CHUNK_BYTES,
+    ZIP_CONTENT_TYPES,
+    BodyLimitMiddleware,
+    SpooledUpload,
+    TooManyFilesError,
+    UploadBudgetMiddleware,
+    UploadTooLargeError,
+    spool_upload,
+    spool_zip,
+)
+from app.cache import ResultCache, cache_key_for_digest, result_variant
+from app.engine import EngineBusyError, EngineTimeoutError, ExtractionEngine
+from app.jobs import JobRunner, JobStore
+from app.page_cache import PageCache
+from app.parsers.manifest import ParserOptions
+from app.pipeline import (
+    NoTextLayerError,
+    PdfOpenError,
+    detect_pdf_paths,
+    parse_pdf_path_timed,
+    stream_pdf_path_timed,
+)
+from app.serialization import dumps
+from app.settings import Settings
+from app.utils.timing import StageTimer, collect_stages, server_timing, span
 
 
-def create_app() -> FastAPI:
+def create_app(settings: Settings | None = None, *, recover_jobs: bool = True) -> FastAPI:
+    """The HTTP app. ``recover_jobs=False`` when it is one of several processes
+    sharing a jobs directory, whose interrupted items the supervisor requeued."""
+    settings = settings or Settings.from_env()
+    # Built (and validated) once, before the server starts taking requests.
+    options = settings.parser_options
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+        engine = ExtractionEngine(
+            workers=settings.workers,
+            queue_depth=settings.queue_depth,
+            job_timeout=settings.job_timeout,
+            max_concurrency=settings.max_concurrent_parses,
+            queue_timeout=settings.queue_timeout,
+            adaptive=settings.adaptive_concurrency,
+        )
+        engine.start()
+        app.state.engine = engine
+        cache = ResultCache(
+            max_entries=settings.cache_entries,
+            max_bytes=settings.cache_max_bytes,
+            disk_dir=Path(settings.cache_dir) if settings.cache_dir else None,
+        )
+        app.state.cache = cache
+        page_cache = None
+        if settings.page_cache_dir:
+            page_cache = PageCache(Path(settings.page_cache_dir), settings.page_cache_max_bytes)
+        app.state.page_cache = page_cache
+        scratch: tempfile.TemporaryDirectory[str] | None = None
+        if settings.jobs_dir:
+            jobs_dir = Path(settings.jobs_dir)
+        else:
+            # Without a jobs directory the job API still works, but only for this process.
+            scratch = tempfile.TemporaryDirectory(prefix="pdf-parser-jobs-")
+            jobs_dir = Path(scratch.name)
+        jobs = JobStore(jobs_dir, recover=recover_jobs)
+        jobs.purge(settings.jobs_retention)
+        app.state.jobs = jobs
+        runner = JobRunner(
+            jobs,
+            engine,
+            cache,
+            concurrency=settings.jobs_concurrency or max(1, settings.workers),
+            page_jobs=settings.page_jobs,
+            page_cache=page_cache,
+            options=options,
+        )
+        runner.start()
+        app.state.job_runner = runner
+        try:
+            yield
+        finally:
+            await runner.stop()
+            engine.shutdown()
+            cache.close()
+            jobs.close()
+            if page_cache is not None:
+                page_cache.close()
+            if scratch is not None:
+                scratch.cleanup()
+
     app = FastAPI(
         title="pdf-parser-service",
         version="0.1.0",
         description="Upload PDF → parse → return JSON",
+        lifespan=lifespan,
+    )
+    app.state.settings = settings
+    metrics = Metrics()
+    app.state.metrics = metrics
+    # Inside the body limit: an upload that is too large gets 413, not 429.
+    app.add_middleware(
+        UploadBudgetMiddleware,
+        max_bytes=settings.max_inflight_upload_bytes,
+        retry_after=lambda: _retry_after(app),
+    )
+    # Tune via PDF_PARSER_MAX_UPLOAD_BYTES (~20MB by default).
+    app.add_middleware(
+        BodyLimitMiddleware,
+        max_body_bytes=settings.max_upload_bytes + MULTIPART_OVERHEAD_BYTES,
+        detail=str(UploadTooLargeError(settings.max_upload_bytes)),
+        overrides=dict.fromkeys(
+            ("/v1/jobs", "/v1/detect"),
+            (
+                settings.jobs_max_upload_bytes + MULTIPART_OVERHEAD_BYTES,
+                str(UploadTooLargeError(settings.jobs_max_upload_bytes)),
+            ),
+        ),
     )
+    # Added last so it wraps everything, 413s from the body limit included.
+    app.add_middleware(MetricsMiddleware, metrics=metrics)
 
     @app.get("/health")
     def health() -> dict[str, str]:
         return {"status": "ok"}
 
+    @app.get("/metrics", include_in_schema=False)
+    def prometheus_metrics(request: Request) -> Response:
+        engine: ExtractionEngine | None = getattr(request.app.state, "engine", None)
+        if engine is not None:
+            metrics.concurrency_limit.set(engine.limit.value)
+            metrics.parses_waiting.set(engine.waiting)
+        return PlainTextResponse(metrics.render(), media_type=CONTENT_TYPE)
+
+    @app.get("/v1/cache/stats")
+    def cache_stats(request: Request) -> dict[str, Any]:
+        cache: ResultCache = request.app.state.cache
+        page_cache: PageCache | None = request.app.state.page_cache
+        stats: dict[str, Any] = cache.snapshot()
+        if page_cache is not None:
+            stats["pages"] = page_cache.snapshot()
+        return stats
+
     @app.post("/v1/parse")
-    async def parse_pdf(file: UploadFile = File(...)) -> JSONResponse:
+    async def parse_pdf(
+        request: Request,
+        file: UploadFile = File(...),
+        format: Literal["json", "ndjson"] | None = Query(None),
+        aggregate: bool = Query(False),
+    ) -> Response:
         if file.content_type not in ("application/pdf", "application/octet-stream"):
             raise HTTPException(status_code=415, detail="Only PDF uploads are supported.")
 
-        blob = await file.read()
-        if not blob:
-            raise HTTPException(status_code=400, detail="Empty file.")
-        # Basic safety guard (~20MB). Tune as needed.
-        if len(blob) > 20 * 1024 * 1024:
-            raise HTTPException(status_code=413, detail="File too large (limit 20MB).")
+        ndjson = format == "ndjson" or (
+            format is None and "application/x-ndjson" in request.headers.get("accept", "")
+        )
+        if ndjson and aggregate:
+            raise HTTPException(
+                status_code=400, detail="Aggregates are only available as JSON output."
+            )
+
+        # Set by MetricsMiddleware when the request arrived, i.e. before the
+        # multipart body was read.
+        started: float = request.scope.get("state", {}).get("started", time.perf_counter())
+        upload = await _receive_upload(file, settings)
+        metrics.bytes.inc(upload.size)
+        engine: ExtractionEngine = request.app.state.engine
+        page_cache: PageCache | None = request.app.state.page_cache
+        if ndjson:
+            return await _stream_ndjson(
+                engine, upload, settings, page_cache, options, metrics, started
+            )
+
+        # Standard request directives: "no-cache" skips the lookup, "no-store" skips saving.
+        cache_control = request.headers.get("cache-control", "").lower()
+        cache: ResultCache = request.app.state.cache
+        key = cache_key_for_digest(upload.sha256, result_variant(aggregate, options))
+        with collect_stages() as timer:
+            timer.add("upload", time.perf_counter() - started)
+            try:
+                if "no-cache" not in cache_control:
+                    with span("cache"):
+                        # The disk tier is SQLite: keep its I/O off the event loop.
+                        cached = await asyncio.to_thread(cache.get, key)
+                    if cached is not None:
+                        _observe(metrics, timer, "cached", 0, time.perf_counter() - started)
+                        return _json_response(cached, "HIT", timer, started, settings)
 
+                try:
+                    run_started = time.perf_counter()
+                    job = await engine.run(
+                        parse_pdf_path_timed,
+                        str(upload.path),
+                        settings.page_jobs,
+                        aggregate,
+                        page_cache,
+                        options,
+                    )
+                except (EngineBusyError, EngineTimeoutError, PdfOpenError, NoTextLayerError) as e:
+                    raise _http_error(e) from e
+            finally:
+                upload.discard()
+
+            # The job's stages were timed where it ran (maybe another process); the
+            # rest of the engine round trip is waiting for a worker plus IPC.
+            wall = time.perf_counter() - run_started
+            timer.merge(job.stages)
+            timer.add("queue", max(0.0, wall - sum(job.stages.values())))
+            if "no-store" not in cache_control:
+                await asyncio.to_thread(cache.put, key, job.payload)
+            _observe(metrics, timer, job.doc_type, job.pages, time.perf_counter() - started)
+            return _json_response(job.payload, "MISS", timer, started, settings)
+
+    @app.post("/v1/detect")
+    async def detect(request: Request, files: list[UploadFile] = File(...)) -> Response:
+        """Doc type, parser version and metadata of each file, without parsing it."""
+        engine: ExtractionEngine = request.app.state.engine
+        cache: ResultCache = request.app.state.cache
+        spooled: list[tuple[str, SpooledUpload]] = []
         try:
-            text_pages, meta = extract_text_pages(BytesIO(blob))
-        except Exception as e:  # noqa: BLE001
-            raise HTTPException(status_code=400, detail=f"Failed to open/parse PDF: {e}") from e
+            for file in files:
+                spooled += await _receive_batch_files(
+                    file, settings, settings.spool_dir, settings.detect_max_files - len(spooled)
+                )
+            if not spooled:
+                raise HTTPException(status_code=400, detail="No PDF files in the upload.")
+            keys = [cache_key_for_digest(u.sha256, "detect") for _, u in spooled]
+            found: list[bytes | dict[str, str] | None] = list(
+                await asyncio.to_thread(lambda: [cache.get(k) for k in keys])
+            )
+            missing = [i for i, f in enumerate(found) if f is None]
+            if missing:
+                # One engine job for the whole batch: each file takes milliseconds.
+                try:
+                    detected = await engine.run(
+                        detect_pdf_paths, [str(spooled[i][1].path) for i in missing]
+                    )
+                except (EngineBusyError, EngineTimeoutError) as e:
+                    raise _http_error(e) from e
+                fresh: list[tuple[str, bytes]] = []
+                for i, result in zip(missing, detected, strict=True):
+                    found[i] = result
+                    if isinstance(result, bytes):
+                        fresh.append((keys[i], result))
+
+                def store() -> None:
+                    for k, payload in fresh:
+                        cache.put(k, payload)
 
-        # If PDF has no text layer, text_pages may be empty strings.
-        if all(not t.strip() for t in text_pages):
+                await asyncio.to_thread(store)
+        except TooManyFilesError as e:
+            raise HTTPException(status_code=400, detail=str(e)) from e
+        finally:
+            for _, upload in spooled:
+                upload.discard()
+
+        records = []
+        for (name, _), outcome in zip(spooled, found, strict=True):
+            # Spliced like job results: the file name in front of the stored object.
+            head = b'{"file":' + dumps(name)
+            if isinstance(outcome, bytes):
+                records.append(head + b"," + outcome[1:])
+            else:
+                records.append(head + b',"error":' + dumps(outcome) + b"}")
+        return Response(b'{"results":[' + b",".join(records) + b"]}", media_type="application/json")
+
+    @app.post("/v1/jobs", status_code=202)
+    async def create_job(
+        request: Request,
+        files: list[UploadFile] = File(...),
+        aggregate: bool = Query(False),
+    ) -> Response:
+        store: JobStore = request.app.state.jobs
+        runner: JobRunner = request.app.state.job_runner
+        # Job store calls may wait on another process's write lock: keep them off the loop.
+        queued = await asyncio.to_thread(store.queued)
+        room = settings.jobs_queue_limit - queued
+        spooled: list[tuple[str, SpooledUpload]] = []
+        try:
+            for file in files:
+                spooled += await _receive_batch_files(
+                    file, settings, str(store.upload_dir), room - len(spooled)
+                )
+            if not spooled:
+                raise HTTPException(status_code=400, detail="No PDF files in the upload.")
+            job_id = await asyncio.to_thread(
+                store.create, [(name, u.path, u.sha256) for name, u in spooled], aggregate
+            )
+        except TooManyFilesError as e:
+            for _, upload in spooled:
+                upload.discard()
             raise HTTPException(
-                status_code=422,
-                detail="PDF contains no extractable text (likely scanned). OCR is not enabled in this build.",
+                status_code=503,
+                detail=f"Job queue is full ({queued} files waiting, "
+                f"limit {settings.jobs_queue_limit}).",
+                headers={"Retry-After": str(runner.retry_after(max(1, queued)))},
+            ) from e
+        except BaseException:
+            for _, upload in spooled:
+                upload.discard()
+            raise
+        runner.notify()
+        await asyncio.to_thread(store.purge, settings.jobs_retention)
+        return Response(
+            dumps(await asyncio.to_thread(store.status, job_id)),
+            status_code=202,
+            media_type="application/json",
+            headers={"Location": f"/v1/jobs/{job_id}"},
+        )
+
+    @app.get("/v1/jobs/{job_id}")
+    def job_status(request: Request, job_id: str) -> dict[str, Any]:
+        store: JobStore = request.app.state.jobs
+        status = store.status(job_id)
+        if status is None:
+            raise HTTPException(status_code=404, detail="Unknown job.")
+        return status
+
+    @app.get("/v1/jobs/{job_id}/results")
+    async def job_results(request: Request, job_id: str, follow: bool = Query(False)) -> Response:
+        store: JobStore = request.app.state.jobs
+        runner: JobRunner = request.app.state.job_runner
+        if await asyncio.to_thread(store.pending, job_id) is None:
+            raise HTTPException(status_code=404, detail="Unknown job.")
+
+        async def body() -> AsyncIterator[bytes]:
+            seen = 0
+            while True:
+                # Read before the results: an item finishing in between is
+                # picked up by the next round instead of being missed.
+                pending = await asyncio.to_thread(store.pending, job_id)
+                lines = await asyncio.to_thread(store.results, job_id, seen)
+                for _, line in lines:
+                    yield line
+                if lines:
+                    seen = lines[-1][0]
+                if not follow or not pending:
+                    return
+                await runner.wait_finished(timeout=1.0)
+
+        return StreamingResponse(body(), media_type="application/x-ndjson")
+
+    @app.delete("/v1/jobs/{job_id}", status_code=204)
+    def delete_job(request: Request, job_id: str) -> Response:
+        store: JobStore = request.app.state.jobs
+        if not store.delete(job_id):
+            raise HTTPException(status_code=404, detail="Unknown job.")
+        return Response(status_code=204)
+
+    return app
+
+
+def _observe(metrics: Metrics, timer: StageTimer, doc_type: str, pages: int, total: float) -> None:
+    for stage, seconds in timer.stages.items():
+        metrics.stage_seconds.observe(seconds, stage=stage, doc_type=doc_type)
+    metrics.parse_seconds.observe(total, doc_type=doc_type)
+    if pages:
+        metrics.pages.inc(pages, doc_type=doc_type)
+        metrics.pages_per_second.observe(pages / max(total, 1e-9), doc_type=doc_type)
+
+
+async def _receive_upload(file: UploadFile, settings: Settings) -> SpooledUpload:
+    """Spool the multipart file to a named temp file; the caller owns (and discards) it."""
+    try:
+        upload = await asyncio.to_thread(
+            spool_upload, file.file, settings.max_upload_bytes, settings.spool_dir
+        )
+    except UploadTooLargeError as e:
+        raise _http_error(e) from e
+    finally:
+        # Drop the framework's own spooled copy now rather than after the response.
+        await file.close()
+    if upload.size == 0:
+        upload.discard()
+        raise HTTPException(status_code=400, detail="Empty file.")
+    return upload
+
+
+async def _receive_batch_files(
+    file: UploadFile, settings: Settings, directory: str | None, max_files: int
+) -> list[tuple[str, SpooledUpload]]:
+    """Spool one multipart file of a batch request: a PDF, or every PDF inside a zip."""
+    name = file.filename or "upload.pdf"
+    try:
+        if file.content_type in ZIP_CONTENT_TYPES or name.lower().endswith(".zip"):
+            return await asyncio.to_thread(
+                spool_zip, file.file, settings.max_upload_bytes, max_files, directory
             )
+        if file.content_type not in ("application/pdf", "application/octet-stream"):
+            raise HTTPException(status_code=415, detail="Only PDF or zip uploads are supported.")
+        if max_files <= 0:
+            raise TooManyFilesError(max_files)
+        upload = await asyncio.to_thread(
+            spool_upload, file.file, settings.max_upload_bytes, directory
+        )
+        # Bad and empty PDFs are accepted here and reported per file.
+        return [(name, upload)]
+    except UploadTooLargeError as e:
+        raise _http_error(e) from e
+    except (zipfile.BadZipFile, RuntimeError, NotImplementedError) as e:
+        # RuntimeError: encrypted member; NotImplementedError: unsupported compression.
+        raise HTTPException(status_code=400, detail=f"Failed to read zip {name}: {e}") from e
+    finally:
+        await file.close()
+
+
+def _retry_after(app: FastAPI) -> int:
+    engine: ExtractionEngine | None = getattr(app.state, "engine", None)
+    return engine.retry_after() if engine is not None else 1
 
-        result = parse_document(text_pages, meta)
-        return JSONResponse(
-            {
-                "doc_type": result.doc_type,
-                "meta": result.meta,
-                "data": result.data,
-            }
+
+def _http_error(e: Exception) -> HTTPException:
+    if isinstance(e, EngineBusyError):
+        return HTTPException(
+            status_code=503,
+            detail="Server is busy, try again later.",
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    if isinstance(e, UploadTooLargeError):
+        return HTTPException(status_code=413, detail=str(e))
+    if isinstance(e, EngineTimeoutError):
+        return HTTPException(status_code=504, detail="PDF processing timed out.")
+    if isinstance(e, NoTextLayerError):
+        return HTTPException(
+            status_code=422,
+            detail="PDF contains no extractable text (likely scanned). OCR is not enabled in this build.",
         )
+    return HTTPException(status_code=400, detail=f"Failed to open/parse PDF: {e}")
 
-    return app
+
+async def _stream_ndjson(
+    engine: ExtractionEngine,
+    upload: SpooledUpload,
+    settings: Settings,
+    page_cache: PageCache | None,
+    options: ParserOptions | None,
+    metrics: Metrics,
+    started: float,
+) -> Response:
+    """Parse as NDJSON (header record first, then one line per item) and send it.
+
+    The engine worker writes the lines to a spooled file as the parser produces
+    them, so the job gets the same ``job_timeout``, kill and metrics as a JSON
+    parse, and neither the full result nor its serialised body is held in memory.
+    Takes ownership of ``upload``; the output file is removed when the response
+    closes, whether or not it was sent.
+    """
+    fd, name = tempfile.mkstemp(prefix="pdf-parser-", suffix=".ndjson", dir=settings.spool_dir)
+    os.close(fd)
+    out = Path(name)
+    with collect_stages() as timer:
+        timer.add("upload", time.perf_counter() - started)
+        try:
+            run_started = time.perf_counter()
+            job = await engine.run(
+                stream_pdf_path_timed,
+                str(upload.path),
+                name,
+                settings.page_jobs,
+                page_cache,
+                options,
+            )
+        except (EngineBusyError, EngineTimeoutError, PdfOpenError, NoTextLayerError) as e:
+            out.unlink(missing_ok=True)
+            raise _http_error(e) from e
+        except BaseException:
+            out.unlink(missing_ok=True)
+            raise
+        finally:
+            upload.discard()
+        wall = time.perf_counter() - run_started
+        timer.merge(job.stages)
+        timer.add("queue", max(0.0, wall - sum(job.stages.values())))
+    _observe(metrics, timer, job.doc_type, job.pages, time.perf_counter() - started)
+
+    fh = out.open("rb")
+
+    async def body() -> AsyncIterator[bytes]:
+        while chunk := await asyncio.to_thread(fh.read, UPLOAD_CHUNK_BYTES):
+            yield chunk
+
+    async def cleanup() -> None:
+        fh.close()
+        out.unlink(missing_ok=True)
+
+    return _ClosingStreamingResponse(body(), cleanup, media_type="application/x-ndjson")
+
+
+class _ClosingStreamingResponse(StreamingResponse):
+    """A :class:`StreamingResponse` that runs ``on_close`` however the exchange ends.
+
+    The body generator's own ``finally`` only runs if the body is iterated; a client
+    that disconnects before streaming starts (or a failed send) would skip it.
+    """
+
+    def __init__(
+        self,
+        content: AsyncIterator[bytes],
+        on_close: Callable[[], Awaitable[None]],
+        media_type: str,
+    ) -> None:
+        super().__init__(content, media_type=media_type)
+        self._on_close = on_close
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self._on_close()
+
+
+def _json_response(
+    payload: bytes, cache_status: str, timer: StageTimer, started: float, settings: Settings
+) -> Response:
+    headers = {"X-Cache": cache_status}
+    if settings.server_timing:
+        headers["Server-Timing"] = server_timing(timer.ordered(), time.perf_counter() - started)
+    return Response(content=payload, media_type="application/json", headers=headers)
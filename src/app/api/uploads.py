@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+import zipfile
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, BinaryIO
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+# Room for multipart boundaries, part headers and small form fields on top of the file.
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+ZIP_CONTENT_TYPES = ("application/zip", "application/x-zip-compressed")
+
+
+class UploadTooLargeError(ValueError):
+    def __init__(self, limit: int) -> None:
+        super().__init__(f"File too large (limit {limit // (1024 * 1024)}MB).")
+        self.limit = limit
+
+
+class TooManyFilesError(ValueError):
+    def __init__(self, limit: int) -> None:
+        super().__init__(f"Too many files (limit {limit}).")
+        self.limit = limit
+
+
+@dataclass(frozen=True)
+class SpooledUpload:
+    """An upload copied to a named temp file, ready to be opened by path in any process."""
+
+    path: Path
+    size: int
+    sha256: str
+
+    def discard(self) -> None:
+        self.path.unlink(missing_ok=True)
+
+
+def spool_upload(src: IO[bytes], limit: int, directory: str | None = None) -> SpooledUpload:
+    """Copy ``src`` to a temp file in fixed-size chunks, hashing it on the way.
+
+    Memory use is one chunk regardless of the upload size. Raises
+    :class:`UploadTooLargeError` as soon as more than ``limit`` bytes have been read;
+    the partial file is removed.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    fd, name = tempfile.mkstemp(prefix="pdf-parser-", suffix=".pdf", dir=directory)
+    path = Path(name)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while chunk := src.read(UPLOAD_CHUNK_BYTES):
+                size += len(chunk)
+                if size > limit:
+                    raise UploadTooLargeError(limit)
+                digest.update(chunk)
+                out.write(chunk)
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+    return SpooledUpload(path=path, size=size, sha256=digest.hexdigest())
+
+
+def spool_zip(
+    src: BinaryIO, limit: int, max_files: int, directory: str | None = None
+) -> list[tuple[str, SpooledUpload]]:
+    """Spool every ``*.pdf`` member of a zip archive, as ``(member name, upload)``.
+
+    Members are decompressed chunk by chunk through :func:`spool_upload`, so each
+    one is bounded by ``limit`` whatever its declared size. Raises
+    :class:`TooManyFilesError` past ``max_files`` members, ``zipfile.BadZipFile``
+    (or ``RuntimeError`` for encrypted members); already spooled files are removed.
+    """
+    spooled: list[tuple[str, SpooledUpload]] = []
+    try:
+        with zipfile.ZipFile(src) as archive:
+            for info in archive.infolist():
+                name = info.filename
+                # Skip folders and the resource forks macOS adds (__MACOSX/._x.pdf).
+                if info.is_dir() or name.startswith("__MACOSX/"):
+                    continue
+                if not name.lower().endswith(".pdf"):
+                    continue
+                if len(spooled) >= max_files:
+                    raise TooManyFilesError(max_files)
+                with archive.open(info) as member:
+                    spooled.append((name, spool_upload(member, limit, directory)))
+    except BaseException:
+        for _, upload in spooled:
+            upload.discard()
+        raise
+    return spooled
+
+
+class BodyLimitMiddleware:
+    """Reject request bodies over ``max_body_bytes`` with 413 while they are still arriving.
+
+    Form parsing reads the whole body before a route runs, so the route-level check
+    alone would only fire after an oversized upload has been received in full. A
+    declared ``Content-Length`` over the limit is refused before reading anything;
+    otherwise the byte count is checked per received chunk. ``overrides`` maps exact
+    paths to their own ``(max_body_bytes, detail)``.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        max_body_bytes: int,
+        detail: str,
+        overrides: Mapping[str, tuple[int, str]] | None = None,
+    ) -> None:
+        self.app = app
+        self.max_body_bytes = max_body_bytes
+        self.detail = detail
+        self.overrides = dict(overrides or {})
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        max_body_bytes, detail = self.overrides.get(
+            scope["path"], (self.max_body_bytes, self.detail)
+        )
+        declared = dict(scope["headers"]).get(b"content-length", b"")
+        if declared.isdigit() and int(declared) > max_body_bytes:
+            response = JSONResponse({"detail": detail}, status_code=413)
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_body_bytes:
+                    # Raised inside body parsing; FastAPI passes HTTPExceptions through.
+                    raise HTTPException(status_code=413, detail=detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+class UploadBudgetMiddleware:
+    """Cap the request body bytes held by requests in flight, summed, at ``max_bytes``.
+
+    The per-request limit bounds one upload; this bounds many at once (200 parallel
+    20 MB uploads are 4 GB of spool and parse memory). A request reserves its
+    declared ``Content-Length`` before anything is read and gets 429 with
+    ``Retry-After`` if the total would go over; a body without a length reserves
+    chunk by chunk and is cut off the same way. Reservations are returned when the
+    response has been sent, i.e. after the upload was parsed. A request arriving
+    while nothing else is reserved is always admitted.
+    """
+
+    def __init__(self, app: ASGIApp, max_bytes: int, retry_after: Callable[[], int]) -> None:
+        self.app = app
+        self.max_bytes = max_bytes
+        self.retry_after = retry_after
+        self.inflight = 0
+
+    def _fits(self, size: int, own: int = 0) -> bool:
+        # ``own``: bytes the asking request already holds; alone, it always fits.
+        return self.inflight == own or self.inflight + size <= self.max_bytes
+
+    def _detail(self) -> str:
+        return (
+            f"Too many uploads in progress (limit {self.max_bytes // (1024 * 1024)}MB in flight)."
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self.max_bytes <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        declared = dict(scope["headers"]).get(b"content-length", b"")
+        reserved = int(declared) if declared.isdigit() else 0
+        if reserved and not self._fits(reserved):
+            response = JSONResponse(
+                {"detail": self._detail()},
+                status_code=429,
+                headers={"Retry-After": str(self.retry_after())},
+            )
+            await response(scope, receive, send)
+            return
+        self.inflight += reserved
+        received = 0
+
+        async def counted_receive() -> Message:
+            nonlocal received, reserved
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > reserved:
+                    extra = received - reserved
+                    if not self._fits(extra, reserved):
+                        raise HTTPException(
+                            status_code=429,
+                            detail=self._detail(),
+                            headers={"Retry-After": str(self.retry_after())},
+                        )
+                    self.inflight += extra
+                    reserved = received
+            return message
+
+        try:
+            await self.app(scope, counted_receive, send)
+        finally:
+            self.inflight -= reserved
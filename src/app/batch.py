@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import glob
+import json
+import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, as_completed, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, TextIO
+
+from app.parsers.manifest import ParserOptions
+from app.pipeline import detect_pdf, parse_pdf
+from app.serialization import dumps
+
+
+@dataclass
+class BatchReport:
+    files: int = 0
+    ok: int = 0
+    errors: int = 0
+    skipped: int = 0
+    pages: int = 0
+    elapsed: float = 0.0
+
+    def summary(self) -> str:
+        elapsed = max(self.elapsed, 1e-9)
+        return (
+            f"{self.files} files ({self.ok} ok, {self.errors} errors, {self.skipped} skipped), "
+            f"{self.pages} pages in {self.elapsed:.2f}s — "
+            f"{self.files / elapsed:.1f} files/s, {self.pages / elapsed:.1f} pages/s"
+        )
+
+
+def iter_inputs(specs: Iterable[str]) -> Iterator[Path]:
+    """Expand directories (recursively, ``*.pdf``), globs and plain paths, without duplicates."""
+    seen: set[Path] = set()
+    for spec in specs:
+        spec = spec.strip()
+        if not spec:
+            continue
+        path = Path(spec)
+        if path.is_dir():
+            candidates = sorted(p for p in path.rglob("*") if p.suffix.lower() == ".pdf")
+        elif glob.has_magic(spec):
+            candidates = sorted(Path(p) for p in glob.glob(spec, recursive=True))
+        else:
+            candidates = [path]
+        for p in candidates:
+            if p not in seen:
+                seen.add(p)
+                yield p
+
+
+def already_done(output: Path) -> set[str]:
+    """Files recorded in an existing JSON Lines output (for ``--resume``)."""
+    done: set[str] = set()
+    if not output.exists():
+        return done
+    with output.open(encoding="utf-8") as fh:
+        for line in fh:
+            try:
+                done.add(json.loads(line)["file"])
+            except (ValueError, KeyError, TypeError):
+                # A torn last line from an interrupted run; the file gets redone.
+                continue
+    return done
+
+
+def parse_file_record(path: str, options: ParserOptions | None = None) -> tuple[str, int, bool]:
+    """Worker job: one compact JSON line for ``path``, its page count and success flag."""
+    record: dict[str, Any] = {"file": path}
+    pages = 0
+    try:
+        result = parse_pdf(Path(path), options=options)
+    except Exception as e:  # noqa: BLE001 - a bad file must not stop the batch
+        record["error"] = {"type": type(e).__name__, "message": str(e)}
+    else:
+        record.update(result.to_dict())
+        pages = int(result.meta.get("pages") or 0)
+    return dumps(record).decode("utf-8"), pages, "error" not in record
+
+
+def detect_file_record(path: str) -> tuple[str, int, bool]:
+    """Like :func:`parse_file_record`, with :func:`detect_pdf` output (no pages parsed)."""
+    record: dict[str, Any] = {"file": path}
+    try:
+        record.update(detect_pdf(Path(path)))
+    except Exception as e:  # noqa: BLE001
+        record["error"] = {"type": type(e).__name__, "message": str(e)}
+    return dumps(record).decode("utf-8"), 0, "error" not in record
+
+
+FileRecord = Callable[[str], tuple[str, int, bool]]
+
+
+def run_batch(
+    paths: Iterable[Path],
+    out: TextIO,
+    jobs: int = 1,
+    skip: set[str] | None = None,
+    record: FileRecord = parse_file_record,
+) -> BatchReport:
+    """Run ``record`` (parse, by default) over ``paths`` with ``jobs`` processes,
+    streaming one JSON line per finished file."""
+    report = BatchReport()
+    skip = skip or set()
+    started = time.perf_counter()
+
+    def emit(line: str, pages: int, ok: bool) -> None:
+        out.write(line + "\n")
+        out.flush()
+        report.files += 1
+        report.pages += pages
+        if ok:
+            report.ok += 1
+        else:
+            report.errors += 1
+
+    todo = (str(p) for p in paths)
+    if jobs <= 1:
+        for name in todo:
+            if name in skip:
+                report.skipped += 1
+                continue
+            emit(*record(name))
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            # Keep a bounded window in flight so huge file lists don't pile up futures.
+            window = jobs * 4
+            in_flight: set[Future[tuple[str, int, bool]]] = set()
+            for name in todo:
+                if name in skip:
+                    report.skipped += 1
+                    continue
+                in_flight.add(executor.submit(record, name))
+                # Emit whatever has finished; block only when the window is full.
+                timeout = None if len(in_flight) >= window else 0
+                done, in_flight = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+                for f in done:
+                    emit(*f.result())
+            for f in as_completed(in_flight):
+                emit(*f.result())
+
+    report.elapsed = time.perf_counter() - started
+    return report
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from app.parsers.manifest import ParserOptions
+from app.parsers.registry import registry_version
+
+
+@dataclass
+class CacheStats:
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+
+
+def cache_key(blob: bytes) -> str:
+    """Content address of a parse result: SHA-256 of the PDF + parser-registry version."""
+    return cache_key_for_digest(hashlib.sha256(blob).hexdigest())
+
+
+def cache_key_for_file(fh: io.BufferedReader | io.BytesIO, variant: str = "") -> str:
+    return cache_key_for_digest(hashlib.file_digest(fh, "sha256").hexdigest(), variant)
+
+
+def cache_key_for_digest(sha256: str, variant: str = "") -> str:
+    """Cache key from an already computed SHA-256 hex digest (e.g. hashed while spooling).
+
+    ``variant`` tells apart different outputs for the same PDF (e.g. ``"aggregate"``).
+    """
+    key = f"{sha256}:{registry_version()}"
+    return f"{key}:{variant}" if variant else key
+
+
+def result_variant(aggregate: bool, options: ParserOptions | None = None) -> str:
+    """``variant`` of a parse result: ``"aggregate"`` and non-default parser options."""
+    parts = ["aggregate"] if aggregate else []
+    if options is not None and options.variant:
+        parts.append(options.variant)
+    return "+".join(parts)
+
+
+class ResultCache:
+    """Two-tier cache of encoded parse results (compact JSON bytes).
+
+    The memory tier is an LRU bounded by entry count and total payload bytes. The
+    optional disk tier is a single SQLite file with zlib-compressed payloads; it
+    survives restarts and is shared by the API and the CLI when they point at the
+    same directory. Entries are immutable, so the disk tier is never evicted by
+    this class — wipe the directory to reclaim space.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, disk_dir: Path | None = None) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._db: sqlite3.Connection | None = None
+        if disk_dir is not None:
+            disk_dir.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(disk_dir / "results.sqlite3", check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, payload BLOB NOT NULL, created REAL NOT NULL)"
+            )
+            self._db.commit()
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is not None:
+                self._entries.move_to_end(key)
+                self.stats.memory_hits += 1
+                return payload
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT payload FROM results WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    payload = zlib.decompress(row[0])
+                    self._remember(key, payload)
+                    self.stats.disk_hits += 1
+                    return payload
+            self.stats.misses += 1
+            return None
+
+    def put(self, key: str, payload: bytes) -> None:
+        with self._lock:
+            self._remember(key, payload)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO results (key, payload, created) VALUES (?, ?, ?)",
+                    (key, zlib.compress(payload, 6), time.time()),
+                )
+                self._db.commit()
+            self.stats.stores += 1
+
+    def snapshot(self) -> dict[str, int]:
+        with self._lock:
+            return {**asdict(self.stats), "entries": len(self._entries), "bytes": self._bytes}
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def _remember(self, key: str, payload: bytes) -> None:
+        if self.max_entries <= 0 or len(payload) > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= len(old)
+        self._entries[key] = payload
+        self._bytes += len(payload)
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+            self.stats.evictions += 1
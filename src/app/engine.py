@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import multiprocessing
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import suppress
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+
+class EngineBusyError(RuntimeError):
+    """No parse slot: the wait queue is full, or the wait timed out."""
+
+    def __init__(self, retry_after: int) -> None:
+        super().__init__(f"Extraction engine is busy, retry in {retry_after}s.")
+        self.retry_after = retry_after
+
+
+class EngineTimeoutError(RuntimeError):
+    """A job exceeded its time budget; the worker running it was killed."""
+
+
+def preload() -> None:
+    """Import pdfplumber, the pipeline and every registered parser module.
+
+    Run in each pool worker, and by ``serve --workers`` before forking, so the
+    import cost is paid once and not by the first job that needs a module.
+    """
+    import pdfplumber  # noqa: F401
+
+    import app.pipeline  # noqa: F401
+    from app.parsers.registry import parser_specs
+
+    for spec in parser_specs():
+        spec.load()
+
+
+def _init_worker() -> None:
+    from app.utils.pdf import disable_page_workers
+
+    # The engine's workers are the parallelism; see disable_page_workers.
+    disable_page_workers()
+    preload()
+
+
+def _noop() -> None:
+    return None
+
+
+class ConcurrencyLimit:
+    """How many jobs the engine runs at once.
+
+    Fixed at ``ceiling`` unless ``adaptive``: then the limit follows job latency,
+    as in gradient-based limiters. A slow moving average of the per-page latency
+    stands for the unloaded latency and a fast one for the current latency; while
+    the current latency stays within ``tolerance`` times the baseline the limit
+    grows by about its square root per sample, above it the limit shrinks in
+    proportion. The limit stays within ``[1, ceiling]``.
+    """
+
+    def __init__(self, ceiling: int, adaptive: bool = False, tolerance: float = 1.5) -> None:
+        self.ceiling = max(1, ceiling)
+        self.adaptive = adaptive
+        self.tolerance = tolerance
+        self._limit = float(self.ceiling)
+        self._baseline: float | None = None
+        self._current = 0.0
+
+    @property
+    def value(self) -> int:
+        return max(1, int(self._limit))
+
+    def observe(self, seconds: float, inflight: int) -> None:
+        """Feed the latency of a finished job and how many ran alongside it."""
+        if not self.adaptive:
+            return
+        if self._baseline is None:
+            self._baseline = self._current = seconds
+            return
+        self._current = 0.5 * self._current + 0.5 * seconds
+        self._baseline = 0.99 * self._baseline + 0.01 * seconds
+        # A mostly idle engine says nothing about whether more jobs would fit.
+        if inflight * 2 < self._limit:
+            return
+        gradient = max(0.5, min(1.0, self.tolerance * self._baseline / max(self._current, 1e-9)))
+        target = self._limit * gradient + math.sqrt(self._limit)
+        self._limit = max(1.0, min(float(self.ceiling), 0.8 * self._limit + 0.2 * target))
+
+
+class ExtractionEngine:
+    """Runs CPU-bound PDF jobs off the event loop.
+
+    ``workers > 0`` uses a process pool so throughput scales with cores inside a
+    single uvicorn process; ``workers == 0`` falls back to a thread (handy for tests
+    and tiny deployments, but stuck jobs cannot be killed).
+
+    Admission: at most ``limit.value`` jobs run at once (``max_concurrency``,
+    default one per worker; tuned from latency with ``adaptive``). Up to
+    ``queue_depth`` more wait in FIFO order for at most ``queue_timeout`` seconds;
+    beyond that, or after the wait, :class:`EngineBusyError` is raised instead of
+    queueing unboundedly.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        queue_depth: int,
+        job_timeout: float,
+        max_concurrency: int = 0,
+        queue_timeout: float = 30.0,
+        adaptive: bool = False,
+    ) -> None:
+        self.workers = max(0, workers)
+        self.queue_depth = max(0, queue_depth)
+        self.job_timeout = job_timeout
+        self.queue_timeout = queue_timeout
+        self.limit = ConcurrencyLimit(max_concurrency or max(1, self.workers), adaptive)
+        self._active = 0
+        self._waiters: deque[asyncio.Future[None]] = deque()
+        # One single-process pool per worker, and the indices of idle ones.
+        self._executors: list[ProcessPoolExecutor] = []
+        self._idle: asyncio.Queue[int] | None = None
+        # Exponential moving average of job wall time, used for Retry-After hints.
+        self._avg_job_seconds = 1.0
+
+    @property
+    def pending(self) -> int:
+        """Jobs running plus jobs waiting for a slot."""
+        return self._active + len(self._waiters)
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    @property
+    def avg_job_seconds(self) -> float:
+        return self._avg_job_seconds
+
+    def start(self) -> None:
+        if self.workers == 0 or self._executors:
+            return
+        self._executors = [self._new_executor() for _ in range(self.workers)]
+        self._idle = asyncio.Queue()
+        # ProcessPoolExecutor spawns lazily; push a no-op to every worker so the whole
+        # pool is up (and warm) before the first upload arrives.
+        for f in [executor.submit(_noop) for executor in self._executors]:
+            f.result()
+        for index in range(self.workers):
+            self._idle.put_nowait(index)
+
+    def shutdown(self) -> None:
+        for executor in self._executors:
+            executor.shutdown(wait=True, cancel_futures=True)
+        self._executors = []
+        self._idle = None
+
+    def retry_after(self) -> int:
+        backlog = self.pending / self.limit.value
+        return max(1, min(60, math.ceil(self._avg_job_seconds * backlog)))
+
+    async def acquire(self) -> None:
+        """Take a job slot, waiting in the queue if needed, or raise :class:`EngineBusyError`.
+
+        For work done outside :meth:`run` (e.g. a streamed response); pair with
+        :meth:`release`.
+        """
+        if self._active < self.limit.value and not self._waiters:
+            self._active += 1
+            return
+        if len(self._waiters) >= self.queue_depth:
+            raise EngineBusyError(self.retry_after())
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except TimeoutError:
+            raise EngineBusyError(self.retry_after()) from None
+        except asyncio.CancelledError:
+            # The slot may have been handed over just as the request went away.
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def release(self) -> None:
+        self._active -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        # Slots are handed to waiters directly, so a new arrival cannot jump the queue.
+        while self._waiters and self._active < self.limit.value:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                self._active += 1
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        await self.acquire()
+        inflight = self._active
+        started = time.monotonic()
+        pages = 1
+        try:
+            result = await self._execute(fn, *args)
+            # Jobs that report their size (e.g. TimedPayload) feed the adaptive limit
+            # per-page latency, so big and small documents compare.
+            pages = max(1, int(getattr(result, "pages", 1) or 1))
+            return result
+        finally:
+            elapsed = time.monotonic() - started
+            self._avg_job_seconds = 0.8 * self._avg_job_seconds + 0.2 * elapsed
+            self.limit.observe(elapsed / pages, inflight)
+            self.release()
+
+    async def _execute(self, fn: Callable[..., T], *args: Any) -> T:
+        if self.workers == 0:
+            return await asyncio.wait_for(asyncio.to_thread(fn, *args), self.job_timeout)
+        return await self._run_in_pool(fn, *args)
+
+    async def _run_in_pool(self, fn: Callable[..., T], *args: Any) -> T:
+        if not self._executors:
+            self.start()
+        assert self._idle is not None
+        index = await self._idle.get()
+        executor = self._executors[index]
+        future = executor.submit(fn, *args)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.job_timeout)
+        except TimeoutError as e:
+            self._replace(index)
+            raise EngineTimeoutError(f"Job exceeded {self.job_timeout:g}s and was killed.") from e
+        except BrokenProcessPool as e:
+            # The worker died under the job (e.g. an OOM kill).
+            self._replace(index)
+            raise EngineBusyError(self.retry_after()) from e
+        finally:
+            # Back in rotation once its job is over: a cancelled request's job may
+            # still be running there.
+            self._free_when_done(future, index, executor)
+
+    def _free_when_done(self, future: Future[Any], index: int, executor: Executor) -> None:
+        loop = asyncio.get_running_loop()
+        idle = self._idle
+
+        def free() -> None:
+            # A replaced worker's slot is freed by its replacement.
+            if idle is self._idle and idle is not None and self._executors[index] is executor:
+                idle.put_nowait(index)
+
+        def done(_: Future[Any]) -> None:
+            with suppress(RuntimeError):  # the loop is gone: nobody waits for the slot
+                loop.call_soon_threadsafe(free)
+
+        future.add_done_callback(done)
+
+    def _replace(self, index: int) -> None:
+        """Kill worker ``index`` and start a fresh one in its place.
+
+        ProcessPoolExecutor cannot cancel a running task, so the only way to stop a
+        stuck pdfminer loop is to terminate its process. Each worker is a pool of
+        its own, so jobs running on the other workers are not affected. The new
+        worker takes jobs once it has started and preloaded, so the next job's
+        ``job_timeout`` does not pay for that.
+        """
+        old = self._executors[index]
+        assert isinstance(old, ProcessPoolExecutor)
+        for proc in list((old._processes or {}).values()):
+            proc.kill()
+        old.shutdown(wait=False, cancel_futures=True)
+        new = self._executors[index] = self._new_executor()
+        self._free_when_done(new.submit(_noop), index, new)
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        # One process per executor: a stuck job can be killed without the others.
+        # "spawn" keeps workers independent from the server's threads and event loop.
+        return ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        )
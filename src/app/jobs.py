@@ -0,0 +1,343 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import math
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+from collections.abc import Sequence
+from contextlib import suppress
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from app.cache import ResultCache, cache_key_for_digest, result_variant
+from app.engine import EngineBusyError, ExtractionEngine
+from app.page_cache import PageCache
+from app.parsers.manifest import ParserOptions
+from app.pipeline import parse_pdf_path_to_json
+from app.serialization import dumps
+
+# Item states; a job's state is derived from its items.
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    created REAL NOT NULL,
+    aggregate INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS items (
+    job_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    path TEXT NOT NULL,
+    sha256 TEXT NOT NULL,
+    status TEXT NOT NULL,
+    -- Finishing order within the job, so results can be followed as they arrive.
+    finished_seq INTEGER,
+    error TEXT,
+    result BLOB,
+    PRIMARY KEY (job_id, idx)
+);
+CREATE INDEX IF NOT EXISTS items_status ON items (status);
+"""
+
+
+@dataclass(frozen=True)
+class JobItem:
+    """One file of a job, as handed to a worker."""
+
+    job_id: str
+    index: int
+    name: str
+    path: str
+    sha256: str
+    aggregate: bool
+
+
+class JobStore:
+    """Durable state of the async job API: one SQLite file plus the queued uploads.
+
+    Items move ``queued -> running -> done | failed``. Items found ``running`` when
+    the store is opened (with ``recover``) were interrupted by a restart and are
+    queued again, so accepted work is never lost as long as ``directory`` is kept.
+    Results are stored zlib-compressed, as in the result cache.
+    """
+
+    def __init__(self, directory: Path, recover: bool = True) -> None:
+        self.upload_dir = directory / "uploads"
+        self.upload_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(directory / "jobs.sqlite3", timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        if recover:
+            # Several server processes may share the directory (serve --workers); only
+            # the first opener may requeue, or it would take items the others run.
+            self._db.execute("UPDATE items SET status = ? WHERE status = ?", (QUEUED, RUNNING))
+        self._db.commit()
+
+    def create(self, files: Sequence[tuple[str, Path, str]], aggregate: bool = False) -> str:
+        """Queue ``(name, spooled path, sha256)`` files as a new job; returns its id."""
+        job_id = uuid.uuid4().hex
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT INTO jobs (id, created, aggregate) VALUES (?, ?, ?)",
+                (job_id, time.time(), int(aggregate)),
+            )
+            self._db.executemany(
+                "INSERT INTO items (job_id, idx, name, path, sha256, status)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (job_id, i, name, str(path), sha256, QUEUED)
+                    for i, (name, path, sha256) in enumerate(files)
+                ],
+            )
+        return job_id
+
+    def claim(self) -> JobItem | None:
+        """Mark the oldest queued item as running and return it."""
+        with self._lock, self._db:
+            # One statement, so two processes sharing the store never claim the same item.
+            row = self._db.execute(
+                "UPDATE items SET status = ? WHERE rowid ="
+                " (SELECT rowid FROM items WHERE status = ? ORDER BY rowid LIMIT 1)"
+                " RETURNING job_id, idx, name, path, sha256,"
+                " (SELECT aggregate FROM jobs WHERE id = items.job_id)",
+                (RUNNING, QUEUED),
+            ).fetchone()
+        if row is None:
+            return None
+        return JobItem(row[0], row[1], row[2], row[3], row[4], bool(row[5]))
+
+    def finish(
+        self, item: JobItem, payload: bytes | None, error: dict[str, str] | None = None
+    ) -> None:
+        """Record an item's result (compact JSON bytes) or its error."""
+        blob = zlib.compress(payload, 6) if payload is not None else None
+        with self._lock, self._db:
+            self._db.execute(
+                "UPDATE items SET status = ?, result = ?, error = ?, finished_seq ="
+                " (SELECT COALESCE(MAX(finished_seq), 0) + 1 FROM items WHERE job_id = ?)"
+                " WHERE job_id = ? AND idx = ?",
+                (
+                    DONE if error is None else FAILED,
+                    blob,
+                    dumps(error).decode("utf-8") if error is not None else None,
+                    item.job_id,
+                    item.job_id,
+                    item.index,
+                ),
+            )
+
+    def queued(self) -> int:
+        with self._lock:
+            return int(
+                self._db.execute(
+                    "SELECT COUNT(*) FROM items WHERE status IN (?, ?)", (QUEUED, RUNNING)
+                ).fetchone()[0]
+            )
+
+    def pending(self, job_id: str) -> int | None:
+        """Items of a job not finished yet; None if the job is unknown."""
+        with self._lock:
+            if self._db.execute("SELECT 1 FROM jobs WHERE id = ?", (job_id,)).fetchone() is None:
+                return None
+            return int(
+                self._db.execute(
+                    "SELECT COUNT(*) FROM items WHERE job_id = ? AND status IN (?, ?)",
+                    (job_id, QUEUED, RUNNING),
+                ).fetchone()[0]
+            )
+
+    def status(self, job_id: str) -> dict[str, Any] | None:
+        """Progress of a job and the state of each of its files; None if unknown."""
+        with self._lock:
+            job = self._db.execute(
+                "SELECT created, aggregate FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            if job is None:
+                return None
+            rows = self._db.execute(
+                "SELECT idx, name, status, error FROM items WHERE job_id = ? ORDER BY idx",
+                (job_id,),
+            ).fetchall()
+        counts = dict.fromkeys((QUEUED, RUNNING, DONE, FAILED), 0)
+        items = []
+        for idx, name, state, error in rows:
+            counts[state] += 1
+            item: dict[str, Any] = {"index": idx, "file": name, "status": state}
+            if error is not None:
+                item["error"] = json.loads(error)
+            items.append(item)
+        finished = counts[DONE] + counts[FAILED]
+        if finished == len(rows):
+            state = DONE
+        elif finished or counts[RUNNING]:
+            state = RUNNING
+        else:
+            state = QUEUED
+        return {
+            "id": job_id,
+            "status": state,
+            "created": datetime.fromtimestamp(job[0], UTC).isoformat(timespec="seconds"),
+            "aggregate": bool(job[1]),
+            "total": len(rows),
+            **counts,
+            "progress": round(finished / len(rows), 4) if rows else 1.0,
+            "items": items,
+        }
+
+    def results(self, job_id: str, after: int = 0) -> list[tuple[int, bytes]]:
+        """NDJSON lines of the items finished after ``after``, as ``(finished_seq, line)``.
+
+        A line is the item's parse result with ``file`` and ``index`` in front, or
+        ``{"file", "index", "error"}`` — the record format of ``pdf-parser batch``.
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT finished_seq, idx, name, error, result FROM items"
+                " WHERE job_id = ? AND finished_seq > ? ORDER BY finished_seq",
+                (job_id, after),
+            ).fetchall()
+        lines = []
+        for seq, idx, name, error, result in rows:
+            head = b'{"file":' + dumps(name) + b',"index":' + str(idx).encode()
+            if error is not None:
+                body = b',"error":' + error.encode("utf-8") + b"}"
+            else:
+                # Splice the stored object in rather than decoding and re-encoding it.
+                body = b"," + zlib.decompress(result)[1:]
+            lines.append((seq, head + body + b"\n"))
+        return lines
+
+    def delete(self, job_id: str) -> bool:
+        """Forget a job; its queued uploads are removed and its items never run."""
+        with self._lock, self._db:
+            paths = self._db.execute(
+                "SELECT path FROM items WHERE job_id = ? AND status = ?", (job_id, QUEUED)
+            ).fetchall()
+            self._db.execute("DELETE FROM items WHERE job_id = ?", (job_id,))
+            deleted = self._db.execute("DELETE FROM jobs WHERE id = ?", (job_id,)).rowcount
+        for (path,) in paths:
+            Path(path).unlink(missing_ok=True)
+        return bool(deleted)
+
+    def purge(self, older_than: float) -> int:
+        """Delete finished jobs created more than ``older_than`` seconds ago."""
+        cutoff = time.time() - older_than
+        with self._lock, self._db:
+            ids = self._db.execute(
+                "SELECT id FROM jobs WHERE created < ? AND NOT EXISTS"
+                " (SELECT 1 FROM items WHERE job_id = jobs.id AND status IN (?, ?))",
+                (cutoff, QUEUED, RUNNING),
+            ).fetchall()
+            self._db.executemany("DELETE FROM items WHERE job_id = ?", ids)
+            self._db.executemany("DELETE FROM jobs WHERE id = ?", ids)
+        return len(ids)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class JobRunner:
+    """Background tasks that parse queued job items through the extraction engine.
+
+    ``concurrency`` items are in flight at once; the queue itself is the job store,
+    so it survives restarts and is bounded at submission time (see
+    :meth:`retry_after`). Results go through the result cache like ``/v1/parse``.
+    Must be started and used on the server's event loop.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        engine: ExtractionEngine,
+        cache: ResultCache,
+        concurrency: int,
+        page_jobs: int = 1,
+        page_cache: PageCache | None = None,
+        options: ParserOptions | None = None,
+    ) -> None:
+        self.store = store
+        self.engine = engine
+        self.cache = cache
+        self.concurrency = max(1, concurrency)
+        self.page_jobs = page_jobs
+        self.page_cache = page_cache
+        self.options = options
+        self._tasks: list[asyncio.Task[None]] = []
+        self._wake = asyncio.Event()
+        self._finished = asyncio.Condition()
+
+    def start(self) -> None:
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+
+    async def stop(self) -> None:
+        # Interrupted items stay "running" in the store and are queued again on restart.
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self) -> None:
+        """Wake idle workers after new items were queued."""
+        self._wake.set()
+
+    async def wait_finished(self, timeout: float) -> None:
+        """Return when some item finishes, or after ``timeout`` seconds."""
+        async with self._finished:
+            with suppress(TimeoutError):
+                await asyncio.wait_for(self._finished.wait(), timeout)
+
+    def retry_after(self, queued: int) -> int:
+        """Seconds until ``queued`` items are likely to have drained."""
+        seconds = queued * self.engine.avg_job_seconds / self.concurrency
+        return max(1, min(3600, math.ceil(seconds)))
+
+    async def _worker(self) -> None:
+        while True:
+            self._wake.clear()
+            # SQLite write: may wait on another server process's lock.
+            item = await asyncio.to_thread(self.store.claim)
+            if item is None:
+                await self._wake.wait()
+                continue
+            payload, error = await self._process(item)
+            await asyncio.to_thread(self.store.finish, item, payload, error)
+            Path(item.path).unlink(missing_ok=True)
+            async with self._finished:
+                self._finished.notify_all()
+
+    async def _process(self, item: JobItem) -> tuple[bytes | None, dict[str, str] | None]:
+        key = cache_key_for_digest(item.sha256, result_variant(item.aggregate, self.options))
+        payload = await asyncio.to_thread(self.cache.get, key)
+        if payload is not None:
+            return payload, None
+        while True:
+            try:
+                payload = await self.engine.run(
+                    parse_pdf_path_to_json,
+                    item.path,
+                    self.page_jobs,
+                    item.aggregate,
+                    self.page_cache,
+                    self.options,
+                )
+            except EngineBusyError as e:
+                # /v1/parse traffic holds the engine; queued items simply wait.
+                await asyncio.sleep(min(e.retry_after, 5))
+                continue
+            except Exception as e:  # noqa: BLE001 - a bad file must not stop the job
+                return None, {"type": type(e).__name__, "message": str(e)}
+            await asyncio.to_thread(self.cache.put, key, payload)
+            return payload, None
@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass
+from functools import cache
+from pathlib import Path
+from typing import Any
+
+from pdfminer.pdftypes import PDFObjRef, PDFStream
+from pdfminer.psparser import PSKeyword, PSLiteral
+
+# Part of every page key: bump when page text extraction (tolerances, clean-up)
+# changes, so old entries stop matching.
+TEXT_VERSION = "text-1"
+
+# Back-references that would drag the whole page tree into a page's fingerprint.
+_SKIP_KEYS = frozenset(("Parent", "P"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    key TEXT PRIMARY KEY,
+    text BLOB NOT NULL,
+    -- Stored bytes of the page and its data entries, for size-based eviction.
+    size INTEGER NOT NULL,
+    used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pages_used ON pages (used);
+CREATE TABLE IF NOT EXISTS page_data (
+    key TEXT NOT NULL,
+    name TEXT NOT NULL,
+    value BLOB NOT NULL,
+    PRIMARY KEY (key, name)
+);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+@dataclass
+class PageCacheStats:
+    text_reused: int = 0
+    text_extracted: int = 0
+    data_reused: int = 0
+    data_computed: int = 0
+
+
+def _fingerprint(obj: Any, h: Any, memo: dict[int, bytes]) -> None:
+    if isinstance(obj, PDFObjRef):
+        digest = memo.get(obj.objid)
+        if digest is None:
+            memo[obj.objid] = b""  # guards against reference cycles
+            sub = hashlib.sha256()
+            _fingerprint(obj.resolve(), sub, memo)
+            digest = memo[obj.objid] = sub.digest()
+        h.update(b"R" + digest)
+    elif isinstance(obj, PDFStream):
+        _fingerprint(obj.attrs, h, memo)
+        # Decoded bytes: the same content recompressed differently still matches.
+        data = obj.get_data()
+        h.update(b"S%d:" % len(data) + data)
+    elif isinstance(obj, dict):
+        h.update(b"{")
+        for key in sorted(obj):
+            if key not in _SKIP_KEYS:
+                h.update(str(key).encode() + b"=")
+                _fingerprint(obj[key], h, memo)
+        h.update(b"}")
+    elif isinstance(obj, (list, tuple)):
+        h.update(b"[")
+        for item in obj:
+            _fingerprint(item, h, memo)
+        h.update(b"]")
+    elif isinstance(obj, (PSLiteral, PSKeyword)):
+        h.update(b"/" + str(obj.name).encode())
+    else:
+        h.update(repr(obj).encode())
+
+
+def page_key(page_obj: Any, memo: dict[int, bytes]) -> str:
+    """Content address of a page: its content streams, the resources they draw with
+    (fonts, form XObjects) and its boxes, decoded and hashed.
+
+    Two pages with equal keys extract to the same text. ``memo`` maps PDF object ids
+    to digests; share one per document so fonts used by every page are hashed once.
+    """
+    h = hashlib.sha256(TEXT_VERSION.encode())
+    _fingerprint([page_obj.mediabox, page_obj.cropbox, page_obj.rotate], h, memo)
+    _fingerprint(page_obj.attrs.get("Contents"), h, memo)
+    _fingerprint(page_obj.resources, h, memo)
+    return h.hexdigest()
+
+
+class PageCache:
+    """On-disk cache of per-page results, keyed by :func:`page_key`.
+
+    Holds each page's extracted text plus named data derived from it by parsers
+    (e.g. the transactions found on the page), so a document sharing pages with an
+    earlier one only extracts and parses the new or changed pages. Everything lives
+    in one SQLite file that several processes can use at once; once the stored
+    payloads exceed ``max_bytes``, least recently used pages are evicted with their
+    data. Reuse counters are kept in the same file, summed over every process.
+
+    Pickles as its location, so it can be passed to engine jobs: each worker
+    process opens (once) its own connection to the same file.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        directory.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(directory / "pages.sqlite3", timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        self._db.commit()
+
+    def __reduce__(self) -> tuple[Any, tuple[str, int]]:
+        return open_page_cache, (str(self.directory), self.max_bytes)
+
+    def get_text(self, key: str) -> str | None:
+        with self._lock:
+            row = self._db.execute("SELECT text FROM pages WHERE key = ?", (key,)).fetchone()
+        return zlib.decompress(row[0]).decode("utf-8") if row is not None else None
+
+    def get_data(self, key: str, name: str) -> Any | None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value FROM page_data WHERE key = ? AND name = ?", (key, name)
+            ).fetchone()
+        return json.loads(zlib.decompress(row[0])) if row is not None else None
+
+    def put_text(self, key: str, text: str) -> None:
+        blob = zlib.compress(text.encode("utf-8"), 6)
+        with self._lock, self._db:
+            cur = self._db.execute(
+                "INSERT OR IGNORE INTO pages (key, text, size, used) VALUES (?, ?, ?, ?)",
+                (key, blob, len(blob), time.time()),
+            )
+            if cur.rowcount:
+                self._grow(len(blob))
+
+    def put_data(self, key: str, name: str, value: Any) -> None:
+        """Attach JSON-serialisable ``value`` to a cached page (no-op if not cached)."""
+        blob = zlib.compress(json.dumps(value, ensure_ascii=False).encode("utf-8"), 6)
+        with self._lock, self._db:
+            if self._db.execute("SELECT 1 FROM pages WHERE key = ?", (key,)).fetchone() is None:
+                return
+            cur = self._db.execute(
+                "INSERT OR IGNORE INTO page_data (key, name, value) VALUES (?, ?, ?)",
+                (key, name, blob),
+            )
+            if cur.rowcount:
+                self._db.execute("UPDATE pages SET size = size + ? WHERE key = ?", (len(blob), key))
+                self._grow(len(blob))
+
+    def record(self, stats: PageCacheStats, used: Iterable[str] = ()) -> None:
+        """Add a document's counters and mark the pages it reused as recently used."""
+        now = time.time()
+        with self._lock, self._db:
+            self._db.executemany(
+                "UPDATE pages SET used = ? WHERE key = ?", [(now, k) for k in used]
+            )
+            for name, value in asdict(stats).items():
+                if value:
+                    self._bump(name, value)
+
+    def snapshot(self) -> dict[str, int]:
+        with self._lock:
+            counters = dict(self._db.execute("SELECT name, value FROM counters").fetchall())
+            pages = self._db.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+        out = {name: int(counters.get(name, 0)) for name in asdict(PageCacheStats())}
+        return {
+            **out,
+            "evictions": int(counters.get("evictions", 0)),
+            "pages": int(pages),
+            "bytes": int(counters.get("bytes", 0)),
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def _bump(self, name: str, value: int) -> None:
+        self._db.execute(
+            "INSERT INTO counters (name, value) VALUES (?, ?)"
+            " ON CONFLICT (name) DO UPDATE SET value = value + excluded.value",
+            (name, value),
+        )
+
+    def _grow(self, size: int) -> None:
+        # Runs inside the caller's transaction, so the byte total stays exact with
+        # several processes writing.
+        self._bump("bytes", size)
+        total = self._db.execute("SELECT value FROM counters WHERE name = 'bytes'").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Evict down to 90% of the limit so a full cache does not evict on every put.
+        excess = total - self.max_bytes * 9 // 10
+        freed = evicted = 0
+        while freed < excess:
+            batch = self._db.execute(
+                "SELECT key, size FROM pages ORDER BY used LIMIT 64"
+            ).fetchall()
+            if not batch:
+                break
+            for key, page_size in batch:
+                if freed >= excess:
+                    break
+                freed += page_size
+                evicted += 1
+                self._db.execute("DELETE FROM page_data WHERE key = ?", (key,))
+                self._db.execute("DELETE FROM pages WHERE key = ?", (key,))
+        self._bump("bytes", -freed)
+        self._bump("evictions", evicted)
+
+
+@cache
+def open_page_cache(directory: str, max_bytes: int) -> PageCache:
+    """The process-wide :class:`PageCache` for ``directory``."""
+    return PageCache(Path(directory), max_bytes)
@@ -1,20 +1,60 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import Any
+from collections.abc import Iterator, Sequence
+from typing import TYPE_CHECKING, Any, Self
 
-from app.utils.pdf import PdfMeta
+from app.parsers.detection import Markers
+
+if TYPE_CHECKING:
+    from app.parsers.manifest import ParserOptions
+    from app.utils.pdf import ExtractionSession, PdfMeta
 
 
 class BaseParser(ABC):
     """Interface for document-specific parsers."""
 
+    # Registered parsers copy these from their ParserSpec (see manifest.py), which
+    # is what the registry reads.
     doc_type: str = "unknown"
+    version: int = 1
+    # Declared markers put the parser in the registry's detection index; parsers
+    # that need custom logic leave this as None and override can_parse instead.
+    markers: Markers | None = None
 
-    @abstractmethod
-    def can_parse(self, text_pages: list[str], meta: PdfMeta) -> bool:
-        raise NotImplementedError
+    @classmethod
+    def from_options(cls, options: ParserOptions) -> Self:
+        """The registry's instance; parsers with settings read theirs from ``options``."""
+        return cls()
+
+    def can_parse(self, text_pages: Sequence[str], meta: PdfMeta) -> bool:
+        return self.markers is not None and self.markers.matches(text_pages, meta)
 
     @abstractmethod
-    def parse(self, text_pages: list[str], meta: PdfMeta) -> dict[str, Any]:
+    def parse(
+        self,
+        text_pages: Sequence[str],
+        meta: PdfMeta,
+        session: ExtractionSession | None = None,
+    ) -> dict[str, Any]:
+        """Parse the document.
+
+        ``session`` is the open PDF when parsing a file (``None`` for bare text, e.g.
+        in tests): parsers that need geometry read ``session.layout(i).words`` etc.,
+        sharing the layout pass that produced ``text_pages[i]``.
+        """
         raise NotImplementedError
+
+    def parse_stream(
+        self,
+        text_pages: Sequence[str],
+        meta: PdfMeta,
+        session: ExtractionSession | None = None,
+    ) -> tuple[dict[str, Any], Iterator[tuple[str, dict[str, Any]]]]:
+        """Split the result into a header and lazily produced ``(kind, item)`` records.
+
+        Used for NDJSON output: the header is sent first, then each item as soon as
+        it is produced. The default streams nothing and returns ``parse()`` as the
+        header.
+        """
+        return self.parse(text_pages, meta, session), iter(())
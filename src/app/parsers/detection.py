@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Generic, Protocol, TypeVar
+
+if TYPE_CHECKING:
+    from app.utils.pdf import PdfMeta
+
+# Where markers can be looked up: the first page plus the PdfMeta text fields.
+_PAGE = "page"
+_META_FIELDS = frozenset(("title", "author", "producer", "creator", "subject"))
+
+
+def normalize(text: str) -> str:
+    """Lowercase and collapse whitespace, so markers survive line wrapping and case."""
+    return " ".join(text.lower().split())
+
+
+@dataclass(frozen=True)
+class Markers:
+    """Cheap facts that identify a document format, checked by the detection index.
+
+    A document matches when every ``keywords`` entry occurs on its first page and
+    every ``meta`` field (``producer``, ``creator``, ``title``, ...) contains the given
+    substring. Comparison is case-insensitive and whitespace-insensitive.
+    """
+
+    keywords: tuple[str, ...] = ()
+    meta: Mapping[str, str] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        unknown = set(self.meta) - _META_FIELDS
+        if unknown:
+            raise ValueError(f"Unknown metadata fields in markers: {sorted(unknown)}")
+
+    def matches(self, text_pages: Sequence[str], meta: PdfMeta) -> bool:
+        """Check this parser alone; the registry uses :class:`DetectionIndex` instead."""
+        if self.keywords:
+            page = normalize(text_pages[0]) if text_pages else ""
+            if not all(normalize(k) in page for k in self.keywords):
+                return False
+        return all(
+            normalize(needle) in normalize(getattr(meta, name) or "")
+            for name, needle in self.meta.items()
+        )
+
+
+class Detectable(Protocol):
+    @property
+    def markers(self) -> Markers | None: ...
+
+    def can_parse(self, text_pages: Sequence[str], meta: PdfMeta) -> bool: ...
+
+
+D = TypeVar("D", bound=Detectable)
+
+
+class DetectionIndex(Generic[D]):
+    """All parsers' markers compiled into one matcher per source.
+
+    Entries are parsers or their registry specs. Each source (the first page, each
+    metadata field) is normalised once and scanned once with a single alternation
+    regex; every marker is a bit, so checking a parser is one mask comparison no
+    matter how many formats are registered. Parsers without markers are asked
+    through ``can_parse``, in registry order, so the most specific parser still wins.
+    """
+
+    def __init__(self, parsers: Iterable[D]) -> None:
+        self._bits: dict[tuple[str, str], int] = {}
+        self._entries: list[tuple[D, int | None]] = []
+        for parser in parsers:
+            markers = parser.markers
+            if markers is None:
+                self._entries.append((parser, None))
+                continue
+            mask = 0
+            for source, needle in [(_PAGE, k) for k in markers.keywords] + list(
+                markers.meta.items()
+            ):
+                key = (source, normalize(needle))
+                mask |= self._bits.setdefault(key, 1 << len(self._bits))
+            self._entries.append((parser, mask))
+        self._matchers = {
+            source: _compile([k for s, k in self._bits if s == source])
+            for source in {s for s, _ in self._bits}
+        }
+
+    def detect(self, text_pages: Sequence[str], meta: PdfMeta) -> D | None:
+        # Metadata is free; the first page is only read (laid out, with lazy pages)
+        # once a parser's metadata markers all match and its page markers decide.
+        found = self._scan(text_pages, meta, [s for s in self._matchers if s != _PAGE])
+        page_bits = sum(bit for (source, _), bit in self._bits.items() if source == _PAGE)
+        for parser, mask in self._entries:
+            if mask is None:
+                if parser.can_parse(text_pages, meta):
+                    return parser
+                continue
+            if mask & page_bits and (found | page_bits) & mask == mask:
+                found |= self._scan(text_pages, meta, [_PAGE])
+                page_bits = 0
+            if found & mask == mask:
+                return parser
+        return None
+
+    def scan(self, text_pages: Sequence[str], meta: PdfMeta) -> int:
+        """Bit set of every marker present in the document."""
+        return self._scan(text_pages, meta, list(self._matchers))
+
+    def _scan(self, text_pages: Sequence[str], meta: PdfMeta, sources: list[str]) -> int:
+        found = 0
+        for source in sources:
+            pattern, implied = self._matchers[source]
+            if source == _PAGE:
+                text = text_pages[0] if text_pages else ""
+            else:
+                text = getattr(meta, source) or ""
+            for m in pattern.finditer(normalize(text)):
+                for key in implied[m.group(1)]:
+                    found |= self._bits[(source, key)]
+        return found
+
+
+def _compile(keywords: list[str]) -> tuple[re.Pattern[str], Mapping[str, tuple[str, ...]]]:
+    # A zero-width lookahead tries every start position, so overlapping markers are
+    # all seen; longest-first alternation plus the "implied" table (every marker
+    # contained in the matched one) covers markers nested inside another.
+    ordered = sorted(keywords, key=len, reverse=True)
+    pattern = re.compile("(?=(" + "|".join(map(re.escape, ordered)) + "))")
+    implied = {k: tuple(other for other in keywords if other in k) for k in keywords}
+    return pattern, implied
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+
+# Regions a field can live in: the first pages (document header) or the last pages
+# (totals and signatures after the table).
+HEAD = "head"
+TAIL = "tail"
+
+
+@dataclass(frozen=True)
+class Field:
+    """One header/footer value of a document format: where it is and how it looks.
+
+    ``pattern`` is searched in the ``region``'s pages joined with newlines, as a
+    search over the whole document text would see them; the first match wins.
+    """
+
+    name: str
+    pattern: re.Pattern[str]
+    region: str = HEAD
+
+    def __post_init__(self) -> None:
+        if self.region not in (HEAD, TAIL):
+            raise ValueError(f"Unknown region for field {self.name!r}: {self.region!r}")
+
+
+class FieldSet:
+    """Declarative header/footer fields of a format, read from their regions only.
+
+    A statement's header sits on its first page and its totals on the last one, so
+    searching the whole document for each field costs a full scan per field that
+    is missing or sits at the end, plus a copy of every page for the join. Here
+    each region is joined once (``head_pages`` / ``tail_pages`` pages; they overlap
+    on short documents) and searched per field; other pages are never read, so
+    lazily extracted pages (``PdfPages``) stay unextracted until something else
+    needs them.
+
+    Separate ``search`` calls beat one alternation of all patterns: ``re`` looks
+    for each pattern's literal prefix quickly, which an alternation defeats.
+    """
+
+    def __init__(self, fields: Iterable[Field], head_pages: int = 2, tail_pages: int = 2) -> None:
+        self.fields = tuple(fields)
+        self.head_pages = max(1, head_pages)
+        self.tail_pages = max(1, tail_pages)
+        names = [f.name for f in self.fields]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Duplicate field names: {names}")
+
+    def pages(self, count: int) -> tuple[range, range]:
+        """Indices of the head and tail pages of a ``count``-page document."""
+        return range(min(count, self.head_pages)), range(max(0, count - self.tail_pages), count)
+
+    def regions(self, text_pages: Sequence[str]) -> dict[str, str]:
+        head, tail = self.pages(len(text_pages))
+        return {
+            HEAD: "\n".join(text_pages[i] for i in head),
+            TAIL: "\n".join(text_pages[i] for i in tail),
+        }
+
+    def extract(self, text_pages: Sequence[str]) -> dict[str, re.Match[str] | None]:
+        """The first match of every field in its region (None if absent)."""
+        regions = self.regions(text_pages)
+        return {f.name: f.pattern.search(regions[f.region]) for f in self.fields}
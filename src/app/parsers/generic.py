@@ -1,19 +1,37 @@
 from __future__ import annotations
 
+from collections.abc import Iterator, Sequence
 from typing import Any
 
 from app.parsers.base import BaseParser
-from app.utils.pdf import PdfMeta
+from app.parsers.manifest import GENERIC_TEXT
+from app.utils.pdf import ExtractionSession, PdfMeta
 
 
 class GenericParser(BaseParser):
-    doc_type = "generic_text_v1"
+    doc_type = GENERIC_TEXT.doc_type
+    version = GENERIC_TEXT.version
 
-    def can_parse(self, text_pages: list[str], meta: PdfMeta) -> bool:
+    def can_parse(self, text_pages: Sequence[str], meta: PdfMeta) -> bool:
         return True
 
-    def parse(self, text_pages: list[str], meta: PdfMeta) -> dict[str, Any]:
-        return {
+    def parse(
+        self,
+        text_pages: Sequence[str],
+        meta: PdfMeta,
+        session: ExtractionSession | None = None,
+    ) -> dict[str, Any]:
+        header, items = self.parse_stream(text_pages, meta, session)
+        header["pages"] = [page for _, page in items]
+        return header
+
+    def parse_stream(
+        self,
+        text_pages: Sequence[str],
+        meta: PdfMeta,
+        session: ExtractionSession | None = None,
+    ) -> tuple[dict[str, Any], Iterator[tuple[str, dict[str, Any]]]]:
+        header = {
             "meta": {
                 "pages": meta.pages,
                 "title": meta.title,
@@ -22,5 +40,6 @@ class GenericParser(BaseParser):
                 "creator": meta.creator,
                 "subject": meta.subject,
             },
-            "pages": [{"page": i + 1, "text": t} for i, t in enumerate(text_pages)],
         }
+        pages = (("page", {"page": i + 1, "text": t}) for i, t in enumerate(text_pages))
+        return header, pages
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from functools import cache
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+from app.parsers.detection import Markers
+
+if TYPE_CHECKING:
+    from app.parsers.base import BaseParser
+    from app.utils.pdf import PdfMeta
+
+# Third-party packages register parsers under this group, each entry point naming a
+# ParserSpec, e.g. in pyproject.toml:
+#   [project.entry-points."pdf_parser.parsers"]
+#   sber = "my_pkg.manifest:SBER_STATEMENT"
+ENTRY_POINT_GROUP = "pdf_parser.parsers"
+
+
+# How TBank statements' transactions are read; see TBankCashflowParser.
+TBANK_MODES = ("auto", "text", "geometry")
+
+
+@dataclass(frozen=True)
+class ParserOptions:
+    """Deployment-wide parser settings (see ``Settings``), passed to parsers as they
+    are built. Non-default options change the output, so they are part of the
+    result cache key (:attr:`variant`)."""
+
+    tbank_mode: str = "auto"
+
+    def __post_init__(self) -> None:
+        if self.tbank_mode not in TBANK_MODES:
+            raise ValueError(
+                f"Unknown TBank extraction mode: {self.tbank_mode!r}"
+                f" (expected one of {TBANK_MODES})"
+            )
+
+    @property
+    def variant(self) -> str:
+        """Cache key variant of these options; empty for the defaults."""
+        return "" if self.tbank_mode == "auto" else f"tbank-{self.tbank_mode}"
+
+
+@dataclass(frozen=True)
+class ParserSpec:
+    """Everything the registry needs about a parser without importing its module.
+
+    Detection runs on ``markers`` and the cache key on ``version``; the class named by
+    ``target`` (``"package.module:ClassName"``) is imported only once the document
+    is routed to it, or when a parser without markers must be asked ``can_parse``.
+    Parser classes take ``doc_type``, ``version`` and ``markers`` from their spec,
+    so the two cannot drift apart.
+    """
+
+    doc_type: str
+    target: str
+    # Bump whenever the parser's output for the same PDF changes; cached results
+    # produced by older versions are then ignored.
+    version: int = 1
+    markers: Markers | None = None
+
+    def load(self, options: ParserOptions | None = None) -> BaseParser:
+        return _instantiate(self.target, options or ParserOptions())
+
+    def can_parse(self, text_pages: Sequence[str], meta: PdfMeta) -> bool:
+        return self.load().can_parse(text_pages, meta)
+
+
+@cache
+def _instantiate(target: str, options: ParserOptions) -> BaseParser:
+    module, _, name = target.partition(":")
+    parser: BaseParser = getattr(import_module(module), name).from_options(options)
+    return parser
+
+
+TBANK_CASHFLOW = ParserSpec(
+    doc_type="tbank_cashflow_v1",
+    target="app.parsers.tbank_cashflow:TBankCashflowParser",
+    # v2: transactions are read from every page up to the totals block (was: first 7 pages).
+    # v3: falls back to column geometry when the text heuristics find no rows.
+    # v4: header fields are read from the first two pages, totals from the last two.
+    version=4,
+    markers=Markers(keywords=("справка о движении средств", "ао «тбанк»")),
+)
+
+GENERIC_TEXT = ParserSpec(
+    doc_type="generic_text_v1",
+    target="app.parsers.generic:GenericParser",
+)
+
+
+def plugin_specs() -> list[ParserSpec]:
+    """Parser specs published by installed packages, ordered by entry-point name."""
+    # importlib.metadata costs more to import than the rest of the registry.
+    from importlib import metadata
+
+    specs = []
+    for ep in sorted(metadata.entry_points(group=ENTRY_POINT_GROUP), key=lambda ep: ep.name):
+        spec = ep.load()
+        if not isinstance(spec, ParserSpec):
+            raise TypeError(
+                f"Entry point {ep.name!r} must name a ParserSpec, got {type(spec).__name__}"
+            )
+        specs.append(spec)
+    return specs
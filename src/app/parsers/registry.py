@@ -1,12 +1,24 @@
 from __future__ import annotations
 
+import hashlib
+from collections.abc import Iterator, Sequence
 from dataclasses import dataclass
-from typing import Any
+from functools import cache
+from typing import TYPE_CHECKING, Any
 
 from app.parsers.base import BaseParser
-from app.parsers.generic import GenericParser
-from app.parsers.tbank_cashflow import TBankCashflowParser
-from app.utils.pdf import PdfMeta
+from app.parsers.detection import DetectionIndex
+from app.parsers.manifest import (
+    GENERIC_TEXT,
+    TBANK_CASHFLOW,
+    ParserOptions,
+    ParserSpec,
+    plugin_specs,
+)
+from app.utils.timing import span
+
+if TYPE_CHECKING:
+    from app.utils.pdf import ExtractionSession, PdfMeta
 
 
 @dataclass(frozen=True)
@@ -15,28 +27,87 @@ class ParseResult:
     meta: dict[str, Any]
     data: dict[str, Any]
 
+    def to_dict(self) -> dict[str, Any]:
+        return {"doc_type": self.doc_type, "meta": self.meta, "data": self.data}
+
+
+@cache
+def parser_specs() -> tuple[ParserSpec, ...]:
+    """Registered parsers, most specific first: built-ins, installed plugins (see
+    ``manifest.ENTRY_POINT_GROUP``), then the generic fallback. Nothing is imported."""
+    return (TBANK_CASHFLOW, *plugin_specs(), GENERIC_TEXT)
+
+
+@cache
+def registry_version() -> str:
+    """Short fingerprint of the registered parsers and their versions."""
+    spec = ";".join(f"{p.doc_type}@{p.version}" for p in parser_specs())
+    return hashlib.sha256(spec.encode()).hexdigest()[:12]
+
+
+@cache
+def _detection_index() -> DetectionIndex[ParserSpec]:
+    return DetectionIndex(parser_specs())
+
+
+def detect_spec(text_pages: Sequence[str], meta: PdfMeta) -> ParserSpec:
+    """The spec of the first parser, in registry order, that accepts the document.
+
+    Declared markers are matched in one pass over the first page and metadata;
+    other parsers are asked via ``can_parse``. Nothing is imported unless such a
+    parser has to be asked. ``text_pages`` may be lazy (see ``PdfPages``), so
+    detection extracts at most the first page, and none if metadata rules out
+    every parser with page markers.
+    """
+    with span("detect"):
+        # Fallback (shouldn't happen because GenericParser.can_parse is True)
+        return _detection_index().detect(text_pages, meta) or GENERIC_TEXT
+
+
+def detect_parser(
+    text_pages: Sequence[str], meta: PdfMeta, options: ParserOptions | None = None
+) -> BaseParser:
+    """:func:`detect_spec`, with the chosen parser's module imported."""
+    spec = detect_spec(text_pages, meta)
+    with span("detect"):
+        return spec.load(options)
+
+
+def parse_document(
+    text_pages: Sequence[str],
+    meta: PdfMeta,
+    session: ExtractionSession | None = None,
+    options: ParserOptions | None = None,
+) -> ParseResult:
+    parser = detect_parser(text_pages, meta, options)
+    with span("parser"):
+        return _unify(parser, parser.parse(text_pages, meta, session))
+
+
+def stream_document(
+    text_pages: Sequence[str],
+    meta: PdfMeta,
+    session: ExtractionSession | None = None,
+    options: ParserOptions | None = None,
+) -> Iterator[dict[str, Any]]:
+    """Parse as a stream of records: ``{"type": "header", doc_type, meta, data}`` first,
+    then one ``{"type": <kind>, ...item}`` per item as the parser produces it."""
+    parser = detect_parser(text_pages, meta, options)
+    # Items are produced while the response is written, so only the header is timed.
+    with span("parser"):
+        header, items = parser.parse_stream(text_pages, meta, session)
+    yield {"type": "header", **_unify(parser, header).to_dict()}
+    for kind, item in items:
+        yield {"type": kind, **item}
+
 
-_PARSERS: list[BaseParser] = [
-    # Most specific first
-    TBankCashflowParser(),
-    GenericParser(),
-]
-
-
-def parse_document(text_pages: list[str], meta: PdfMeta) -> ParseResult:
-    for parser in _PARSERS:
-        if parser.can_parse(text_pages, meta):
-            parsed = parser.parse(text_pages, meta)
-            # Each parser includes "meta" and either "data" or generic fields.
-            # We unify the outer shape here.
-            if parser.doc_type == "generic_text_v1":
-                return ParseResult(doc_type=parser.doc_type, meta=parsed.get("meta", {}), data=parsed)
-            return ParseResult(
-                doc_type=parser.doc_type,
-                meta=parsed.get("meta", {}),
-                data=parsed.get("data", {}),
-            )
-    # Fallback (shouldn't happen because GenericParser.can_parse is True)
-    gp = GenericParser()
-    parsed = gp.parse(text_pages, meta)
-    return ParseResult(doc_type=gp.doc_type, meta=parsed.get("meta", {}), data=parsed)
+def _unify(parser: BaseParser, parsed: dict[str, Any]) -> ParseResult:
+    # Each parser includes "meta" and either "data" or generic fields.
+    # We unify the outer shape here.
+    if parser.doc_type == "generic_text_v1":
+        return ParseResult(doc_type=parser.doc_type, meta=parsed.get("meta", {}), data=parsed)
+    return ParseResult(
+        doc_type=parser.doc_type,
+        meta=parsed.get("meta", {}),
+        data=parsed.get("data", {}),
+    )
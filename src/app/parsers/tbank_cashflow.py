@@ -1,21 +1,24 @@
 from __future__ import annotations
 
-from datetime import datetime, date
 import re
-from typing import Any
+from bisect import bisect_right
+from collections.abc import Iterable, Iterator, Sequence
+from itertools import chain, islice
+from typing import Any, Self
 
 from app.parsers.base import BaseParser
-from app.utils.money import decimal_to_str, parse_money_to_decimal
-from app.utils.pdf import PdfMeta
-
-
-_DOC_MARKERS = (
-    "справка о движении средств",
-    "ао «тбанк»",
-)
+from app.parsers.fields import TAIL, Field, FieldSet
+from app.parsers.manifest import TBANK_CASHFLOW, TBANK_MODES, ParserOptions
+from app.parsers.transactions import TransactionTable
+from app.utils.dates import ddmmyyyy_hhmm_to_iso, ddmmyyyy_hhmm_to_minutes, ddmmyyyy_to_iso
+from app.utils.money import kopecks_to_str, parse_money_to_kopecks
+from app.utils.pdf import ExtractionSession, PdfMeta
+from app.utils.timing import span
 
 _PERIOD_RE = re.compile(r"за период с\s+(\d{2}\.\d{2}\.\d{4})\s+по\s+(\d{2}\.\d{2}\.\d{4})", re.I)
-_BAL_RE = re.compile(r"Сумма доступного остатка на\s+(\d{2}\.\d{2}\.\d{4}):\s*([\d\s]+[\.,]\d{2}\s*₽)", re.I)
+_BAL_RE = re.compile(
+    r"Сумма доступного остатка на\s+(\d{2}\.\d{2}\.\d{4}):\s*([\d\s]+[\.,]\d{2}\s*₽)", re.I
+)
 _OWNER_RE = re.compile(r"\n([А-ЯЁ][^\n]+)\nАдрес места жительства:", re.M)
 _ADDRESS_RE = re.compile(r"Адрес места жительства:\s*([^\n]+)", re.I)
 _CONTRACT_DATE_RE = re.compile(r"Дата заключения договора:\s*(\d{2}\.\d{2}\.\d{4})", re.I)
@@ -25,6 +28,22 @@ _DOC_DATE_RE = re.compile(r"\n(\d{2}\.\d{2}\.\d{4})\n", re.M)
 _TOTALS_IN_RE = re.compile(r"Пополнения:\s*([\d\s]+,\d{2}\s*₽)", re.I)
 _TOTALS_OUT_RE = re.compile(r"Расходы:\s*([\d\s]+,\d{2}\s*₽)", re.I)
 
+# The statement header is on the first page; the totals block follows the table.
+_FIELDS = FieldSet(
+    [
+        Field("owner", _OWNER_RE),
+        Field("address", _ADDRESS_RE),
+        Field("contract_date", _CONTRACT_DATE_RE),
+        Field("contract_no", _CONTRACT_NO_RE),
+        Field("account_no", _ACCOUNT_NO_RE),
+        Field("doc_date", _DOC_DATE_RE),
+        Field("period", _PERIOD_RE),
+        Field("balance", _BAL_RE),
+        Field("totals_in", _TOTALS_IN_RE, TAIL),
+        Field("totals_out", _TOTALS_OUT_RE, TAIL),
+    ]
+)
+
 # Typical embedded-text layout for this TBank PDF:
 # Line A: "<op_date> <writeoff_date> <amount1> <amount2> <desc_part> <card_last4>"
 # Line B: "<op_time> <writeoff_time> <desc_cont...>"
@@ -60,198 +79,578 @@ _CARD_RE = re.compile(r"^(?P<card>\d{4}|—)$")
 _TABLE_HEADER_HINT = "Дата и время"
 
 
-def _ddmmyyyy_to_date(s: str) -> date:
-    return datetime.strptime(s, "%d.%m.%Y").date()
-
-
-def _ddmmyyyy_hhmm_to_dt(d: str, t: str) -> datetime:
-    return datetime.strptime(f"{d} {t}", "%d.%m.%Y %H:%M")
+def _money(s: str) -> str:
+    return kopecks_to_str(parse_money_to_kopecks(s))
 
 
 def _clean_ws(s: str) -> str:
     return re.sub(r"\s+", " ", s.replace("￾", " ")).strip()
 
 
-def _extract_transactions(text_pages: list[str]) -> list[dict[str, Any]]:
-    # In the sample, pages 1..7 are the transaction table; page 8 is totals/signature.
-    lines: list[str] = []
-    for p in text_pages[:7]:
-        # splitlines keeps order produced by extractor
-        lines.extend([ln.strip() for ln in p.splitlines() if ln.strip()])
+# Line tags. A line may carry several; the assembler checks them in the same
+# order the row layouts require.
+_T_LINE_A = 1
+_T_DATE = 2
+_T_TIME = 4
+_T_AMOUNTS = 8
+_T_CARD = 16
+_T_HEADER = 32
+_T_FOOTER = 64
+# Totals block ("Пополнения: ... / Расходы: ...") that follows the last row.
+_T_TOTALS = 256
+# Set on the first line of a split-layout row: date / time / date / time /
+# "<amount1> <amount2> <desc>" on five consecutive lines.
+_T_SPLIT = 128
+_SPLIT_TAGS = (_T_DATE, _T_TIME, _T_DATE, _T_TIME, _T_AMOUNTS)
+
+_FOOTER_PREFIXES = ("АО «ТБанк»", "БИК ")
+_HEADER_SEARCH_PAGES = 3
+_TOTALS_PREFIXES = ("Пополнения:", "Расходы:")
+
+# (tags, line, match) where match is the Line-A or amount-pair match, if any.
+_Token = tuple[int, str, "re.Match[str] | None"]
+
+
+def _classify(line: str) -> _Token:
+    """Tag one stripped, non-empty line. Cheap length/char guards skip most regexes."""
+    tags = 0
+    match: re.Match[str] | None = None
+    n = len(line)
+    if _TABLE_HEADER_HINT in line:
+        tags |= _T_HEADER
+    if line.startswith(_FOOTER_PREFIXES):
+        tags |= _T_FOOTER
+    elif line.startswith(_TOTALS_PREFIXES):
+        return tags | _T_TOTALS, line, None
+    if n == 10:
+        if _DATE_RE.match(line):
+            tags |= _T_DATE
+    elif n == 5:
+        if _TIME_RE.match(line):
+            tags |= _T_TIME
+    elif n <= 4:
+        if _CARD_RE.match(line):
+            tags |= _T_CARD
+    elif n > 10 and line[2] == ".":
+        match = _LINE_A_RE.match(line)
+        if match:
+            return tags | _T_LINE_A, line, match
+    c0 = line[0]
+    if (c0 in "+-" or c0.isdigit()) and "₽" in line:
+        match = _AMOUNT_PAIR_RE.match(line)
+        if match:
+            tags |= _T_AMOUNTS
+    return tags, line, match
+
+
+# First characters of every line that can carry a tag other than _T_HEADER or
+# _T_TOTALS: footers ("АО", "БИК"), signed amounts and the "no card" dash. Digits
+# are checked separately.
+_TAGGED_FIRST_CHARS = frozenset("АБ+-—")
+
+
+def _tokenize(text: str) -> list[_Token]:
+    """Tag every non-empty line of a page; plain description lines skip the classifier."""
+    out: list[_Token] = []
+    append = out.append
+    for ln in map(str.strip, text.splitlines()):
+        if not ln:
+            continue
+        c0 = ln[0]
+        if (
+            c0.isdigit()
+            or c0 in _TAGGED_FIRST_CHARS
+            or _TABLE_HEADER_HINT in ln
+            or ln.startswith(_TOTALS_PREFIXES)
+        ):
+            append(_classify(ln))
+        else:
+            append((0, ln, None))
+    return out
 
-    # Skip everything before the table header (if present).
-    start_idx = 0
-    for i, ln in enumerate(lines):
-        if _TABLE_HEADER_HINT in ln:
-            start_idx = i + 1
-            break
-    lines = lines[start_idx:]
-
-    out: list[dict[str, Any]] = []
-    i = 0
-    while i < len(lines):
-        m_a = _LINE_A_RE.match(lines[i])
-        if not m_a:
-            if i + 4 < len(lines):
-                op_date = lines[i]
-                op_time = lines[i + 1]
-                wo_date = lines[i + 2]
-                wo_time = lines[i + 3]
-                if (
-                    _DATE_RE.match(op_date)
-                    and _TIME_RE.match(op_time)
-                    and _DATE_RE.match(wo_date)
-                    and _TIME_RE.match(wo_time)
-                ):
-                    m_amounts = _AMOUNT_PAIR_RE.match(lines[i + 4])
-                    if m_amounts:
-                        amount = parse_money_to_decimal(m_amounts.group("amount1"))
-                        desc_parts = [m_amounts.group("desc")]
-                        card: str | None = None
-                        j = i + 5
-                        while j < len(lines):
-                            if _LINE_A_RE.match(lines[j]):
-                                break
-                            if (
-                                j + 4 < len(lines)
-                                and _DATE_RE.match(lines[j])
-                                and _TIME_RE.match(lines[j + 1])
-                                and _DATE_RE.match(lines[j + 2])
-                                and _TIME_RE.match(lines[j + 3])
-                                and _AMOUNT_PAIR_RE.match(lines[j + 4])
-                            ):
-                                break
-                            if _TABLE_HEADER_HINT in lines[j]:
-                                j += 1
-                                continue
-                            if lines[j].startswith("АО «ТБанк»") or lines[j].startswith("БИК "):
-                                break
-                            card_match = _CARD_RE.match(lines[j])
-                            if card_match:
-                                card_value = card_match.group("card")
-                                card = None if card_value == "—" else card_value
-                                j += 1
-                                break
-                            desc_parts.append(lines[j])
-                            j += 1
-
-                        desc = _clean_ws(" ".join(desc_parts))
-                        out.append(
-                            {
-                                "op_datetime": _ddmmyyyy_hhmm_to_dt(op_date, op_time).isoformat(
-                                    timespec="minutes"
-                                ),
-                                "writeoff_datetime": _ddmmyyyy_hhmm_to_dt(wo_date, wo_time).isoformat(
-                                    timespec="minutes"
-                                ),
-                                "amount_rub": decimal_to_str(amount),
-                                "description": desc,
-                                "card_last4": card,
-                            }
-                        )
-                        i = j
-                        continue
 
-            i += 1
-            continue
+def _mark_splits(batches: Iterable[list[_Token]]) -> Iterator[list[_Token]]:
+    """Flag split-layout row starts, one batch (page) at a time.
 
-        if i + 1 >= len(lines):
-            break
-        m_b = _LINE_B_RE.match(lines[i + 1])
-        if not m_b:
-            # Sometimes extractor inserts wrapped description without the expected time-line;
-            # fall back to treating current line as non-transaction.
-            i += 1
-            continue
+    Trailing tokens that could still begin a split row are held back until the next
+    batch arrives, so a row split across a page break is still recognised; anything
+    else is released immediately.
+    """
+    carry: list[_Token] = []
+    for batch in batches:
+        buf = carry + batch
+        n = len(buf)
+        for k in range(n - 4):
+            if (
+                buf[k][0] & _T_DATE
+                and buf[k + 1][0] & _T_TIME
+                and buf[k + 2][0] & _T_DATE
+                and buf[k + 3][0] & _T_TIME
+                and buf[k + 4][0] & _T_AMOUNTS
+            ):
+                tags, line, match = buf[k]
+                buf[k] = (tags | _T_SPLIT, line, match)
+        cut = n
+        for k in range(max(0, n - 4), n):
+            if all(buf[k + i][0] & _SPLIT_TAGS[i] for i in range(n - k)):
+                cut = k
+                break
+        carry = buf[cut:]
+        yield buf[:cut]
+    yield carry
 
-        op_date = m_a.group("op_date")
-        wo_date = m_a.group("wo_date")
-        op_time = m_b.group("op_time")
-        wo_time = m_b.group("wo_time")
 
-        amount = parse_money_to_decimal(m_a.group("amount1"))
+# A transaction as found on the page: (op_date, op_time, wo_date, wo_time, amount,
+# description parts, card). Text and geometry mode both produce these; they are
+# converted once, either into a TransactionTable or into a JSON-shaped record.
+_Row = tuple[str, str, str, str, str, list[str], "str | None"]
 
-        desc_parts = [m_a.group("desc")]
-        if m_b.group("desc2"):
-            desc_parts.append(m_b.group("desc2"))
 
-        card = m_a.group("card")
+def _row_values(row: _Row) -> tuple[int, int, int, str, str | None]:
+    """Epoch minutes (operation, write-off), kopecks, description and card of a row."""
+    op_date, op_time, wo_date, wo_time, amount, desc_parts, card = row
+    return (
+        ddmmyyyy_hhmm_to_minutes(op_date, op_time),
+        ddmmyyyy_hhmm_to_minutes(wo_date, wo_time),
+        parse_money_to_kopecks(amount),
+        _clean_ws(" ".join(desc_parts)),
+        None if card == "—" else card,
+    )
 
-        # Consume any following lines that belong to description until next Line-A or obvious footer.
-        j = i + 2
-        while j < len(lines):
-            if _LINE_A_RE.match(lines[j]):
-                break
-            if lines[j].startswith("АО «ТБанк»") or lines[j].startswith("БИК "):
+
+def _record(row: _Row) -> dict[str, Any]:
+    # Same values as the table holds, formatted straight from the page strings.
+    op_date, op_time, wo_date, wo_time, amount, desc_parts, card = row
+    return {
+        "op_datetime": ddmmyyyy_hhmm_to_iso(op_date, op_time),
+        "writeoff_datetime": ddmmyyyy_hhmm_to_iso(wo_date, wo_time),
+        "amount_rub": kopecks_to_str(parse_money_to_kopecks(amount)),
+        "description": _clean_ws(" ".join(desc_parts)),
+        "card_last4": None if card == "—" else card,
+    }
+
+
+def _table(rows: Iterable[_Row]) -> TransactionTable:
+    table = TransactionTable()
+    append = table.append
+    for row in rows:
+        append(*_row_values(row))
+    return table
+
+
+def _assemble(batches: Iterable[list[_Token]]) -> Iterator[_Row]:
+    """State machine over tagged lines; each token is consumed exactly once.
+
+    Stops at the totals block, so pages after the table are never tokenized (or,
+    with lazy pages, even extracted).
+
+    Two row layouts are recognised:
+
+    * Line-A / Line-B: ``<op_date> <wo_date> <amount1> <amount2> <desc> <card>`` followed by
+      ``<op_time> <wo_time> [desc...]``, then description continuation lines;
+    * split (see :data:`_T_SPLIT`), then description lines and an optional card line.
+    """
+    it = chain.from_iterable(_mark_splits(batches))
+    tok = next(it, None)
+    while tok is not None:
+        tags, line, match = tok
+
+        if tags & _T_TOTALS:
+            return
+
+        if tags & _T_LINE_A:
+            assert match is not None
+            nxt = next(it, None)
+            if nxt is None:
+                return
+            m_b = _LINE_B_RE.match(nxt[1])
+            if not m_b:
+                # Sometimes extractor inserts wrapped description without the expected
+                # time-line; treat current line as non-transaction.
+                tok = nxt
+                continue
+            desc_parts = [match.group("desc")]
+            if m_b.group("desc2"):
+                desc_parts.append(m_b.group("desc2"))
+            # Consume description lines until next Line-A or obvious footer.
+            tok = next(it, None)
+            while tok is not None:
+                t = tok[0]
+                if t & (_T_LINE_A | _T_FOOTER | _T_TOTALS):
+                    break
+                # Column header can reappear on next pages
+                if not t & _T_HEADER:
+                    desc_parts.append(tok[1])
+                tok = next(it, None)
+            yield (
+                match.group("op_date"),
+                m_b.group("op_time"),
+                match.group("wo_date"),
+                m_b.group("wo_time"),
+                match.group("amount1"),
+                desc_parts,
+                match.group("card"),
+            )
+            continue
+
+        if not tags & _T_SPLIT:
+            tok = next(it, None)
+            continue
+
+        # A split start is always followed by its four other lines (see _mark_splits).
+        op_date = line
+        op_time = next(it)[1]
+        wo_date = next(it)[1]
+        wo_time = next(it)[1]
+        m_amounts = next(it)[2]
+        assert m_amounts is not None
+        desc_parts = [m_amounts.group("desc")]
+        card: str | None = None
+        tok = next(it, None)
+        while tok is not None:
+            t, line, _ = tok
+            if t & (_T_LINE_A | _T_SPLIT):
                 break
-            # Column header can reappear on next pages
-            if _TABLE_HEADER_HINT in lines[j]:
-                j += 1
+            if t & _T_HEADER:
+                tok = next(it, None)
                 continue
-            desc_parts.append(lines[j])
-            j += 1
-
-        desc = _clean_ws(" ".join(desc_parts))
-        out.append(
-            {
-                "op_datetime": _ddmmyyyy_hhmm_to_dt(op_date, op_time).isoformat(timespec="minutes"),
-                "writeoff_datetime": _ddmmyyyy_hhmm_to_dt(wo_date, wo_time).isoformat(timespec="minutes"),
-                "amount_rub": decimal_to_str(amount),
-                "description": desc,
-                "card_last4": None if card == "—" else card,
-            }
-        )
-        i = j
+            if t & (_T_FOOTER | _T_TOTALS):
+                break
+            tok = next(it, None)
+            if t & _T_CARD:
+                card = line
+                break
+            desc_parts.append(line)
+        yield op_date, op_time, wo_date, wo_time, m_amounts.group("amount1"), desc_parts, card
 
-    return out
 
+def iter_transactions(text_pages: Iterable[str]) -> Iterator[dict[str, Any]]:
+    """Yield transactions one by one, reading pages only as far as the table goes.
+
+    The table starts after the first column header and ends at the totals block;
+    rows split across a page break are stitched back together. Memory use is bounded
+    by one page of tokens regardless of statement length.
+    """
+    return map(_record, _iter_rows(text_pages))
+
+
+def _iter_rows(text_pages: Iterable[str]) -> Iterator[_Row]:
+    batches = map(_tokenize, text_pages)
+    head, _ = _table_start(batches)
+    yield from _assemble(chain(head, batches))
+
+
+def _table_start(batches: Iterator[list[_Token]]) -> tuple[list[list[_Token]], int]:
+    """The first pages' tokens from the table header on, and how many pages were read.
+
+    The header sits on the first page or two; if it is missing there, parse from the
+    start rather than buffer the whole document looking for it.
+    """
+    skipped: list[list[_Token]] = []
+    for read, batch in enumerate(islice(batches, _HEADER_SEARCH_PAGES), 1):
+        skipped.append(batch)
+        start = next((k for k, tok in enumerate(batch) if tok[0] & _T_HEADER), None)
+        if start is not None:
+            return [batch[start + 1 :]], read
+    return skipped, len(skipped)
+
+
+# Page-cache entry for the rows found on one page (see _iter_rows_paged).
+_ROWS_CACHE_NAME = f"{TBANK_CASHFLOW.doc_type}@{TBANK_CASHFLOW.version}:rows"
 
-class TBankCashflowParser(BaseParser):
-    doc_type = "tbank_cashflow_v1"
 
-    def can_parse(self, text_pages: list[str], meta: PdfMeta) -> bool:
-        if not text_pages:
-            return False
-        p0 = text_pages[0].lower()
-        return all(m in p0 for m in _DOC_MARKERS)
+def _has_totals(batch: list[_Token]) -> bool:
+    return any(tok[0] & _T_TOTALS for tok in batch)
 
-    def parse(self, text_pages: list[str], meta: PdfMeta) -> dict[str, Any]:
-        all_text = "\n".join(text_pages)
 
-        owner = _OWNER_RE.search(all_text)
-        address = _ADDRESS_RE.search(all_text)
-        contract_date = _CONTRACT_DATE_RE.search(all_text)
-        contract_no = _CONTRACT_NO_RE.search(all_text)
-        account_no = _ACCOUNT_NO_RE.search(all_text)
-        doc_date = _DOC_DATE_RE.search(all_text)
-        period = _PERIOD_RE.search(all_text)
-        balance = _BAL_RE.search(all_text)
+def _closes(batch: list[_Token]) -> bool:
+    # The assembler is idle after a page that ends with its footer (a footer ends
+    # any row, and a row split across the break cannot start with it), or stops
+    # at the totals.
+    return bool(batch) and bool(batch[-1][0] & _T_FOOTER) or _has_totals(batch)
 
-        totals_in = _TOTALS_IN_RE.search(all_text)
-        totals_out = _TOTALS_OUT_RE.search(all_text)
 
-        transactions = _extract_transactions(text_pages)
+def _iter_rows_paged(text_pages: Sequence[str], session: ExtractionSession) -> Iterator[_Row]:
+    """:func:`_iter_rows` reusing the rows of pages found in the session's page cache.
+
+    A page that follows a closing page (see :func:`_closes`) and closes itself is
+    assembled alone: no row crosses its edges, so its rows depend on its text only
+    and are cached with it. Other pages are assembled together with their
+    neighbours up to the next closing page, as in a single pass, and not cached.
+    """
+    head, i = _table_start(map(_tokenize, text_pages))
+    # Pages (or the rest of the header page) without tokens leave the assembler idle.
+    pending = [batch for batch in head if batch]
+    n = len(text_pages)
+    while True:
+        if pending and _closes(pending[-1]):
+            yield from _assemble(pending)
+            if any(map(_has_totals, pending)):
+                return
+            pending = []
+        if i == n:
+            break
+        if pending:
+            pending.append(_tokenize(text_pages[i]))
+            i += 1
+            continue
+        cached = session.cached_page_data(i, _ROWS_CACHE_NAME)
+        if cached is not None:
+            rows, last = cached
+            yield from map(tuple, rows)
+            if last:
+                return
+        else:
+            batch = _tokenize(text_pages[i])
+            if _closes(batch):
+                rows = list(_assemble([batch]))
+                last = _has_totals(batch)
+                session.store_page_data(i, _ROWS_CACHE_NAME, [rows, last])
+                yield from rows
+                if last:
+                    return
+            else:
+                pending = [batch]
+        i += 1
+    yield from _assemble(pending)
+
+
+# --- Geometry mode: rows from word coordinates instead of text lines -------------
+
+# Words whose tops differ by less than this (points) are on one visual line.
+_LINE_TOLERANCE = 3.0
+# Columns are left-aligned; allow for rounding in word x positions.
+_COLUMN_SLACK = 2.0
+# Column indices, in x order.
+_C_OP, _C_WO, _C_AMOUNT1, _C_AMOUNT2, _C_DESC, _C_CARD = range(6)
+
+_Word = dict[str, Any]
+
+
+def _visual_lines(words: Iterable[_Word]) -> list[list[_Word]]:
+    """Cluster words into lines by their top coordinate, each sorted by x."""
+    lines: list[list[_Word]] = []
+    top = float("-inf")
+    for w in sorted(words, key=lambda w: (w["top"], w["x0"])):
+        if w["top"] - top > _LINE_TOLERANCE:
+            lines.append([])
+            top = w["top"]
+        lines[-1].append(w)
+    for line in lines:
+        line.sort(key=lambda w: w["x0"])
+    return lines
+
+
+def _learn_columns(line: list[_Word]) -> list[float] | None:
+    """Left edges of the write-off..card columns, read off a full first row line.
+
+    That is the line ``<op_date> <wo_date> <amount1> ₽ <amount2> ₽ <desc...> [card]``,
+    the same shape Line-A matches in text mode.
+    """
+    texts = [w["text"] for w in line]
+    if len(texts) < 7 or not (_DATE_RE.match(texts[0]) and _DATE_RE.match(texts[1])):
+        return None
+    try:
+        end1 = texts.index("₽", 2)
+        end2 = texts.index("₽", end1 + 1)
+    except ValueError:
+        return None
+    desc = end2 + 1
+    if desc >= len(texts):
+        return None
+    edges = [line[1]["x0"], line[2]["x0"], line[end1 + 1]["x0"], line[desc]["x0"]]
+    # A card is only recognisable when the row's first line carries it; otherwise the
+    # description column runs to the right edge.
+    card = line[-1]["x0"] if len(texts) > desc + 1 and _CARD_RE.match(texts[-1]) else float("inf")
+    return [x - _COLUMN_SLACK for x in [*edges, card]]
+
+
+def _is_card_cell(line: list[_Word], edges: list[float]) -> bool:
+    # Description lines are left-aligned in their column, so a lone card-shaped word
+    # to the right of the column start belongs to the card column (e.g. a card that
+    # is vertically centred in its row, on a visual line of its own).
+    return (
+        len(line) == 1
+        and _CARD_RE.match(line[0]["text"]) is not None
+        and line[0]["x0"] > edges[_C_DESC - 1] + 2 * _COLUMN_SLACK
+    )
+
+
+def _cells_row(cells: list[list[str]]) -> _Row | None:
+    op = cells[_C_OP]
+    wo = cells[_C_WO]
+    op_time = next((t for t in op[1:] if _TIME_RE.match(t)), None)
+    wo_time = next((t for t in wo[1:] if _TIME_RE.match(t)), None)
+    if op_time is None or wo_time is None or not wo or not _DATE_RE.match(wo[0]):
+        # Same rule as text mode: a row without its time line is not a transaction.
+        return None
+    card = next((t for t in cells[_C_CARD] if _CARD_RE.match(t)), None)
+    return op[0], op_time, wo[0], wo_time, " ".join(cells[_C_AMOUNT1]), cells[_C_DESC], card
+
+
+def iter_transactions_geometry(word_pages: Iterable[list[_Word]]) -> Iterator[dict[str, Any]]:
+    """Yield transactions from word positions (``extract_words``, one list per page)
+    rather than text lines.
+
+    Column edges are learned from the first full row; words are clustered into visual
+    lines by y and assigned to columns by x, and a row runs from an operation date in
+    the first column to the next one. Unlike text mode this does not depend on how
+    pdfplumber orders a row's cells into lines, e.g. a vertically centred card column.
+    Header, footer and totals handling match text mode.
+    """
+    return map(_record, _iter_rows_geometry(word_pages))
+
+
+def _iter_rows_geometry(word_pages: Iterable[list[_Word]]) -> Iterator[_Row]:
+    edges: list[float] | None = None
+    row: list[list[str]] | None = None
+    for words in word_pages:
+        for line in _visual_lines(words):
+            text = " ".join(w["text"] for w in line)
+            if text.startswith(_TOTALS_PREFIXES):
+                if row is not None and (tx := _cells_row(row)) is not None:
+                    yield tx
+                return
+            if text.startswith(_FOOTER_PREFIXES):
+                # Footers end the current row; anything up to the next row is ignored.
+                if row is not None and (tx := _cells_row(row)) is not None:
+                    yield tx
+                row = None
+                continue
+            if _TABLE_HEADER_HINT in text:
+                continue
+            if edges is None:
+                edges = _learn_columns(line)
+                if edges is None:
+                    continue
+            elif edges[-1] == float("inf") and _is_card_cell(line, edges):
+                edges[-1] = line[0]["x0"] - _COLUMN_SLACK
+            cells: list[list[str]] = [[] for _ in range(6)]
+            for w in line:
+                cells[bisect_right(edges, w["x0"])].append(w["text"])
+            if cells[_C_OP] and _DATE_RE.match(cells[_C_OP][0]):
+                if row is not None and (tx := _cells_row(row)) is not None:
+                    yield tx
+                row = cells
+            elif row is not None:
+                for acc, texts in zip(row, cells, strict=True):
+                    acc += texts
+    if row is not None and (tx := _cells_row(row)) is not None:
+        yield tx
+
+
+def _page_words(
+    session: ExtractionSession, count: int, early: dict[int, list[_Word]]
+) -> Iterator[list[_Word]]:
+    # One page's words at a time; ``early`` holds pages already laid out.
+    for i in range(count):
+        yield early.pop(i) if i in early else session.layout(i).words
+
+
+def _extract_transactions(text_pages: Sequence[str]) -> list[dict[str, Any]]:
+    return list(iter_transactions(text_pages))
+
+
+class TBankCashflowParser(BaseParser):
+    """TBank "Справка о движении средств".
+
+    Transactions are read in one of three modes (``Settings.tbank_mode``):
+    ``text`` — line heuristics over extracted text; ``geometry`` — column positions
+    of words (:func:`iter_transactions_geometry`); ``auto`` (default) — text, then
+    geometry if the text finds no rows. Geometry needs the open PDF, so bare text
+    input is always parsed in text mode.
+    """
+
+    doc_type = TBANK_CASHFLOW.doc_type
+    version = TBANK_CASHFLOW.version
+    markers = TBANK_CASHFLOW.markers
+
+    def __init__(self, mode: str = "auto") -> None:
+        if mode not in TBANK_MODES:
+            raise ValueError(
+                f"Unknown TBank extraction mode: {mode!r} (expected one of {TBANK_MODES})"
+            )
+        self.mode = mode
+
+    @classmethod
+    def from_options(cls, options: ParserOptions) -> Self:
+        return cls(options.tbank_mode)
+
+    def parse(
+        self,
+        text_pages: Sequence[str],
+        meta: PdfMeta,
+        session: ExtractionSession | None = None,
+    ) -> dict[str, Any]:
+        out, rows = self._read(text_pages, meta, session)
+        data = out["data"]
+        # Keep the documented key order: transactions go before totals.
+        totals = data.pop("totals")
+        # Columnar until serialisation, which turns it into the usual list of objects.
+        with span("transactions"):
+            data["transactions"] = _table(rows)
+        data["totals"] = totals
+        return out
+
+    def parse_stream(
+        self,
+        text_pages: Sequence[str],
+        meta: PdfMeta,
+        session: ExtractionSession | None = None,
+    ) -> tuple[dict[str, Any], Iterator[tuple[str, dict[str, Any]]]]:
+        header, rows = self._read(text_pages, meta, session)
+        return header, (("transaction", _record(row)) for row in rows)
+
+    def _read(
+        self,
+        text_pages: Sequence[str],
+        meta: PdfMeta,
+        session: ExtractionSession | None,
+    ) -> tuple[dict[str, Any], Iterator[_Row]]:
+        word_pages: Iterator[list[_Word]] | None = None
+        field_pages: Sequence[str] = text_pages
+        if session is not None and self.mode == "geometry":
+            # Header fields read the first and last pages' text: take their words in
+            # the same layout pass rather than laying those pages out twice, and keep
+            # only those. Every other page is laid out as the rows reach it. Pages
+            # the fields never look at stay empty.
+            head, tail = _FIELDS.pages(len(text_pages))
+            texts = [""] * len(text_pages)
+            early: dict[int, list[_Word]] = {}
+            for i in (*head, *tail):
+                texts[i] = text_pages[i]
+                early[i] = session.layout(i).words
+            field_pages = texts
+            word_pages = _page_words(session, len(text_pages), early)
+        with span("header_fields"):
+            found = _FIELDS.extract(field_pages)
+        owner, address = found["owner"], found["address"]
+        contract_date, contract_no = found["contract_date"], found["contract_no"]
+        account_no, doc_date = found["account_no"], found["doc_date"]
+        period, balance = found["period"], found["balance"]
+        totals_in, totals_out = found["totals_in"], found["totals_out"]
 
         data: dict[str, Any] = {
             "owner_name": _clean_ws(owner.group(1)) if owner else None,
             "owner_address": _clean_ws(address.group(1)) if address else None,
-            "document_date": _ddmmyyyy_to_date(doc_date.group(1)).isoformat() if doc_date else None,
-            "contract_date": _ddmmyyyy_to_date(contract_date.group(1)).isoformat() if contract_date else None,
+            "document_date": ddmmyyyy_to_iso(doc_date.group(1)) if doc_date else None,
+            "contract_date": ddmmyyyy_to_iso(contract_date.group(1)) if contract_date else None,
             "contract_number": contract_no.group(1) if contract_no else None,
             "account_number": account_no.group(1) if account_no else None,
-            "available_balance_rub": decimal_to_str(parse_money_to_decimal(balance.group(2))) if balance else None,
+            "available_balance_rub": _money(balance.group(2)) if balance else None,
             "period": {
-                "start": _ddmmyyyy_to_date(period.group(1)).isoformat(),
-                "end": _ddmmyyyy_to_date(period.group(2)).isoformat(),
-            } if period else None,
-            "transactions": transactions,
+                "start": ddmmyyyy_to_iso(period.group(1)),
+                "end": ddmmyyyy_to_iso(period.group(2)),
+            }
+            if period
+            else None,
             "totals": {
-                "income_rub": decimal_to_str(parse_money_to_decimal(totals_in.group(1))) if totals_in else None,
-                "expense_rub": decimal_to_str(parse_money_to_decimal(totals_out.group(1))) if totals_out else None,
+                "income_rub": _money(totals_in.group(1)) if totals_in else None,
+                "expense_rub": _money(totals_out.group(1)) if totals_out else None,
             },
         }
 
-        return {
+        header = {
             "meta": {
                 "pages": meta.pages,
                 "title": meta.title,
@@ -262,3 +661,23 @@ class TBankCashflowParser(BaseParser):
             },
             "data": data,
         }
+        if word_pages is not None:
+            rows = _iter_rows_geometry(word_pages)
+        else:
+            rows = self._text_or_geometry(text_pages, session)
+        return header, rows
+
+    def _text_or_geometry(
+        self, text_pages: Sequence[str], session: ExtractionSession | None
+    ) -> Iterator[_Row]:
+        found = False
+        if session is not None and session.page_cache is not None:
+            rows = _iter_rows_paged(text_pages, session)
+        else:
+            rows = _iter_rows(text_pages)
+        for row in rows:
+            found = True
+            yield row
+        if not found and session is not None and self.mode == "auto":
+            pages = range(len(session))
+            yield from _iter_rows_geometry(session.layout(i).words for i in pages)
@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+from collections.abc import Generator
+from contextlib import ExitStack
+from dataclasses import asdict, dataclass
+from io import BytesIO
+from pathlib import Path
+from typing import Any, BinaryIO
+
+from app.aggregation import aggregate_result
+from app.page_cache import PageCache
+from app.parsers.manifest import ParserOptions
+from app.parsers.registry import ParseResult, detect_spec, parse_document, stream_document
+from app.serialization import dumps
+from app.utils.pdf import ExtractionSession, open_leading_pages, open_session
+from app.utils.timing import collect_stages, span
+
+# Below this many pages, process start-up and IPC cost more than parallel
+# extraction saves.
+PARALLEL_MIN_PAGES = 16
+
+
+class PdfOpenError(ValueError):
+    """The upload could not be opened or read as a PDF."""
+
+
+class NoTextLayerError(ValueError):
+    """The PDF has no extractable text (likely a scan)."""
+
+
+def parse_pdf(
+    source: Path | BinaryIO,
+    page_jobs: int = 1,
+    page_cache: PageCache | None = None,
+    options: ParserOptions | None = None,
+) -> ParseResult:
+    """Extract text from a PDF and run it through the parser registry.
+
+    Shared by the CLI, the HTTP API and the worker processes of the extraction engine.
+    ``page_jobs > 1`` extracts long documents with that many page-worker processes;
+    ``page_cache`` reuses the text (and parsed rows) of pages seen before.
+    """
+    with ExitStack() as stack:
+        session = _open_with_text(stack, source, page_jobs, page_cache)
+        return parse_document(session.pages, session.meta, session, options)
+
+
+def stream_pdf(
+    source: Path | BinaryIO,
+    page_jobs: int = 1,
+    page_cache: PageCache | None = None,
+    options: ParserOptions | None = None,
+) -> Generator[bytes, None, None]:
+    """Parse a PDF into NDJSON lines (see ``stream_document``), yielded as produced.
+
+    The document stays open until the generator is exhausted or closed. Open/no-text
+    errors are raised by the first ``next()``, before any output is produced.
+    """
+    with ExitStack() as stack:
+        session = _open_with_text(stack, source, page_jobs, page_cache)
+        for record in stream_document(session.pages, session.meta, session, options):
+            yield dumps(record) + b"\n"
+
+
+def _open_with_text(
+    stack: ExitStack, source: Path | BinaryIO, page_jobs: int, page_cache: PageCache | None
+) -> ExtractionSession:
+    # The session (and every page layout it caches) is closed when ``stack`` exits,
+    # i.e. as soon as the parse or the stream is done.
+    try:
+        session = stack.enter_context(open_session(source, page_cache))
+        text_pages = session.pages
+        # Pages are extracted lazily, so this stops at the first page with text.
+        has_text = any(t.strip() for t in text_pages)
+        if has_text and len(text_pages) >= PARALLEL_MIN_PAGES:
+            text_pages.prefetch(page_jobs)
+    except Exception as e:  # noqa: BLE001
+        raise PdfOpenError(str(e)) from e
+    if not has_text:
+        raise NoTextLayerError("PDF contains no extractable text (likely scanned).")
+    return session
+
+
+def detect_pdf(source: Path | BinaryIO) -> dict[str, Any]:
+    """Route a PDF without parsing it: ``{"doc_type", "version", "meta"}``.
+
+    Reads the document info and page count from the trailer and page tree, plus
+    the first page's text if a parser's markers need it; milliseconds whatever the
+    document's length. Unlike :func:`parse_pdf`, a PDF without text is not an
+    error (it is reported as the generic type).
+    """
+    try:
+        with open_leading_pages(source) as pages:
+            spec = detect_spec(pages, pages.meta)
+            meta = pages.meta
+    except Exception as e:  # noqa: BLE001
+        raise PdfOpenError(str(e)) from e
+    return {"doc_type": spec.doc_type, "version": spec.version, "meta": asdict(meta)}
+
+
+def detect_pdf_paths(paths: list[str]) -> list[bytes | dict[str, str]]:
+    """Engine job: :func:`detect_pdf` of each path as compact JSON, or the error."""
+    out: list[bytes | dict[str, str]] = []
+    for path in paths:
+        try:
+            out.append(dumps(detect_pdf(Path(path))))
+        except PdfOpenError as e:
+            out.append({"type": type(e).__name__, "message": str(e)})
+    return out
+
+
+def parse_pdf_bytes(blob: bytes, page_jobs: int = 1) -> ParseResult:
+    return parse_pdf(BytesIO(blob), page_jobs)
+
+
+def encode_result(result: ParseResult) -> bytes:
+    """Compact UTF-8 JSON body, the same bytes the API returns and the cache stores."""
+    with span("encode"):
+        return dumps(result.to_dict())
+
+
+@dataclass(frozen=True)
+class TimedPayload:
+    """An encoded result plus what the server's metrics need to know about the parse."""
+
+    payload: bytes
+    doc_type: str
+    pages: int
+    # Seconds per stage (see app.utils.timing), measured where the job ran.
+    stages: dict[str, float]
+
+
+def parse_pdf_path_to_json(
+    path: str,
+    page_jobs: int = 1,
+    aggregate: bool = False,
+    page_cache: PageCache | None = None,
+    options: ParserOptions | None = None,
+) -> bytes:
+    # Engine job: workers reopen the spooled upload by path, so only the path
+    # crosses the process boundary (the page cache pickles as its directory).
+    # Encoding in the worker keeps serialisation off the event loop too.
+    return encode_result(_parse_path(path, page_jobs, aggregate, page_cache, options))
+
+
+def parse_pdf_path_timed(
+    path: str,
+    page_jobs: int = 1,
+    aggregate: bool = False,
+    page_cache: PageCache | None = None,
+    options: ParserOptions | None = None,
+) -> TimedPayload:
+    """:func:`parse_pdf_path_to_json` with a per-stage timing of the job."""
+    with collect_stages() as timer:
+        result = _parse_path(path, page_jobs, aggregate, page_cache, options)
+        payload = encode_result(result)
+    pages = int(result.meta.get("pages") or 0)
+    return TimedPayload(payload, result.doc_type, pages, timer.stages)
+
+
+@dataclass(frozen=True)
+class TimedStream:
+    """What the server's metrics need to know about a parse written as NDJSON."""
+
+    doc_type: str
+    pages: int
+    stages: dict[str, float]
+
+
+def stream_pdf_path_timed(
+    path: str,
+    out_path: str,
+    page_jobs: int = 1,
+    page_cache: PageCache | None = None,
+    options: ParserOptions | None = None,
+) -> TimedStream:
+    """Engine job: write :func:`stream_pdf`'s lines for ``path`` to ``out_path``.
+
+    Records are written as they are produced, so neither the full result nor its
+    serialised body is held in memory; the server sends the file once the job is
+    done. Open/no-text errors are raised before ``out_path`` is written to.
+    """
+    with collect_stages() as timer, ExitStack() as stack:
+        session = _open_with_text(stack, Path(path), page_jobs, page_cache)
+        records = stream_document(session.pages, session.meta, session, options)
+        header = next(records)
+        # Items are parsed as they are written; their encoding is counted with them.
+        with open(out_path, "wb") as out, span("parser"):
+            out.write(dumps(header) + b"\n")
+            for record in records:
+                out.write(dumps(record) + b"\n")
+    pages = int(header["meta"].get("pages") or 0)
+    return TimedStream(header["doc_type"], pages, timer.stages)
+
+
+def _parse_path(
+    path: str,
+    page_jobs: int,
+    aggregate: bool,
+    page_cache: PageCache | None,
+    options: ParserOptions | None,
+) -> ParseResult:
+    result = parse_pdf(Path(path), page_jobs, page_cache, options)
+    if aggregate:
+        with span("aggregate"):
+            result = aggregate_result(result)
+    return result
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import json
+import os
+from collections.abc import Callable
+from datetime import date, datetime
+from decimal import Decimal
+from functools import cache
+from typing import Any, Protocol
+
+from app.parsers.transactions import TransactionTable
+from app.utils.money import decimal_to_str
+
+
+class Serializer(Protocol):
+    name: str
+
+    def dumps(self, obj: Any, pretty: bool = False) -> bytes: ...
+
+
+def encode_default(obj: Any) -> Any:
+    """Encode the non-JSON types parsers are allowed to return.
+
+    Money stays a 2-decimal string and datetimes are minute precision, matching the
+    documented output format. Transaction tables become the usual list of objects.
+    """
+    if isinstance(obj, Decimal):
+        return decimal_to_str(obj)
+    if isinstance(obj, datetime):
+        return obj.isoformat(timespec="minutes")
+    if isinstance(obj, date):
+        return obj.isoformat()
+    if isinstance(obj, TransactionTable):
+        return obj.to_records()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class StdlibSerializer:
+    name = "stdlib"
+
+    def dumps(self, obj: Any, pretty: bool = False) -> bytes:
+        if pretty:
+            text = json.dumps(obj, ensure_ascii=False, indent=2, default=encode_default)
+        else:
+            text = json.dumps(
+                obj, ensure_ascii=False, separators=(",", ":"), default=encode_default
+            )
+        return text.encode("utf-8")
+
+
+class OrjsonSerializer:
+    name = "orjson"
+
+    def __init__(self) -> None:
+        import orjson
+
+        self._dumps: Callable[..., bytes] = orjson.dumps
+        # Route datetimes through encode_default so both backends emit the same bytes.
+        self._compact = orjson.OPT_PASSTHROUGH_DATETIME
+        self._pretty = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_INDENT_2
+
+    def dumps(self, obj: Any, pretty: bool = False) -> bytes:
+        return self._dumps(
+            obj, default=encode_default, option=self._pretty if pretty else self._compact
+        )
+
+
+_BACKENDS: dict[str, Callable[[], Serializer]] = {
+    "stdlib": StdlibSerializer,
+    "orjson": OrjsonSerializer,
+}
+
+
+@cache
+def get_serializer(name: str | None = None) -> Serializer:
+    """Return the named JSON backend.
+
+    ``None`` reads ``PDF_PARSER_JSON_BACKEND``; ``"auto"`` (the default) picks orjson
+    when it is installed (``pip install pdf-parser-service[fast]``) and falls back to
+    the standard library otherwise.
+    """
+    name = name or os.environ.get("PDF_PARSER_JSON_BACKEND", "auto")
+    if name == "auto":
+        try:
+            return OrjsonSerializer()
+        except ImportError:
+            return StdlibSerializer()
+    try:
+        return _BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown JSON backend: {name!r}") from None
+
+
+def dumps(obj: Any, pretty: bool = False) -> bytes:
+    """Serialise to UTF-8 JSON with the configured backend; compact unless ``pretty``."""
+    return get_serializer().dumps(obj, pretty)
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import os
+from collections.abc import Mapping
+from dataclasses import dataclass, fields
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from app.parsers.manifest import ParserOptions
+
+_ENV_PREFIX = "PDF_PARSER_"
+
+
+def _default_workers() -> int:
+    return min(4, os.cpu_count() or 1)
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Runtime knobs for the HTTP service.
+
+    Every field can be overridden with a ``PDF_PARSER_<FIELD>`` environment variable,
+    e.g. ``PDF_PARSER_WORKERS=8``.
+    """
+
+    # Extraction engine: 0 workers runs jobs in a thread instead of a process pool.
+    workers: int = _default_workers()
+    # Jobs allowed to wait for a free worker before new uploads get 503.
+    queue_depth: int = 16
+    # Seconds a job may wait in that queue before it gets 503 instead.
+    queue_timeout: float = 30.0
+    # Parses run at once (0 = one per worker). With adaptive_concurrency the limit
+    # moves between 1 and this value following per-page parse latency.
+    max_concurrent_parses: int = 0
+    adaptive_concurrency: bool = False
+    # Seconds a single parse job may run before its worker is killed.
+    job_timeout: float = 60.0
+    max_upload_bytes: int = 20 * 1024 * 1024
+    # Request bodies being received or parsed at once, summed; past it new uploads
+    # get 429 (0 = unlimited). Per server process.
+    max_inflight_upload_bytes: int = 256 * 1024 * 1024
+    # Where uploads are spooled while being parsed; None = the system temp dir.
+    spool_dir: str | None = None
+    # How TBank transactions are read: "auto", "text" or "geometry" (see
+    # TBankCashflowParser). Other than "auto" it is part of the result cache key.
+    tbank_mode: str = "auto"
+    # Page-worker processes per document (at most the CPU count); 1 = sequential.
+    # Engine workers always extract sequentially, so this only applies to workers=0.
+    page_jobs: int = 1
+    # Result cache: in-memory LRU limits (0 entries disables it) and an optional
+    # SQLite directory that survives restarts.
+    cache_entries: int = 256
+    cache_max_bytes: int = 64 * 1024 * 1024
+    cache_dir: str | None = None
+    # Per-page cache of extracted text and parsed rows, keyed by page content (None =
+    # off); least recently used pages are evicted past the byte limit.
+    page_cache_dir: str | None = None
+    page_cache_max_bytes: int = 256 * 1024 * 1024
+    # Add a Server-Timing header (per-stage milliseconds) to /v1/parse JSON responses.
+    server_timing: bool = False
+    # Async job API (/v1/jobs): the SQLite job store and queued uploads live in
+    # jobs_dir (None = a temp dir, so queued work does not survive a restart).
+    jobs_dir: str | None = None
+    # Job items parsed at once (0 = one per engine worker).
+    jobs_concurrency: int = 0
+    # Files allowed to wait across all jobs before new jobs get 503.
+    jobs_queue_limit: int = 1000
+    jobs_max_upload_bytes: int = 512 * 1024 * 1024
+    # Finished jobs and their results are deleted after this many seconds.
+    jobs_retention: float = 7 * 24 * 3600.0
+    # Files per /v1/detect call (its body limit is jobs_max_upload_bytes).
+    detect_max_files: int = 100
+
+    @classmethod
+    def from_env(cls, environ: Mapping[str, str] | None = None, **overrides: Any) -> Settings:
+        env = os.environ if environ is None else environ
+        values: dict[str, Any] = {}
+        for f in fields(cls):
+            raw = env.get(_ENV_PREFIX + f.name.upper())
+            if raw is None:
+                continue
+            values[f.name] = _coerce(raw, type(getattr(cls, f.name)))
+        values.update({k: v for k, v in overrides.items() if v is not None})
+        return cls(**values)
+
+    @property
+    def parser_options(self) -> ParserOptions:
+        from app.parsers.manifest import ParserOptions
+
+        return ParserOptions(tbank_mode=self.tbank_mode)
+
+
+def _coerce(raw: str, kind: type) -> Any:
+    if kind is type(None):
+        return raw or None
+    if kind is bool:
+        return raw.strip().lower() in ("1", "true", "yes", "on")
+    return kind(raw)
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from datetime import date
+from functools import lru_cache
+
+# Statements have many rows per day and few distinct days, so day-level work
+# (calendar validation, ISO formatting) is done once per distinct date.
+_DAY_CACHE = 4096
+
+# Epoch minutes (the statements' time encoding) count from 1970-01-01 00:00, naive.
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+MINUTES_PER_DAY = 1440
+
+
+@lru_cache(maxsize=_DAY_CACHE)
+def _parse_day(d: str) -> tuple[int, str]:
+    # 'dd.mm.yyyy' -> (days since 1970-01-01, 'yyyy-mm-dd').
+    if len(d) != 10 or d[2] != "." or d[5] != "." or not d.isascii():
+        raise ValueError(f"Bad date: {d!r}")
+    day, month, year = d[:2], d[3:5], d[6:]
+    if not (day + month + year).isdigit():
+        raise ValueError(f"Bad date: {d!r}")
+    # date() validates the calendar date (month range, 30/31 days, leap years).
+    ordinal = date(int(year), int(month), int(day)).toordinal()
+    return ordinal - EPOCH_ORDINAL, f"{year}-{month}-{day}"
+
+
+@lru_cache(maxsize=_DAY_CACHE)
+def _day_iso(days: int) -> str:
+    return days_to_date(days).isoformat()
+
+
+def days_to_date(days: int) -> date:
+    """Days since 1970-01-01 (epoch minutes // ``MINUTES_PER_DAY``) -> date."""
+    return date.fromordinal(days + EPOCH_ORDINAL)
+
+
+def _parse_time(t: str) -> int:
+    # 'hh:mm' -> minutes since midnight.
+    if len(t) != 5 or t[2] != ":" or not t.isascii() or not (t[:2] + t[3:]).isdigit():
+        raise ValueError(f"Bad time: {t!r}")
+    hour, minute = int(t[:2]), int(t[3:])
+    if hour > 23 or minute > 59:
+        raise ValueError(f"Bad time: {t!r}")
+    return hour * 60 + minute
+
+
+def ddmmyyyy_to_iso(d: str) -> str:
+    """'22.01.2026' -> '2026-01-22'."""
+    return _parse_day(d)[1]
+
+
+def ddmmyyyy_hhmm_to_iso(d: str, t: str) -> str:
+    """'22.01.2026', '11:08' -> '2026-01-22T11:08', without a datetime round-trip."""
+    _parse_time(t)
+    return f"{_parse_day(d)[1]}T{t}"
+
+
+def ddmmyyyy_hhmm_to_minutes(d: str, t: str) -> int:
+    """'22.01.2026', '11:08' -> minutes since 1970-01-01 00:00 (naive, like the statement)."""
+    return _parse_day(d)[0] * MINUTES_PER_DAY + _parse_time(t)
+
+
+def minutes_to_iso(minutes: int) -> str:
+    """Epoch minutes -> 'YYYY-MM-DDTHH:MM'."""
+    days, rest = divmod(minutes, MINUTES_PER_DAY)
+    hour, minute = divmod(rest, 60)
+    return f"{_day_iso(days)}T{hour:02d}:{minute:02d}"
@@ -1,8 +1,7 @@
 from __future__ import annotations
 
-from decimal import Decimal
 import re
-
+from decimal import Decimal
 
 _MONEY_RE = re.compile(
     r"""(?x)
@@ -30,3 +29,51 @@ def parse_money_to_decimal(value: str) -> Decimal:
 def decimal_to_str(d: Decimal) -> str:
     # Keep 2 decimal places in string JSON output
     return f"{d:.2f}"
+
+
+_MONEY_SUFFIXES = ("₽", "RUB", "руб.", "руб", "р.")
+
+
+def parse_money_to_kopecks(value: str) -> int:
+    """Integer twin of :func:`parse_money_to_decimal`: '-1 599.00 ₽' -> -159900.
+
+    The usual statement formats are handled with plain string operations; anything
+    else goes through ``_MONEY_RE``, so both functions accept exactly the same input.
+    """
+    s = value.strip()
+    for suffix in _MONEY_SUFFIXES:
+        if s.endswith(suffix):
+            s = s[: -len(suffix)].rstrip()
+            break
+    sign = 1
+    if s and s[0] in "+-":
+        sign = -1 if s[0] == "-" else 1
+        s = s[1:].lstrip()
+    sep = max(s.rfind("."), s.rfind(","))
+    integer, frac = (s[:sep], s[sep + 1 :]) if sep >= 0 else (s, "")
+    integer = integer.replace(" ", "")
+    if (
+        integer.isascii()
+        and integer.isdigit()
+        and len(frac) <= 2
+        and (not frac or (frac.isascii() and frac.isdigit()))
+    ):
+        return sign * (int(integer) * 100 + int(frac.ljust(2, "0")))
+    return _parse_money_to_kopecks_re(value)
+
+
+def _parse_money_to_kopecks_re(value: str) -> int:
+    m = _MONEY_RE.search(value.strip())
+    if not m:
+        raise ValueError(f"Cannot parse money: {value!r}")
+    sign = -1 if (m.group("sign") == "-") else 1
+    integer = int("".join(m.group("int").split()))
+    frac = int((m.group("frac") or "0").ljust(2, "0")[:2])
+    return sign * (integer * 100 + frac)
+
+
+def kopecks_to_str(kopecks: int) -> str:
+    """Same 2-decimal format as :func:`decimal_to_str`: -159900 -> '-1599.00'."""
+    sign = "-" if kopecks < 0 else ""
+    rub, kop = divmod(abs(kopecks), 100)
+    return f"{sign}{rub}.{kop:02d}"
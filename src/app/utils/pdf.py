@@ -1,10 +1,26 @@
 from __future__ import annotations
 
+import atexit
+import multiprocessing
+import os
+from collections import OrderedDict
+from collections.abc import Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass
+from functools import cache, cached_property
+from io import BytesIO
 from pathlib import Path
-from typing import Any, BinaryIO
+from typing import Any, BinaryIO, cast, overload
 
 import pdfplumber
+from pdfminer.pdfpage import PDFPage
+from pdfminer.pdftypes import resolve1
+from pdfplumber.page import Page
+from pdfplumber.pdf import PDF
+
+from app.page_cache import PageCache, PageCacheStats, page_key
+from app.utils.timing import span
 
 
 @dataclass(frozen=True)
@@ -28,23 +44,427 @@ def _clean_text(text: str) -> str:
     )
 
 
-def extract_text_pages(source: Path | BinaryIO) -> tuple[list[str], PdfMeta]:
+def _read_meta(pdf: PDF, pages: int | None = None) -> PdfMeta:
+    meta: dict[str, Any] = pdf.metadata or {}
+    return PdfMeta(
+        pages=len(pdf.pages) if pages is None else pages,
+        title=_clean_text(meta.get("Title", "")) or None,
+        author=_clean_text(meta.get("Author", "")) or None,
+        producer=_clean_text(meta.get("Producer", "")) or None,
+        creator=_clean_text(meta.get("Creator", "")) or None,
+        subject=_clean_text(meta.get("Subject", "")) or None,
+    )
+
+
+def _page_text(page: Any) -> str:
+    return _clean_text(page.extract_text(x_tolerance=2, y_tolerance=2) or "")
+
+
+def _extract_page(page: Any) -> str:
+    try:
+        return _page_text(page)
+    finally:
+        # Drop pdfplumber's cached chars/layout for this page.
+        page.close()
+
+
+def _extract_pages(source: str | bytes, indices: list[int]) -> list[str]:
+    """Worker job: open the PDF independently and extract the given pages."""
+    with pdfplumber.open(source if isinstance(source, str) else BytesIO(source)) as pdf:
+        return [_extract_page(pdf.pages[i]) for i in indices]
+
+
+# Page-worker processes a document may fan out to; 1 keeps extraction in-process.
+_page_workers_max = os.cpu_count() or 1
+
+
+def disable_page_workers() -> None:
+    """Extract pages sequentially in this process whatever ``jobs`` asks for.
+
+    Called in extraction engine workers: they already run one document each, and a
+    worker killed on timeout would leave its page workers running.
+    """
+    global _page_workers_max
+    _page_workers_max = 1
+
+
+@cache
+def _page_executor(jobs: int) -> ProcessPoolExecutor:
+    # One long-lived pool per process and size: spawning workers per document would
+    # cost more than it saves. Shut down at exit so its workers do not outlive us.
+    executor = ProcessPoolExecutor(
+        max_workers=jobs, mp_context=multiprocessing.get_context("spawn")
+    )
+    atexit.register(executor.shutdown, cancel_futures=True)
+    return executor
+
+
+class PageLayout:
+    """Layout objects of one page, computed on first use and shared by every consumer.
+
+    pdfplumber lays the page out once (on the first property read); text, words and
+    lines are all derived from that pass and cached here until :meth:`close`.
+    """
+
+    def __init__(self, page: Page) -> None:
+        self._page = page
+
+    @cached_property
+    def text(self) -> str:
+        with span("extract"):
+            return _page_text(self._page)
+
+    @cached_property
+    def chars(self) -> list[dict[str, Any]]:
+        with span("extract"):
+            return self._page.chars
+
+    @cached_property
+    def words(self) -> list[dict[str, Any]]:
+        # Same tolerances as ``text`` so words line up with the extracted text.
+        with span("extract"):
+            return self._page.extract_words(x_tolerance=2, y_tolerance=2)
+
+    @cached_property
+    def text_lines(self) -> list[dict[str, Any]]:
+        with span("extract"):
+            return self._page.extract_text_lines(x_tolerance=2, y_tolerance=2)
+
+    @cached_property
+    def lines(self) -> list[dict[str, Any]]:
+        """Ruling lines (table borders, underlines) as drawn in the PDF."""
+        return self._page.lines
+
+    def close(self) -> None:
+        for name in ("text", "chars", "words", "text_lines", "lines"):
+            self.__dict__.pop(name, None)
+        self._page.close()
+
+
+class ExtractionSession:
+    """An open PDF with per-page layout computed lazily and shared by all consumers.
+
+    Detection, text extraction and parsers that need geometry (``layout(i).words``)
+    read the same cached layout instead of each re-running pdfplumber. Layouts of the
+    ``window`` most recently used pages are kept; older ones are released, so memory
+    stays around a couple of pages' layout however long the document is. Page texts
+    (see :attr:`pages`) are kept for the whole session. :meth:`close` frees every
+    cache and the document; use the session as a context manager.
+
+    With a ``page_cache``, page texts and per-page parser data are looked up by page
+    content first (see :meth:`cached_text`, :meth:`cached_page_data`); a page found
+    there is never laid out for its text.
+    """
+
+    def __init__(
+        self,
+        pdf: PDF,
+        source: Path | BinaryIO | None = None,
+        window: int = 2,
+        page_cache: PageCache | None = None,
+    ) -> None:
+        self._pdf = pdf
+        self._source = source
+        self._window = max(1, window)
+        self._layouts: OrderedDict[int, PageLayout] = OrderedDict()
+        self.meta = _read_meta(pdf)
+        self.page_cache = page_cache
+        # Reuse counts of this document, added to the cache's totals on close.
+        self.page_stats = PageCacheStats()
+        self._keys: list[str | None] = [None] * self.meta.pages
+        self._key_memo: dict[int, bytes] = {}
+        self._reused: set[str] = set()
+        self.pages = PdfPages(self)
+
+    def __enter__(self) -> ExtractionSession:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.meta.pages
+
+    @property
+    def open_layouts(self) -> int:
+        """Pages whose layout is currently held in memory."""
+        return len(self._layouts)
+
+    def layout(self, index: int) -> PageLayout:
+        layout = self._layouts.get(index)
+        if layout is not None:
+            self._layouts.move_to_end(index)
+            return layout
+        layout = PageLayout(self._pdf.pages[index])
+        self._layouts[index] = layout
+        while len(self._layouts) > self._window:
+            _, evicted = self._layouts.popitem(last=False)
+            evicted.close()
+        return layout
+
+    def release(self) -> None:
+        """Drop every cached page layout; the document stays open."""
+        while self._layouts:
+            _, layout = self._layouts.popitem()
+            layout.close()
+
+    def close(self) -> None:
+        self.release()
+        self._pdf.close()
+        if self.page_cache is not None:
+            self.page_cache.record(self.page_stats, self._reused)
+            self.page_stats = PageCacheStats()
+            self._reused.clear()
+
+    def page_key(self, index: int) -> str:
+        """Content hash of a page (see :func:`app.page_cache.page_key`)."""
+        key = self._keys[index]
+        if key is None:
+            key = self._keys[index] = page_key(self._pdf.pages[index].page_obj, self._key_memo)
+        return key
+
+    def cached_text(self, index: int) -> str | None:
+        """A page's text from the page cache, if this page content was extracted before."""
+        if self.page_cache is None:
+            return None
+        with span("page_cache"):
+            key = self.page_key(index)
+            text = self.page_cache.get_text(key)
+        if text is not None:
+            self.page_stats.text_reused += 1
+            self._reused.add(key)
+        return text
+
+    def store_text(self, index: int, text: str) -> None:
+        if self.page_cache is not None:
+            self.page_stats.text_extracted += 1
+            with span("page_cache"):
+                self.page_cache.put_text(self.page_key(index), text)
+
+    def cached_page_data(self, index: int, name: str) -> Any | None:
+        """Data a parser stored for this page content under ``name``, if any.
+
+        ``name`` should include the parser's version, so a parser change does not
+        reuse what an older version derived.
+        """
+        if self.page_cache is None:
+            return None
+        with span("page_cache"):
+            value = self.page_cache.get_data(self.page_key(index), name)
+        if value is not None:
+            self.page_stats.data_reused += 1
+        return value
+
+    def store_page_data(self, index: int, name: str, value: Any) -> None:
+        """Cache JSON-serialisable ``value``, derived from this page's text alone."""
+        if self.page_cache is not None:
+            self.page_stats.data_computed += 1
+            with span("page_cache"):
+                self.page_cache.put_data(self.page_key(index), name, value)
+
+    def shared_source(self) -> str | bytes:
+        """Something a worker process can reopen the document from."""
+        if isinstance(self._source, (str, Path)):
+            return str(self._source)
+        if isinstance(self._source, BytesIO):
+            return self._source.getvalue()
+        stream = self._pdf.stream
+        stream.seek(0)
+        return stream.read()
+
+
+class PdfPages(Sequence[str]):
+    """Page texts of a session's PDF, extracted on first access.
+
+    Parsers receive this instead of a fully built list: detection that only reads
+    ``pages[0]`` costs one page, and a parser that never touches a page never pays
+    for its layout. Layouts are released as the session's window moves on, so peak
+    memory stays around a couple of pages' worth of layout (plus the extracted
+    strings, which are small).
+    """
+
+    def __init__(self, session: ExtractionSession) -> None:
+        self._session = session
+        self._texts: list[str | None] = [None] * len(session)
+        self.meta = session.meta
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    @overload
+    def __getitem__(self, index: int) -> str: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[str]: ...
+
+    def __getitem__(self, index: int | slice) -> str | list[str]:
+        if isinstance(index, slice):
+            return [self._text(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return self._text(index)
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(len(self)):
+            yield self._text(i)
+
+    @property
+    def extracted(self) -> int:
+        """Number of pages whose text has been extracted so far."""
+        return sum(t is not None for t in self._texts)
+
+    def prefetch(self, jobs: int) -> None:
+        """Extract every page not extracted yet, split across ``jobs`` worker processes.
+
+        Each worker reopens the document from its path (or from a copy of the
+        in-memory buffer) and extracts a contiguous chunk; results land back in page
+        order, so consumers see exactly what sequential extraction would produce.
+        Only text comes back; a parser asking for a prefetched page's layout still
+        lays it out in this process. ``jobs`` is capped at the CPU count, and at 1
+        after :func:`disable_page_workers`.
+        """
+        missing = [i for i, t in enumerate(self._texts) if t is None]
+        jobs = min(jobs, _page_workers_max)
+        if jobs <= 1 or len(missing) < 2:
+            return
+        if self._session.page_cache is not None:
+            for i in missing:
+                self._texts[i] = self._session.cached_text(i)
+            missing = [i for i in missing if self._texts[i] is None]
+            if not missing:
+                return
+        shared = self._session.shared_source()
+        size = -(-len(missing) // jobs)
+        chunks = [missing[i : i + size] for i in range(0, len(missing), size)]
+        with span("extract"):
+            executor = _page_executor(jobs)
+            for chunk, texts in zip(
+                chunks, executor.map(_extract_pages, [shared] * len(chunks), chunks), strict=True
+            ):
+                for i, text in zip(chunk, texts, strict=True):
+                    self._texts[i] = text
+                    self._session.store_text(i, text)
+
+    def _text(self, index: int) -> str:
+        text = self._texts[index]
+        if text is None:
+            text = self._session.cached_text(index)
+            if text is None:
+                text = self._session.layout(index).text
+                self._session.store_text(index, text)
+            self._texts[index] = text
+        return text
+
+
+def _declared_page_count(pdf: PDF) -> int | None:
+    """``/Count`` of the page tree root: the page count without walking the tree."""
+    try:
+        count = resolve1(resolve1(pdf.doc.catalog["Pages"])["Count"])
+    except Exception:  # noqa: BLE001 - malformed tree; the caller walks it instead
+        return None
+    return count if isinstance(count, int) and count >= 0 else None
+
+
+class LeadingPages(Sequence[str]):
+    """Page texts of a PDF for routing it, reading as little of the file as possible.
+
+    ``len()`` and :attr:`meta` come from the document info and the page tree root's
+    ``/Count``; page objects are only resolved up to the highest page asked for, and
+    only those pages are laid out. Building :class:`PdfPages` instead resolves every
+    page up front, which alone costs more than a first page's text on long documents.
+    """
+
+    def __init__(self, pdf: PDF) -> None:
+        self._pdf = pdf
+        count = _declared_page_count(pdf)
+        self.meta = _read_meta(pdf, count)
+        self._objs = PDFPage.create_pages(pdf.doc)
+        self._texts: list[str] = []
+
+    def __len__(self) -> int:
+        return self.meta.pages
+
+    @overload
+    def __getitem__(self, index: int) -> str: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[str]: ...
+
+    def __getitem__(self, index: int | slice) -> str | list[str]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        while len(self._texts) <= index:
+            obj = next(self._objs, None)
+            if obj is None:
+                # /Count overstated the pages; the missing ones read as blank.
+                self._texts.append("")
+                continue
+            with span("extract"):
+                self._texts.append(_extract_page(Page(self._pdf, obj, len(self._texts) + 1)))
+        return self._texts[index]
+
+    @property
+    def extracted(self) -> int:
+        return len(self._texts)
+
+
+def _open_pdf(source: Path | BinaryIO) -> PDF:
+    # pdfplumber reads any seekable binary stream; its annotation only names the
+    # concrete classes.
+    return pdfplumber.open(source if isinstance(source, Path) else cast(BytesIO, source))
+
+
+@contextmanager
+def open_leading_pages(source: Path | BinaryIO) -> Iterator[LeadingPages]:
+    """Open a PDF for detection (see :class:`LeadingPages`); closed on exit."""
+    with span("open"):
+        pdf = _open_pdf(source)
+        try:
+            pages = LeadingPages(pdf)
+        except BaseException:
+            pdf.close()
+            raise
+    try:
+        yield pages
+    finally:
+        pdf.close()
+
+
+@contextmanager
+def open_session(
+    source: Path | BinaryIO, page_cache: PageCache | None = None
+) -> Iterator[ExtractionSession]:
+    """Open a PDF as an :class:`ExtractionSession`; all caches are freed on exit."""
+    with span("open"):
+        pdf = _open_pdf(source)
+        try:
+            session = ExtractionSession(pdf, source, page_cache=page_cache)
+        except BaseException:
+            pdf.close()
+            raise
+    with session:
+        yield session
+
+
+@contextmanager
+def open_pdf_pages(source: Path | BinaryIO) -> Iterator[PdfPages]:
+    """Open a PDF and yield its lazily extracted pages; the file is closed on exit."""
+    with open_session(source) as session:
+        yield session.pages
+
+
+def extract_text_pages(source: Path | BinaryIO, jobs: int = 1) -> tuple[list[str], PdfMeta]:
     """Extract plain text page-by-page using pdfplumber.
 
-    Works best when PDF contains embedded text layer.
+    Works best when PDF contains embedded text layer. ``jobs > 1`` splits the page
+    range across that many worker processes.
     """
-    with pdfplumber.open(source) as pdf:
-        meta: dict[str, Any] = pdf.metadata or {}
-        text_pages: list[str] = []
-        for page in pdf.pages:
-            text = page.extract_text(x_tolerance=2, y_tolerance=2) or ""
-            text_pages.append(_clean_text(text))
-        pdf_meta = PdfMeta(
-            pages=len(pdf.pages),
-            title=_clean_text(meta.get("Title", "")) or None,
-            author=_clean_text(meta.get("Author", "")) or None,
-            producer=_clean_text(meta.get("Producer", "")) or None,
-            creator=_clean_text(meta.get("Creator", "")) or None,
-            subject=_clean_text(meta.get("Subject", "")) or None,
-        )
-    return text_pages, pdf_meta
+    with open_pdf_pages(source) as pages:
+        pages.prefetch(jobs)
+        return list(pages), pages.meta
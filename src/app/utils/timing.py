@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from contextvars import ContextVar
+
+# Stage names used across the pipeline, in pipeline order (reports list them so).
+STAGES = (
+    "upload",
+    "cache",
+    "queue",
+    "open",
+    "page_cache",
+    "extract",
+    "detect",
+    "parser",
+    "header_fields",
+    "transactions",
+    "aggregate",
+    "encode",
+)
+
+
+class StageTimer:
+    """Wall time per pipeline stage, for one parse.
+
+    Stages nest (detection extracts the first page, a parser extracts the rest as
+    it reads them); each stage is charged only its own time, with nested stages
+    subtracted, so the stages add up to the time spent inside any of them.
+    Repeated stages (one ``extract`` per page) accumulate.
+    """
+
+    def __init__(self) -> None:
+        self.stages: dict[str, float] = {}
+        self._stack: list[str] = []
+        self._mark = 0.0
+
+    def add(self, stage: str, seconds: float) -> None:
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def _switch(self, now: float) -> None:
+        if self._stack:
+            self.add(self._stack[-1], now - self._mark)
+        self._mark = now
+
+    @contextmanager
+    def span(self, stage: str) -> Iterator[None]:
+        self._switch(time.perf_counter())
+        self._stack.append(stage)
+        try:
+            yield
+        finally:
+            self._switch(time.perf_counter())
+            self._stack.pop()
+
+    def merge(self, stages: dict[str, float]) -> None:
+        """Add stages measured elsewhere (e.g. in an engine worker process)."""
+        for stage, seconds in stages.items():
+            self.add(stage, seconds)
+
+    def ordered(self) -> list[tuple[str, float]]:
+        known = [(s, self.stages[s]) for s in STAGES if s in self.stages]
+        return known + sorted((s, v) for s, v in self.stages.items() if s not in STAGES)
+
+
+_current: ContextVar[StageTimer | None] = ContextVar("stage_timer", default=None)
+_NO_SPAN = nullcontext()
+
+
+def span(stage: str) -> AbstractContextManager[None]:
+    """Time a block as ``stage`` if a :func:`collect_stages` block is active; else no-op."""
+    timer = _current.get()
+    if timer is None:
+        return _NO_SPAN
+    return timer.span(stage)
+
+
+@contextmanager
+def collect_stages() -> Iterator[StageTimer]:
+    """Record every :func:`span` in this context (and threads started from it)."""
+    timer = StageTimer()
+    token = _current.set(timer)
+    try:
+        yield timer
+    finally:
+        _current.reset(token)
+
+
+def format_profile(stages: list[tuple[str, float]], total: float) -> str:
+    """Human-readable stage breakdown (``pdf-parser parse --profile``)."""
+    lines = [f"{'stage':<16}{'ms':>10}{'%':>7}"]
+    # Whatever no span covered: imports, argument parsing, writing the output.
+    other = total - sum(seconds for _, seconds in stages)
+    for stage, seconds in [*stages, ("other", max(0.0, other))]:
+        share = 100 * seconds / total if total else 0.0
+        lines.append(f"{stage:<16}{seconds * 1000:10.1f}{share:7.1f}")
+    lines.append(f"{'total':<16}{total * 1000:10.1f}")
+    return "\n".join(lines)
+
+
+def server_timing(stages: list[tuple[str, float]], total: float) -> str:
+    """``Server-Timing`` header value, durations in milliseconds."""
+    parts = [f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in stages]
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
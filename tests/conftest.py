@@ -0,0 +1,11 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+
+import pytest
+from pdf_factory import build_pdf
+
+
+@pytest.fixture
+def make_pdf() -> Callable[..., bytes]:
+    return build_pdf
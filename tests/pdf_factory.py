@@ -0,0 +1,145 @@
+"""Minimal PDF writer shared by the tests and the benchmarks."""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+# Helvetica with a custom encoding that maps the upper half of the byte range to
+# Cyrillic glyphs, which is all pdfplumber needs to extract TBank-style text.
+_EXTRA_CHARS = "АБВГДЕЖЗИЙКЛМНОПРСТУФХЦЧШЩЪЫЬЭЮЯабвгдежзийклмнопрстуфхцчшщъыьэюяЁё«»—₽"
+_CODES = {ch: 128 + i for i, ch in enumerate(_EXTRA_CHARS)}
+
+
+def _encode(line: str) -> bytes:
+    out = bytearray()
+    for ch in line:
+        code = _CODES.get(ch)
+        if code is None:
+            code = ord(ch) if 32 <= ord(ch) < 127 else ord("?")
+            if ch in "()\\":
+                out.append(ord("\\"))
+        out.append(code)
+    return bytes(out)
+
+
+# A positioned text run: x, y (points from the bottom-left corner), text.
+Cell = tuple[float, float, str]
+
+
+def _page_content(page: str | Sequence[Cell]) -> bytes:
+    if isinstance(page, str):
+        return b"\n".join(
+            [b"BT /F1 9 Tf 11 TL 36 806 Td"]
+            + [b"(" + _encode(line) + b") Tj T*" for line in page.split("\n")]
+            + [b"ET"]
+        )
+    return b"\n".join(
+        b"BT /F1 9 Tf %.2f %.2f Td (" % (x, y) + _encode(text) + b") Tj ET" for x, y, text in page
+    )
+
+
+def build_pdf(
+    pages: Sequence[str | Sequence[Cell]],
+    *,
+    title: str | None = None,
+    producer: str | None = None,
+) -> bytes:
+    """Pages are either text (one line per ``\\n``) or positioned :data:`Cell` runs."""
+    differences = " ".join(f"{code} /uni{ord(ch):04X}" for ch, code in _CODES.items())
+    objects: list[bytes] = [
+        (
+            "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /FirstChar 32 /LastChar 255 "
+            f"/Widths [{' '.join(['550'] * 224)}] "
+            "/Encoding << /Type /Encoding /BaseEncoding /WinAnsiEncoding "
+            f"/Differences [{differences}] >> >>"
+        ).encode(),
+        b"",  # page tree, filled below
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< "
+        + (b"/Title (" + title.encode("latin-1") + b") " if title else b"")
+        + (b"/Producer (" + producer.encode("latin-1") + b") " if producer else b"")
+        + b">>",
+    ]
+    kids = []
+    for page in pages:
+        body = _page_content(page)
+        page_no = len(objects) + 1
+        kids.append(f"{page_no} 0 R")
+        objects.append(
+            (
+                "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                f"/Resources << /Font << /F1 1 0 R >> >> /Contents {page_no + 1} 0 R >>"
+            ).encode()
+        )
+        objects.append(f"<< /Length {len(body)} >>\nstream\n".encode() + body + b"\nendstream")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, obj in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{i} 0 obj\n".encode() + obj + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += b"".join(f"{off:010d} 00000 n \n".encode() for off in offsets)
+    out += (
+        f"trailer\n<< /Size {len(objects) + 1} /Root 3 0 R /Info 4 0 R >>\n"
+        f"startxref\n{xref}\n%%EOF\n"
+    ).encode()
+    return bytes(out)
+
+
+# One statement row: op date, op time, write-off date, write-off time, amount,
+# description lines, card ("—" for none).
+Row = tuple[str, str, str, str, str, Sequence[str], str]
+
+# Left edges of the TBank table columns: operation, write-off, two amounts,
+# description, card.
+_COLUMNS = (36.0, 96.0, 156.0, 236.0, 316.0, 530.0)
+
+
+def tbank_statement_cells(
+    rows: Sequence[Row], *, rows_per_page: int = 20, card_dy: float = 0.0
+) -> list[list[Cell]]:
+    """A TBank statement laid out in real columns, as the bank's PDFs are.
+
+    ``card_dy`` moves the card cell down (e.g. half a line, vertically centred in the
+    row), which breaks the text-line heuristics but not the column geometry.
+    """
+    op, wo, am1, am2, desc, card_x = _COLUMNS
+    pages: list[list[Cell]] = []
+    for start in range(0, max(len(rows), 1), rows_per_page):
+        y = 806.0
+        cells: list[Cell] = []
+        if start == 0:
+            for line in (
+                "АО «ТБАНК»",
+                "Справка о движении средств",
+                "Иванов Иван Иванович",
+                "Адрес места жительства: Москва",
+                "Движение средств за период с 01.01.2026 по 22.01.2026",
+            ):
+                cells.append((op, y, line))
+                y -= 11
+        cells.append((op, y, "Дата и время операции Дата списания Сумма Описание Карта"))
+        y -= 15
+        for op_date, op_time, wo_date, wo_time, amount, lines, card in rows[
+            start : start + rows_per_page
+        ]:
+            cells += [
+                (op, y, op_date),
+                (wo, y, wo_date),
+                (am1, y, amount),
+                (am2, y, amount),
+                (desc, y, lines[0]),
+                (card_x, y - card_dy, card),
+                (op, y - 11, op_time),
+                (wo, y - 11, wo_time),
+            ]
+            cells += [(desc, y - 11 * k, line) for k, line in enumerate(lines[1:], 1)]
+            y -= 11 * max(2, len(lines)) + 4
+        if start + rows_per_page >= len(rows):
+            cells += [(op, y - 6, "Пополнения: 1 000,00 ₽"), (op, y - 17, "Расходы: 400,00 ₽")]
+        cells += [(op, 40.0, "АО «ТБанк» универсальная лицензия"), (op, 29.0, "БИК 044525974")]
+        pages.append(cells)
+    return pages
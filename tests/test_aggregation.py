@@ -0,0 +1,45 @@
+from app.aggregation import aggregate, normalize_merchant
+from app.parsers.transactions import TransactionTable
+from app.utils.dates import ddmmyyyy_hhmm_to_minutes
+
+
+def _table() -> TransactionTable:
+    table = TransactionTable()
+    for d, kopecks, desc, card in [
+        ("31.12.2025", -10000, "Оплата в MAGNIT MM 1234", "4417"),
+        ("22.01.2026", -40000, "Внешний перевод по номеру телефона +79522362282", "9824"),
+        ("22.01.2026", 6525000, "Пополнение. Система быстрых платежей", None),
+        ("20.01.2026", -159900, "Оплата в Magnit MM 5678", "4417"),
+    ]:
+        minutes = ddmmyyyy_hhmm_to_minutes(d, "12:00")
+        table.append(minutes, minutes, kopecks, desc, card)
+    return table
+
+
+def test_normalize_merchant() -> None:
+    assert normalize_merchant("Оплата в MAGNIT MM 1234") == "оплата в magnit mm"
+    assert normalize_merchant("Внешний перевод +7 952 236-22-82") == "внешний перевод"
+    assert normalize_merchant("12345") == "12345"
+
+
+def test_aggregate_groups_and_reconciles() -> None:
+    agg = aggregate(_table(), {"income_rub": "65250.00", "expense_rub": "1600.00"})
+    assert (agg["count"], agg["income_rub"], agg["expense_rub"]) == (4, "65250.00", "2099.00")
+    assert [(r["key"], r["count"], r["net_rub"]) for r in agg["by_date"]] == [
+        ("2025-12-31", 1, "-100.00"),
+        ("2026-01-20", 1, "-1599.00"),
+        ("2026-01-22", 2, "64850.00"),
+    ]
+    assert [(r["key"], r["expense_rub"]) for r in agg["by_month"]] == [
+        ("2025-12", "100.00"),
+        ("2026-01", "1999.00"),
+    ]
+    assert [r["key"] for r in agg["by_card"]] == [None, "4417", "9824"]
+    magnit = next(r for r in agg["by_merchant"] if r["key"] == "оплата в magnit mm")
+    assert (magnit["count"], magnit["expense_rub"]) == (2, "1699.00")
+
+    recon = agg["reconciliation"]
+    assert recon["income"]["match"] is True
+    assert recon["expense"]["difference_rub"] == "499.00"
+    assert recon["ok"] is False
+    assert aggregate(TransactionTable())["reconciliation"]["ok"] is None
@@ -0,0 +1,284 @@
+import asyncio
+import json
+import zipfile
+from collections.abc import Callable
+from io import BytesIO
+from pathlib import Path
+from typing import Any
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from starlette.requests import ClientDisconnect
+
+from app.api.metrics import Metrics
+from app.api.server import _stream_ndjson, create_app
+from app.api.uploads import UploadBudgetMiddleware, spool_upload
+from app.engine import ExtractionEngine
+from app.settings import Settings
+
+
+def _client() -> TestClient:
+    return TestClient(create_app(Settings(workers=0)))
+
+
+def test_health() -> None:
+    with _client() as client:
+        assert client.get("/health").json() == {"status": "ok"}
+
+
+def test_parse_generic_pdf(make_pdf: Callable[..., bytes]) -> None:
+    blob = make_pdf(["Hello world", "Second page"], title="Demo")
+    with _client() as client:
+        r = client.post("/v1/parse", files={"file": ("a.pdf", blob, "application/pdf")})
+    assert r.status_code == 200
+    body = r.json()
+    assert body["doc_type"] == "generic_text_v1"
+    assert body["meta"]["pages"] == 2
+    assert body["meta"]["title"] == "Demo"
+    assert [p["text"] for p in body["data"]["pages"]] == ["Hello world", "Second page"]
+
+
+def test_parse_rejects_garbage_and_blank() -> None:
+    with _client() as client:
+        r = client.post("/v1/parse", files={"file": ("a.pdf", b"not a pdf", "application/pdf")})
+        assert r.status_code == 400
+        r = client.post("/v1/parse", files={"file": ("a.txt", b"x", "text/plain")})
+        assert r.status_code == 415
+
+
+def test_parse_no_text_layer(make_pdf: Callable[..., bytes]) -> None:
+    with _client() as client:
+        r = client.post("/v1/parse", files={"file": ("a.pdf", make_pdf([""]), "application/pdf")})
+    assert r.status_code == 422
+
+
+TBANK_PAGE = """АО «ТБАНК»
+Справка о движении средств
+Иванов Иван Иванович
+Адрес места жительства: Москва
+Движение средств за период с 01.01.2026 по 22.01.2026
+Дата и время операции Дата списания Сумма
+22.01.2026 22.01.2026 -400.00 ₽ -400.00 ₽ Внешний перевод 9824
+11:08 11:09 по номеру телефона
+21.01.2026 21.01.2026 +1 000.00 ₽ +1 000.00 ₽ Пополнение —
+10:00 10:00
+Пополнения: 1 000,00 ₽
+Расходы: 400,00 ₽"""
+
+
+def test_parse_ndjson_stream(make_pdf: Callable[..., bytes]) -> None:
+    blob = make_pdf([TBANK_PAGE])
+    files = {"file": ("a.pdf", blob, "application/pdf")}
+    with _client() as client:
+        by_query = client.post("/v1/parse?format=ndjson", files=files)
+        by_accept = client.post(
+            "/v1/parse", files=files, headers={"Accept": "application/x-ndjson"}
+        )
+        full = client.post("/v1/parse", files=files).json()
+
+    assert by_query.headers["content-type"] == "application/x-ndjson"
+    assert by_query.content == by_accept.content
+    records = [json.loads(line) for line in by_query.text.splitlines()]
+    header, *txs = records
+    assert header["type"] == "header"
+    assert header["doc_type"] == "tbank_cashflow_v1"
+    assert "transactions" not in header["data"]
+    assert header["data"]["totals"] == full["data"]["totals"]
+    assert [r["type"] for r in txs] == ["transaction", "transaction"]
+    assert [{k: v for k, v in r.items() if k != "type"} for r in txs] == full["data"][
+        "transactions"
+    ]
+
+
+def test_parse_aggregates(make_pdf: Callable[..., bytes]) -> None:
+    files = {"file": ("a.pdf", make_pdf([TBANK_PAGE]), "application/pdf")}
+    with _client() as client:
+        full = client.post("/v1/parse", files=files)
+        r = client.post("/v1/parse?aggregate=true", files=files)
+        again = client.post("/v1/parse?aggregate=true", files=files)
+        assert client.post("/v1/parse?aggregate=true&format=ndjson", files=files).status_code == 400
+
+    assert full.headers["x-cache"] == "MISS"
+    # Aggregated and full results are cached separately.
+    assert (r.headers["x-cache"], again.headers["x-cache"]) == ("MISS", "HIT")
+    data = r.json()["data"]
+    assert "transactions" not in data
+    agg = data["aggregates"]
+    assert (agg["income_rub"], agg["expense_rub"], agg["net_rub"]) == (
+        "1000.00",
+        "400.00",
+        "600.00",
+    )
+    assert [row["key"] for row in agg["by_date"]] == ["2026-01-21", "2026-01-22"]
+    assert agg["reconciliation"]["ok"] is True
+
+
+def test_parse_ndjson_reports_errors_before_streaming() -> None:
+    with _client() as client:
+        r = client.post(
+            "/v1/parse?format=ndjson", files={"file": ("a.pdf", b"garbage", "application/pdf")}
+        )
+    assert r.status_code == 400
+
+
+def test_ndjson_cleans_up_when_client_leaves_before_body(
+    make_pdf: Callable[..., bytes], tmp_path: Path
+) -> None:
+    engine = ExtractionEngine(workers=0, queue_depth=0, job_timeout=5)
+    settings = Settings(workers=0, spool_dir=str(tmp_path))
+
+    async def scenario() -> None:
+        upload = spool_upload(BytesIO(make_pdf([TBANK_PAGE])), 1 << 20, str(tmp_path))
+        response = await _stream_ndjson(engine, upload, settings, None, None, Metrics(), 0.0)
+        # Parsed by the engine before the response starts; only the output is left.
+        assert engine.pending == 0
+        assert [p.suffix for p in tmp_path.iterdir()] == [".ndjson"]
+
+        async def receive() -> dict[str, Any]:
+            return {"type": "http.disconnect"}
+
+        async def send(message: dict[str, Any]) -> None:
+            raise OSError("connection reset")
+
+        scope = {"type": "http", "asgi": {"spec_version": "2.4"}}
+        with pytest.raises(ClientDisconnect):
+            await response(scope, receive, send)
+
+    asyncio.run(scenario())
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_upload_limit_and_spool_cleanup(make_pdf: Callable[..., bytes], tmp_path: Path) -> None:
+    blob = make_pdf([TBANK_PAGE])
+    settings = Settings(workers=0, max_upload_bytes=len(blob), spool_dir=str(tmp_path))
+    with TestClient(create_app(settings)) as client:
+        ok = client.post("/v1/parse", files={"file": ("a.pdf", blob, "application/pdf")})
+        streamed = client.post(
+            "/v1/parse?format=ndjson", files={"file": ("a.pdf", blob, "application/pdf")}
+        )
+        # Over the file limit but within the multipart allowance: caught while spooling.
+        over = client.post("/v1/parse", files={"file": ("a.pdf", blob + b"x", "application/pdf")})
+        # Far over: refused from Content-Length, and mid-stream when none is declared.
+        huge = blob * 100
+        declared = client.post("/v1/parse", files={"file": ("a.pdf", huge, "application/pdf")})
+        chunked = client.post(
+            "/v1/parse",
+            content=(huge[i : i + 4096] for i in range(0, len(huge), 4096)),
+            headers={"Content-Type": "multipart/form-data; boundary=x"},
+        )
+
+    assert ok.status_code == streamed.status_code == 200
+    assert [over.status_code, declared.status_code, chunked.status_code] == [413, 413, 413]
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_metrics_and_server_timing(make_pdf: Callable[..., bytes]) -> None:
+    files = {"file": ("a.pdf", make_pdf([TBANK_PAGE]), "application/pdf")}
+    with TestClient(create_app(Settings(workers=0, server_timing=True))) as client:
+        r = client.post("/v1/parse", files=files)
+        streamed = client.post("/v1/parse?format=ndjson", files=files)
+        metrics = client.get("/metrics")
+
+    assert streamed.status_code == 200
+    stages = dict(part.split(";dur=") for part in r.headers["server-timing"].split(", "))
+    assert {"upload", "open", "extract", "detect", "parser", "encode", "total"} <= set(stages)
+    assert metrics.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = metrics.text
+    # NDJSON parses are timed and counted like JSON ones.
+    assert 'pdf_parser_stage_seconds_count{stage="extract",doc_type="tbank_cashflow_v1"} 2' in text
+    assert 'pdf_parser_pages_total{doc_type="tbank_cashflow_v1"} 2' in text
+    assert 'pdf_parser_http_requests_total{route="/v1/parse",status="200"} 2' in text
+    # The /metrics request itself is the one in flight.
+    assert "pdf_parser_in_flight_requests 1" in text
+
+
+def test_jobs_api(make_pdf: Callable[..., bytes], tmp_path: Path) -> None:
+    archive = tmp_path / "batch.zip"
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("nested/b.pdf", make_pdf(["Hello"]))
+        zf.writestr("notes.txt", "not a statement")
+    files = [
+        ("files", ("a.pdf", make_pdf([TBANK_PAGE]), "application/pdf")),
+        ("files", ("broken.pdf", b"not a pdf", "application/pdf")),
+        ("files", ("batch.zip", archive.read_bytes(), "application/zip")),
+    ]
+    settings = Settings(workers=0, jobs_dir=str(tmp_path / "jobs"))
+    with TestClient(create_app(settings)) as client:
+        r = client.post("/v1/jobs", files=files)
+        assert r.status_code == 202
+        job_id = r.json()["id"]
+        assert r.headers["location"] == f"/v1/jobs/{job_id}"
+        assert r.json()["total"] == 3
+
+        # follow=true streams until every file is done.
+        r = client.get(f"/v1/jobs/{job_id}/results", params={"follow": "true"})
+        records = {rec["file"]: rec for rec in map(json.loads, r.text.splitlines())}
+        status = client.get(f"/v1/jobs/{job_id}").json()
+
+        assert client.delete(f"/v1/jobs/{job_id}").status_code == 204
+        assert client.get(f"/v1/jobs/{job_id}").status_code == 404
+        assert (
+            client.post("/v1/jobs", files=[files[0]], params={"aggregate": "x"}).status_code == 422
+        )
+
+    assert sorted(records) == ["a.pdf", "broken.pdf", "nested/b.pdf"]
+    assert records["a.pdf"]["index"] == 0
+    assert records["a.pdf"]["doc_type"] == "tbank_cashflow_v1"
+    assert records["broken.pdf"]["error"]["type"] == "PdfOpenError"
+    assert records["nested/b.pdf"]["doc_type"] == "generic_text_v1"
+    assert (status["status"], status["done"], status["failed"]) == ("done", 2, 1)
+    assert [item["file"] for item in status["items"]] == ["a.pdf", "broken.pdf", "nested/b.pdf"]
+    # Uploads are removed as items finish.
+    assert not list((tmp_path / "jobs" / "uploads").iterdir())
+
+
+def test_jobs_queue_limit(make_pdf: Callable[..., bytes]) -> None:
+    files = [("files", (f"{i}.pdf", make_pdf(["Hello"]), "application/pdf")) for i in range(3)]
+    with TestClient(create_app(Settings(workers=0, jobs_queue_limit=2))) as client:
+        r = client.post("/v1/jobs", files=files)
+    assert r.status_code == 503
+    assert int(r.headers["retry-after"]) >= 1
+
+
+def test_upload_budget_returns_429_while_others_hold_it() -> None:
+    inner = FastAPI()
+
+    @inner.post("/")
+    async def echo(request: Request) -> int:
+        return len(await request.body())
+
+    budget = UploadBudgetMiddleware(inner, max_bytes=100, retry_after=lambda: 7)
+    client = TestClient(budget)
+    # Alone, even a body over the budget is admitted; reservations are returned.
+    assert client.post("/", content=b"x" * 150).json() == 150
+    assert budget.inflight == 0
+
+    budget.inflight = 80  # another upload in progress
+    declared = client.post("/", content=b"x" * 50)
+    chunked = client.post("/", content=iter([b"x" * 10, b"x" * 40]))
+    assert [declared.status_code, chunked.status_code] == [429, 429]
+    assert declared.headers["retry-after"] == chunked.headers["retry-after"] == "7"
+    assert client.post("/", content=b"x" * 20).status_code == 200
+    assert budget.inflight == 80
+
+
+def test_detect_batch(make_pdf: Callable[..., bytes]) -> None:
+    files = [
+        ("files", ("a.pdf", make_pdf([TBANK_PAGE, "more"]), "application/pdf")),
+        ("files", ("b.pdf", make_pdf(["Hello"], producer="Word"), "application/pdf")),
+        ("files", ("c.pdf", b"not a pdf", "application/pdf")),
+    ]
+    with _client() as client:
+        first = client.post("/v1/detect", files=files)
+        again = client.post("/v1/detect", files=files[:1])
+        hits = client.get("/v1/cache/stats").json()["memory_hits"]
+        too_many = client.post("/v1/detect", files=files * 40)
+    assert first.status_code == 200
+    a, b, c = first.json()["results"]
+    assert (a["file"], a["doc_type"], a["meta"]["pages"]) == ("a.pdf", "tbank_cashflow_v1", 2)
+    assert (b["doc_type"], b["meta"]["producer"]) == ("generic_text_v1", "Word")
+    assert c["error"]["type"] == "PdfOpenError"
+    assert again.json()["results"] == [a]
+    assert hits == 1
+    assert too_many.status_code == 400
@@ -0,0 +1,64 @@
+import io
+import json
+import sys
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from app.__main__ import main
+from app.batch import already_done, detect_file_record, iter_inputs, run_batch
+
+
+def test_batch_streams_records_and_resumes(make_pdf: Callable[..., bytes], tmp_path: Path) -> None:
+    (tmp_path / "a.pdf").write_bytes(make_pdf(["first"]))
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "b.PDF").write_bytes(make_pdf(["second", "page two"]))
+    (tmp_path / "broken.pdf").write_bytes(b"not a pdf")
+    (tmp_path / "notes.txt").write_text("ignored")
+
+    paths = list(iter_inputs([str(tmp_path), str(tmp_path / "*.pdf")]))
+    assert sorted(p.name for p in paths) == ["a.pdf", "b.PDF", "broken.pdf"]
+
+    out = io.StringIO()
+    report = run_batch(paths, out)
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert (report.files, report.ok, report.errors, report.pages) == (3, 2, 1, 3)
+    by_name = {Path(r["file"]).name: r for r in records}
+    assert by_name["b.PDF"]["doc_type"] == "generic_text_v1"
+    assert by_name["broken.pdf"]["error"]["type"] == "PdfOpenError"
+
+    output = tmp_path / "out.jsonl"
+    output.write_text(out.getvalue().splitlines()[0] + "\n" + '{"file": "torn')
+    skip = already_done(output)
+    assert len(skip) == 1
+    report = run_batch(paths, io.StringIO(), skip=skip)
+    assert (report.files, report.skipped) == (2, 1)
+
+
+def test_batch_with_process_pool(make_pdf: Callable[..., bytes], tmp_path: Path) -> None:
+    for i in range(3):
+        (tmp_path / f"{i}.pdf").write_bytes(make_pdf([f"doc {i}"]))
+    out = io.StringIO()
+    report = run_batch(iter_inputs([str(tmp_path)]), out, jobs=2)
+    assert report.ok == 3
+    assert len(out.getvalue().splitlines()) == 3
+
+
+def test_batch_detect_records(make_pdf: Callable[..., bytes], tmp_path: Path) -> None:
+    (tmp_path / "a.pdf").write_bytes(make_pdf(["first", "second"], producer="Word"))
+    (tmp_path / "broken.pdf").write_bytes(b"not a pdf")
+    out = io.StringIO()
+    report = run_batch(iter_inputs([str(tmp_path)]), out, record=detect_file_record)
+    by_name = {Path(r["file"]).name: r for r in map(json.loads, out.getvalue().splitlines())}
+    assert (report.ok, report.errors) == (1, 1)
+    assert by_name["a.pdf"]["doc_type"] == "generic_text_v1"
+    assert by_name["a.pdf"]["meta"]["pages"] == 2
+    assert "error" in by_name["broken.pdf"]
+
+
+def test_batch_resume_requires_output(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    monkeypatch.setattr(sys, "argv", ["pdf-parser", "batch", "--resume", str(tmp_path)])
+    with pytest.raises(SystemExit) as exc:
+        main()
+    assert exc.value.code == 2
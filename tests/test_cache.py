@@ -0,0 +1,53 @@
+from collections.abc import Callable
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from app.api.server import create_app
+from app.cache import ResultCache
+from app.settings import Settings
+
+
+def test_lru_respects_entry_and_byte_limits() -> None:
+    cache = ResultCache(max_entries=2, max_bytes=10)
+    cache.put("a", b"1234")
+    cache.put("b", b"1234")
+    assert cache.get("a") == b"1234"  # "a" is now most recent
+    cache.put("c", b"1234")  # evicts "b" (entry limit)
+    assert cache.get("b") is None
+    cache.put("d", b"123456789")  # evicts the rest (byte limit)
+    assert cache.get("a") is None
+    stats = cache.snapshot()
+    assert stats["entries"] == 1
+    assert stats["evictions"] == 3
+    assert stats["memory_hits"] == 1
+
+
+def test_disk_tier_survives_restart(tmp_path: Path) -> None:
+    first = ResultCache(max_entries=8, max_bytes=1024, disk_dir=tmp_path)
+    first.put("k", b'{"doc_type":"x"}')
+    first.close()
+
+    second = ResultCache(max_entries=8, max_bytes=1024, disk_dir=tmp_path)
+    assert second.get("k") == b'{"doc_type":"x"}'
+    assert second.get("k") == b'{"doc_type":"x"}'
+    assert second.snapshot()["disk_hits"] == 1
+    assert second.snapshot()["memory_hits"] == 1
+    second.close()
+
+
+def test_api_serves_repeat_upload_from_cache(make_pdf: Callable[..., bytes]) -> None:
+    blob = make_pdf(["Hello world"])
+    files = {"file": ("a.pdf", blob, "application/pdf")}
+    with TestClient(create_app(Settings(workers=0))) as client:
+        first = client.post("/v1/parse", files=files)
+        second = client.post("/v1/parse", files=files)
+        bypass = client.post("/v1/parse", files=files, headers={"Cache-Control": "no-cache"})
+        stats = client.get("/v1/cache/stats").json()
+
+    assert first.headers["x-cache"] == "MISS"
+    assert second.headers["x-cache"] == "HIT"
+    assert bypass.headers["x-cache"] == "MISS"
+    assert first.json() == second.json()
+    assert stats["memory_hits"] == 1
+    assert stats["misses"] == 1
@@ -0,0 +1,36 @@
+import pytest
+
+from app.utils.dates import (
+    ddmmyyyy_hhmm_to_iso,
+    ddmmyyyy_hhmm_to_minutes,
+    ddmmyyyy_to_iso,
+    minutes_to_iso,
+)
+
+
+def test_conversions_round_trip() -> None:
+    assert ddmmyyyy_to_iso("29.02.2024") == "2024-02-29"
+    assert ddmmyyyy_hhmm_to_iso("22.01.2026", "11:08") == "2026-01-22T11:08"
+    minutes = ddmmyyyy_hhmm_to_minutes("22.01.2026", "11:08")
+    assert minutes == 29484668
+    assert minutes_to_iso(minutes) == "2026-01-22T11:08"
+    assert minutes_to_iso(ddmmyyyy_hhmm_to_minutes("31.12.1969", "23:59")) == "1969-12-31T23:59"
+
+
+@pytest.mark.parametrize(
+    "d, t",
+    [
+        ("29.02.2025", "10:00"),
+        ("31.04.2026", "10:00"),
+        ("2026-01-22", "10:00"),
+        ("22.01.2026", "24:00"),
+        ("22.01.2026", "10:60"),
+        ("22.01.2026", "1:005"),
+        ("22.01.2026", "１０:00"),
+    ],
+)
+def test_rejects_bad_values(d: str, t: str) -> None:
+    with pytest.raises(ValueError):
+        ddmmyyyy_hhmm_to_minutes(d, t)
+    with pytest.raises(ValueError):
+        ddmmyyyy_hhmm_to_iso(d, t)
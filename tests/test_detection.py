@@ -0,0 +1,78 @@
+from collections.abc import Sequence
+from typing import Any
+
+from app.parsers.base import BaseParser
+from app.parsers.detection import DetectionIndex, Markers
+from app.parsers.registry import detect_parser, parser_specs
+from app.utils.pdf import PdfMeta
+
+
+def _meta(**kw: Any) -> PdfMeta:
+    fields: dict[str, Any] = dict.fromkeys(("title", "author", "producer", "creator", "subject"))
+    return PdfMeta(pages=1, **{**fields, **kw})
+
+
+class _Stub(BaseParser):
+    def __init__(self, doc_type: str, markers: Markers | None = None, accept: bool = False) -> None:
+        self.doc_type = doc_type
+        self.markers = markers
+        self.accept = accept
+        self.asked = 0
+
+    def can_parse(self, text_pages: Sequence[str], meta: PdfMeta) -> bool:
+        if self.markers is not None:
+            return super().can_parse(text_pages, meta)
+        self.asked += 1
+        return self.accept
+
+    def parse(self, text_pages: Sequence[str], meta: PdfMeta) -> dict[str, Any]:
+        return {}
+
+
+def test_registry_detects_tbank_by_markers() -> None:
+    page = "АО «ТБАНК»\nСправка  о движении\nсредств"
+    assert detect_parser([page], _meta()).doc_type == "tbank_cashflow_v1"
+    assert detect_parser(["Справка о движении средств"], _meta()).doc_type == "generic_text_v1"
+    assert detect_parser([], _meta()).doc_type == "generic_text_v1"
+
+
+def test_index_overlapping_markers_meta_and_order() -> None:
+    nested = _Stub("nested", Markers(keywords=("банк", "тбанк выписка")))
+    by_meta = _Stub("by_meta", Markers(keywords=("выписка",), meta={"producer": "iText"}))
+    custom = _Stub("custom", accept=True)
+    index = DetectionIndex([nested, by_meta, custom])
+
+    # "банк" only occurs inside "тбанк выписка".
+    assert index.detect(["ТБанк   Выписка"], _meta()) is nested
+    assert index.detect(["выписка"], _meta(producer="ITEXT 7.1")) is by_meta
+    assert custom.asked == 0
+    assert index.detect(["выписка"], _meta(producer="Word")) is custom
+    assert custom.asked == 1
+    assert nested.can_parse(["тбанк выписка"], _meta())
+
+
+def test_index_reads_page_only_when_metadata_allows() -> None:
+    class Unread(Sequence[str]):
+        def __len__(self) -> int:
+            return 1
+
+        def __getitem__(self, index: Any) -> Any:
+            raise AssertionError("first page read")
+
+    by_meta = _Stub("by_meta", Markers(keywords=("выписка",), meta={"producer": "iText"}))
+    fallback = _Stub("fallback", accept=True)
+    index = DetectionIndex([by_meta, fallback])
+    assert index.detect(Unread(), _meta(producer="Word")) is fallback
+    assert index.detect(["выписка"], _meta(producer="iText")) is by_meta
+
+
+def test_specs_match_loaded_parsers() -> None:
+    specs = parser_specs()
+    assert specs[-1].doc_type == "generic_text_v1"
+    for spec in specs:
+        parser = spec.load()
+        assert (parser.doc_type, parser.version, parser.markers) == (
+            spec.doc_type,
+            spec.version,
+            spec.markers,
+        )
@@ -0,0 +1,118 @@
+import asyncio
+import time
+
+import pytest
+
+from app.engine import ConcurrencyLimit, EngineBusyError, EngineTimeoutError, ExtractionEngine
+from app.utils import pdf
+
+
+def _sleep_then(seconds: float, value: int) -> int:
+    time.sleep(seconds)
+    return value
+
+
+def test_engine_rejects_when_queue_is_full() -> None:
+    engine = ExtractionEngine(workers=0, queue_depth=0, job_timeout=5)
+
+    async def scenario() -> None:
+        first = asyncio.create_task(engine.run(time.sleep, 0.2))
+        await asyncio.sleep(0.05)
+        with pytest.raises(EngineBusyError) as exc:
+            await engine.run(time.sleep, 0)
+        assert exc.value.retry_after >= 1
+        await first
+
+    asyncio.run(scenario())
+    assert engine.pending == 0
+
+
+def test_engine_kills_stuck_worker_and_recovers() -> None:
+    engine = ExtractionEngine(workers=1, queue_depth=0, job_timeout=0.5)
+    engine.start()
+    try:
+
+        async def scenario() -> None:
+            with pytest.raises(EngineTimeoutError):
+                await engine.run(time.sleep, 30)
+            assert await engine.run(abs, -3) == 3
+
+        asyncio.run(scenario())
+    finally:
+        engine.shutdown()
+
+
+def _page_workers_max() -> int:
+    return pdf._page_workers_max
+
+
+def test_engine_workers_extract_pages_in_process() -> None:
+    engine = ExtractionEngine(workers=1, queue_depth=0, job_timeout=30)
+    engine.start()
+    try:
+        # A killed worker must not leave page workers behind.
+        assert asyncio.run(engine.run(_page_workers_max)) == 1
+    finally:
+        engine.shutdown()
+
+
+def test_engine_timeout_spares_other_jobs() -> None:
+    engine = ExtractionEngine(workers=2, queue_depth=0, job_timeout=2.0)
+    engine.start()
+    try:
+
+        async def scenario() -> None:
+            stuck = asyncio.create_task(engine.run(time.sleep, 30))
+            await asyncio.sleep(0.5)
+            # Runs on the other worker and finishes after the stuck job was killed.
+            neighbour = asyncio.create_task(engine.run(_sleep_then, 1.7, 7))
+            with pytest.raises(EngineTimeoutError):
+                await stuck
+            assert await neighbour == 7
+            # The replacement worker is warm and takes jobs again.
+            assert await asyncio.gather(engine.run(abs, -1), engine.run(abs, -2)) == [1, 2]
+
+        asyncio.run(scenario())
+    finally:
+        engine.shutdown()
+
+
+def test_engine_queue_waits_then_times_out() -> None:
+    engine = ExtractionEngine(workers=0, queue_depth=1, job_timeout=5, queue_timeout=0.1)
+
+    async def scenario() -> None:
+        first = asyncio.create_task(engine.run(time.sleep, 0.3))
+        await asyncio.sleep(0.05)
+        # Queued behind the running job, gives up after queue_timeout.
+        with pytest.raises(EngineBusyError):
+            await engine.run(time.sleep, 0)
+        await first
+        # A slot freed within the timeout is handed to the waiter.
+        engine.queue_timeout = 1.0
+        first = asyncio.create_task(engine.run(time.sleep, 0.1))
+        await asyncio.sleep(0.02)
+        assert await engine.run(abs, -2) == 2
+        await first
+
+    asyncio.run(scenario())
+    assert engine.pending == 0
+
+
+def test_adaptive_limit_follows_latency() -> None:
+    limit = ConcurrencyLimit(16, adaptive=True)
+    for _ in range(30):
+        limit.observe(0.1, inflight=16)
+    assert limit.value == 16
+    # Latency up tenfold under load: the limit backs off...
+    for _ in range(30):
+        limit.observe(1.0, inflight=limit.value)
+    shrunk = limit.value
+    assert shrunk < 8
+    # ...and grows back once latency recovers.
+    for _ in range(50):
+        limit.observe(0.1, inflight=limit.value)
+    assert limit.value == 16
+    # Fixed limits ignore latency.
+    fixed = ConcurrencyLimit(4)
+    fixed.observe(10.0, inflight=4)
+    assert fixed.value == 4
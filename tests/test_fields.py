@@ -0,0 +1,25 @@
+import re
+
+from app.parsers.fields import TAIL, Field, FieldSet
+
+
+def test_field_set_reads_only_head_and_tail_pages() -> None:
+    fields = FieldSet(
+        [
+            Field("number", re.compile(r"Номер договора:\s*(\d+)")),
+            Field("total", re.compile(r"Итого:\s*(\d+)"), TAIL),
+        ]
+    )
+    pages = ["Номер договора: 1", "", "Номер договора: 3\nИтого: 3", "", "", "Итого: 6"]
+    read: list[int] = []
+
+    class Pages(list[str]):
+        def __getitem__(self, i):  # type: ignore[no-untyped-def]
+            read.append(i)
+            return super().__getitem__(i)
+
+    found = fields.extract(Pages(pages))
+    assert found["number"] and found["number"].group(1) == "1"
+    # The middle page's total is outside the tail region.
+    assert found["total"] and found["total"].group(1) == "6"
+    assert sorted(set(read)) == [0, 1, 4, 5]
@@ -0,0 +1,58 @@
+"""Startup regressions: which modules each entry point drags in, and how long it takes.
+
+Run with ``pytest -s tests/test_import_time.py`` to see the ``-X importtime`` summary.
+Only module sets are asserted; timings are reported, since they are too noisy to gate on.
+"""
+
+import subprocess
+import sys
+
+import pytest
+
+
+def _import_profile(module: str) -> dict[str, int]:
+    """Cumulative import time (µs) of ``module`` and every module it imports.
+
+    Interpreter start-up imports (``site`` and friends) are left out.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        rows.append((name[1:], int(cumulative)))
+    # Children are printed before their parent, so the target's subtree is everything
+    # after the previous top-level (unindented) entry.
+    end = max(i for i, (name, _) in enumerate(rows) if name == module)
+    start = max((i for i, (name, _) in enumerate(rows[:end]) if not name[0].isspace()), default=-1)
+    return {name.strip(): us for name, us in rows[start + 1 : end + 1]}
+
+
+def _report(module: str, profile: dict[str, int]) -> None:
+    top = sorted(profile.items(), key=lambda kv: kv[1], reverse=True)[:8]
+    print(f"\nimport {module}: {profile[module] / 1000:.1f} ms, {len(profile)} modules")
+    for name, us in top[1:]:
+        print(f"  {us / 1000:8.1f} ms  {name}")
+
+
+@pytest.mark.parametrize(
+    ("module", "forbidden"),
+    [
+        # `pdf-parser --help` / `parse` / `batch` must not pay for the web stack.
+        ("app.__main__", {"fastapi", "starlette", "uvicorn", "pdfplumber", "app.api.server"}),
+        # The registry is a manifest: parser modules load only once selected.
+        ("app.parsers.registry", {"app.parsers.tbank_cashflow", "app.parsers.generic"}),
+        # What every extraction worker imports.
+        ("app.pipeline", {"fastapi", "uvicorn", "app.parsers.tbank_cashflow"}),
+    ],
+)
+def test_import_footprint(module: str, forbidden: set[str]) -> None:
+    profile = _import_profile(module)
+    _report(module, profile)
+    assert not forbidden & profile.keys()
@@ -0,0 +1,36 @@
+from pathlib import Path
+
+from app.jobs import DONE, FAILED, RUNNING, JobStore
+
+
+def test_store_requeues_interrupted_items_and_splices_results(tmp_path: Path) -> None:
+    store = JobStore(tmp_path)
+    job_id = store.create([("a.pdf", tmp_path / "a", "aa"), ("b.pdf", tmp_path / "b", "bb")])
+    first = store.claim()
+    assert first is not None and (first.index, first.name) == (0, "a.pdf")
+    store.close()
+
+    # The process died while "a.pdf" was running: it is queued again on reopen.
+    store = JobStore(tmp_path)
+    assert store.status(job_id)["queued"] == 2  # type: ignore[index]
+    a, b = store.claim(), store.claim()
+    assert a is not None and b is not None and store.claim() is None
+    assert store.status(job_id)["status"] == RUNNING  # type: ignore[index]
+    store.finish(b, None, {"type": "PdfOpenError", "message": "broken"})
+    store.finish(a, b'{"doc_type":"x","data":{}}')
+
+    status = store.status(job_id)
+    assert status is not None
+    assert (status["status"], status["done"], status["failed"]) == (DONE, 1, 1)
+    assert status["progress"] == 1.0
+    assert [i["status"] for i in status["items"]] == [DONE, FAILED]
+    assert store.results(job_id) == [
+        (1, b'{"file":"b.pdf","index":1,"error":{"type":"PdfOpenError","message":"broken"}}\n'),
+        (2, b'{"file":"a.pdf","index":0,"doc_type":"x","data":{}}\n'),
+    ]
+    assert store.results(job_id, after=1) == store.results(job_id)[1:]
+    assert store.pending(job_id) == 0 and store.queued() == 0
+
+    assert store.purge(older_than=-1) == 1
+    assert store.status(job_id) is None and store.pending(job_id) is None
+    store.close()
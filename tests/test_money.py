@@ -1,7 +1,8 @@
 from decimal import Decimal
+
 import pytest
 
-from app.utils.money import parse_money_to_decimal
+from app.utils.money import kopecks_to_str, parse_money_to_decimal, parse_money_to_kopecks
 
 
 @pytest.mark.parametrize(
@@ -15,3 +16,21 @@ from app.utils.money import parse_money_to_decimal
 )
 def test_parse_money_to_decimal(s: str, expected: Decimal) -> None:
     assert parse_money_to_decimal(s) == expected
+
+
+@pytest.mark.parametrize(
+    "s, expected",
+    [
+        ("-1 599.00 ₽", -159900),
+        ("+65 250.00 ₽", 6525000),
+        ("126 191,00 ₽", 12619100),
+        ("-86 342,67 ₽", -8634267),
+        ("12,5 руб.", 1250),
+        ("7 RUB", 700),
+        # Not the usual statement shape: handled by the regex fallback.
+        ("-1 599,00 ₽ (списание)", -159900),
+    ],
+)
+def test_parse_money_to_kopecks(s: str, expected: int) -> None:
+    assert parse_money_to_kopecks(s) == expected
+    assert kopecks_to_str(expected) == f"{parse_money_to_decimal(s):.2f}"
@@ -0,0 +1,54 @@
+import random
+from collections.abc import Callable
+from io import BytesIO
+from pathlib import Path
+
+from app.page_cache import PageCache
+from app.pipeline import encode_result, parse_pdf
+
+_FOOTER = "АО «ТБанк» универсальная лицензия Банка России № 2673\nБИК 044525974"
+
+
+def _statement(days: list[int]) -> list[str]:
+    pages = ["АО «ТБАНК»\nСправка о движении средств\nДата и время операции Дата списания Сумма"]
+    for day in days:
+        pages.append(
+            f"{day:02d}.01.2026 {day:02d}.01.2026 -{day}.00 ₽ -{day}.00 ₽ Оплата в MAGNIT 9824\n"
+            f"10:00 10:01 магазин {day}\n{_FOOTER}"
+        )
+    pages[-1] += "\nПополнения: 0,00 ₽\nРасходы: 0,00 ₽"
+    return pages
+
+
+def test_reissued_statement_reuses_unchanged_pages(
+    make_pdf: Callable[..., bytes], tmp_path: Path
+) -> None:
+    cache = PageCache(tmp_path, max_bytes=1 << 20)
+    first = make_pdf(_statement([1, 2, 3]))
+    # Same period extended by a day: the totals page changes, one page is new.
+    second = make_pdf(_statement([1, 2, 3, 4]))
+    for blob in (first, second):
+        cached = encode_result(parse_pdf(BytesIO(blob), page_cache=cache))
+        assert cached == encode_result(parse_pdf(BytesIO(blob)))
+    stats = cache.snapshot()
+    # Pages 1-3 are reused. Header fields read the first two pages' text; page 2 is
+    # only needed for its rows, which come from the cache, so its text is never read.
+    assert (stats["text_extracted"], stats["text_reused"]) == (4 + 2, 2)
+    assert (stats["data_computed"], stats["data_reused"]) == (3 + 2, 2)
+    cache.close()
+
+
+def test_evicts_least_recently_used_pages_past_the_size_limit(tmp_path: Path) -> None:
+    cache = PageCache(tmp_path, max_bytes=3000)
+    rnd = random.Random(0)
+    # Random hex: ~1 KiB each once compressed.
+    texts = {key: "".join(rnd.choices("0123456789abcdef", k=2048)) for key in "abc"}
+    for key, text in texts.items():
+        cache.put_text(key, text)
+        cache.put_data(key, "rows", [key])
+    stats = cache.snapshot()
+    assert stats["evictions"] == 1
+    assert stats["bytes"] <= 3000
+    assert cache.get_text("a") is None and cache.get_data("a", "rows") is None
+    assert cache.get_text("c") == texts["c"] and cache.get_data("c", "rows") == ["c"]
+    cache.close()
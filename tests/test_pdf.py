@@ -0,0 +1,67 @@
+from collections.abc import Callable
+from io import BytesIO
+from pathlib import Path
+
+from app.parsers.registry import detect_parser, detect_spec
+from app.utils.pdf import extract_text_pages, open_leading_pages, open_pdf_pages, open_session
+
+
+def test_pages_are_extracted_on_demand(make_pdf: Callable[..., bytes]) -> None:
+    blob = make_pdf(["АО «ТБАНК»\nСправка о движении средств"] + [f"page {i}" for i in range(2, 6)])
+    with open_pdf_pages(BytesIO(blob)) as pages:
+        assert len(pages) == 5
+        assert pages.meta.pages == 5
+        assert pages.extracted == 0
+
+        parser = detect_parser(pages, pages.meta)
+        assert parser.doc_type == "tbank_cashflow_v1"
+        assert pages.extracted == 1
+
+        assert pages[-1] == "page 5"
+        assert pages[1:3] == ["page 2", "page 3"]
+        assert pages.extracted == 4
+
+
+def test_leading_pages_read_only_what_detection_needs(make_pdf: Callable[..., bytes]) -> None:
+    blob = make_pdf(["АО «ТБАНК»\nСправка о движении средств", "two", "three"], title="T")
+    with open_leading_pages(BytesIO(blob)) as pages:
+        assert (len(pages), pages.meta.title) == (3, "T")
+        assert pages.extracted == 0
+        assert detect_spec(pages, pages.meta).doc_type == "tbank_cashflow_v1"
+        assert pages.extracted == 1
+        assert pages[-1] == "three"
+
+
+def test_extract_text_pages_matches_lazy_view(make_pdf: Callable[..., bytes]) -> None:
+    blob = make_pdf(["one", "two", "three"], producer="Test")
+    text_pages, meta = extract_text_pages(BytesIO(blob))
+    assert text_pages == ["one", "two", "three"]
+    assert meta.producer == "Test"
+    with open_pdf_pages(BytesIO(blob)) as pages:
+        assert list(pages) == text_pages
+
+
+def test_parallel_extraction_keeps_page_order(
+    make_pdf: Callable[..., bytes], tmp_path: Path
+) -> None:
+    path = tmp_path / "long.pdf"
+    path.write_bytes(make_pdf([f"page {i}" for i in range(1, 8)], title="Long"))
+
+    sequential = extract_text_pages(path)
+    assert extract_text_pages(path, jobs=3) == sequential
+    assert extract_text_pages(BytesIO(path.read_bytes()), jobs=2) == sequential
+
+
+def test_session_shares_and_releases_layout(make_pdf: Callable[..., bytes]) -> None:
+    blob = make_pdf(["Hello world", "two", "three", "four"])
+    with open_session(BytesIO(blob)) as session:
+        assert session.pages[0] == "Hello world"
+        layout = session.layout(0)
+        # Words come from the layout pass that produced the text.
+        assert [w["text"] for w in layout.words] == ["Hello", "world"]
+        assert "".join(c["text"] for c in layout.chars) == "Hello world"
+        assert session.layout(0) is layout
+
+        assert list(session.pages) == ["Hello world", "two", "three", "four"]
+        assert session.open_layouts == 2
+    assert session.open_layouts == 0
@@ -0,0 +1,61 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+
+from app.parsers.transactions import TransactionTable
+from app.serialization import OrjsonSerializer, StdlibSerializer, get_serializer
+
+DOC = {
+    "amount_rub": Decimal("-400"),
+    "op_datetime": datetime(2026, 1, 22, 11, 8),
+    "period": {"start": date(2026, 1, 1)},
+    "description": "Внешний перевод",
+    "card_last4": None,
+}
+
+
+def test_stdlib_encodes_parser_types() -> None:
+    out = StdlibSerializer().dumps(DOC)
+    assert (
+        out
+        == (
+            '{"amount_rub":"-400.00","op_datetime":"2026-01-22T11:08",'
+            '"period":{"start":"2026-01-01"},"description":"Внешний перевод","card_last4":null}'
+        ).encode()
+    )
+    assert StdlibSerializer().dumps(DOC, pretty=True).startswith(b'{\n  "amount_rub"')
+
+
+def test_backends_emit_identical_bytes() -> None:
+    pytest.importorskip("orjson")
+    fast, std = OrjsonSerializer(), StdlibSerializer()
+    assert fast.dumps(DOC) == std.dumps(DOC)
+    assert fast.dumps(DOC, pretty=True) == std.dumps(DOC, pretty=True)
+
+
+def test_transaction_table_round_trip() -> None:
+    table = TransactionTable()
+    # 2026-01-22 11:08 in minutes since the epoch.
+    table.append(29484668, 29484669, -40000, "Внешний перевод", "9824")
+    table.append(29484668, 29484668, 6525000, "Пополнение", None)
+    record = {
+        "op_datetime": "2026-01-22T11:08",
+        "writeoff_datetime": "2026-01-22T11:09",
+        "amount_rub": "-400.00",
+        "description": "Внешний перевод",
+        "card_last4": "9824",
+    }
+    assert table[0] == record
+    assert table[-1]["card_last4"] is None
+    assert len(table.pool) == 3
+    assert StdlibSerializer().dumps({"t": table}) == StdlibSerializer().dumps(
+        {"t": table.to_records()}
+    )
+
+
+def test_unknown_backend() -> None:
+    with pytest.raises(ValueError):
+        get_serializer("ujson")
+    with pytest.raises(TypeError):
+        StdlibSerializer().dumps({"x": object()})
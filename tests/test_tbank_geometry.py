@@ -0,0 +1,88 @@
+from io import BytesIO
+from typing import Any
+
+from pdf_factory import Row, build_pdf, tbank_statement_cells
+
+from app.parsers.tbank_cashflow import TBankCashflowParser
+from app.utils.pdf import open_session
+
+ROWS: list[Row] = [
+    (
+        "22.01.2026",
+        "11:08",
+        "22.01.2026",
+        "11:09",
+        "-400.00 ₽",
+        ["Внешний перевод по", "номеру телефона", "+79522362282"],
+        "9824",
+    ),
+    (
+        "21.01.2026",
+        "10:00",
+        "21.01.2026",
+        "10:05",
+        "+65 250.00 ₽",
+        ["Пополнение. Система", "быстрых платежей"],
+        "—",
+    ),
+    ("20.01.2026", "09:15", "20.01.2026", "09:16", "-1 599.00 ₽", ["Оплата в MAGNIT"], "4417"),
+    ("19.01.2026", "18:40", "20.01.2026", "02:00", "-89.90 ₽", ["Оплата в KOFEMANIYA"], "4417"),
+    ("18.01.2026", "08:00", "18.01.2026", "08:00", "+1 000.00 ₽", ["Кэшбэк"], "—"),
+]
+
+
+def _transactions(blob: bytes, mode: str) -> list[dict[str, Any]]:
+    with open_session(BytesIO(blob)) as session:
+        parsed = TBankCashflowParser(mode).parse(session.pages, session.meta, session)
+    return list(parsed["data"]["transactions"])
+
+
+def test_geometry_matches_text_mode() -> None:
+    # Two rows per page: rows continue across page breaks, headers and footers.
+    blob = build_pdf(tbank_statement_cells(ROWS, rows_per_page=2))
+    text = _transactions(blob, "text")
+    assert len(text) == len(ROWS)
+    assert text[0]["description"] == "Внешний перевод по номеру телефона +79522362282"
+    assert _transactions(blob, "geometry") == text
+
+
+def test_auto_falls_back_to_geometry() -> None:
+    reference = _transactions(build_pdf(tbank_statement_cells(ROWS)), "text")
+    # A card cell centred between the row's two lines breaks the Line-A shape.
+    shifted = build_pdf(tbank_statement_cells(ROWS, card_dy=5.5))
+    assert _transactions(shifted, "text") == []
+    assert _transactions(shifted, "auto") == reference
+
+
+def test_mode_comes_from_settings_and_keys_the_cache() -> None:
+    from app.cache import cache_key_for_digest, result_variant
+    from app.parsers.manifest import TBANK_CASHFLOW
+    from app.settings import Settings
+
+    options = Settings.from_env({"PDF_PARSER_TBANK_MODE": "geometry"}).parser_options
+    modes = [getattr(TBANK_CASHFLOW.load(opts), "mode", None) for opts in (None, options)]
+    assert modes == ["auto", "geometry"]
+    default = Settings.from_env({}).parser_options
+    assert result_variant(False, default) == ""
+    keys = {
+        cache_key_for_digest("0" * 64, result_variant(aggregate, opts))
+        for aggregate in (False, True)
+        for opts in (default, options)
+    }
+    assert len(keys) == 4
+
+
+def test_geometry_lays_out_pages_as_rows_are_read() -> None:
+    blob = build_pdf(tbank_statement_cells(ROWS, rows_per_page=1))
+    with open_session(BytesIO(blob)) as session:
+        seen: list[int] = []
+        layout = session.layout
+        session.layout = lambda i: seen.append(i) or layout(i)  # type: ignore[method-assign]
+        parser = TBankCashflowParser("geometry")
+        _, items = parser.parse_stream(session.pages, session.meta, session)
+        # Header fields: the two head and two tail pages, laid out once.
+        assert sorted(set(seen)) == [0, 1, 3, 4]
+        next(items)
+        assert 2 not in seen
+        assert len(list(items)) == len(ROWS) - 1
+        assert sorted(set(seen)) == [0, 1, 2, 3, 4]
@@ -0,0 +1,80 @@
+from collections.abc import Iterator
+
+from app.parsers.tbank_cashflow import _extract_transactions, iter_transactions
+
+PAGE_1 = """АО «ТБАНК»
+Справка о движении средств
+Дата и время операции Дата списания Сумма
+21.01.2026
+10:00
+21.01.2026
+10:05
++65 250.00 ₽ +65 250.00 ₽ Пополнение. Система
+быстрых платежей
+—
+22.01.2026 22.01.2026 -400.00 ₽ -400.00 ₽ Внешний перевод по 9824
+11:08 11:09 номеру телефона
++79522362282
+АО «ТБанк» универсальная лицензия
+БИК 044525974"""
+
+# The second page repeats the column header and continues a split row across the break.
+PAGE_2 = """Дата и время операции Дата списания Сумма
+20.01.2026
+09:15
+20.01.2026"""
+
+PAGE_3 = """09:16
+-1 599.00 ₽ -1 599.00 ₽ Оплата в MAGNIT
+4417"""
+
+
+def test_both_layouts_and_page_breaks() -> None:
+    txs = _extract_transactions([PAGE_1, PAGE_2, PAGE_3])
+    assert txs == [
+        {
+            "op_datetime": "2026-01-21T10:00",
+            "writeoff_datetime": "2026-01-21T10:05",
+            "amount_rub": "65250.00",
+            "description": "Пополнение. Система быстрых платежей",
+            "card_last4": None,
+        },
+        {
+            "op_datetime": "2026-01-22T11:08",
+            "writeoff_datetime": "2026-01-22T11:09",
+            "amount_rub": "-400.00",
+            "description": "Внешний перевод по номеру телефона +79522362282",
+            "card_last4": "9824",
+        },
+        {
+            "op_datetime": "2026-01-20T09:15",
+            "writeoff_datetime": "2026-01-20T09:16",
+            "amount_rub": "-1599.00",
+            "description": "Оплата в MAGNIT",
+            "card_last4": "4417",
+        },
+    ]
+
+
+def test_line_a_without_time_line_is_skipped() -> None:
+    page = """Дата и время
+22.01.2026 22.01.2026 -400.00 ₽ -400.00 ₽ Перевод 9824
+случайный текст"""
+    assert _extract_transactions([page]) == []
+
+
+def test_reads_past_seven_pages_and_stops_at_totals() -> None:
+    row = "05.01.2026 05.01.2026 -10.00 ₽ -10.00 ₽ Оплата 9824\n12:00 12:01"
+    pages = ["Справка о движении средств\nДата и время операции"] + [row] * 11
+    pages += ["Пополнения: 0,00 ₽\nРасходы: 110,00 ₽", row, row]
+    requested: list[int] = []
+
+    def lazy_pages() -> Iterator[str]:
+        for i, page in enumerate(pages):
+            requested.append(i)
+            yield page
+
+    txs = list(iter_transactions(lazy_pages()))
+    assert len(txs) == 11
+    # Pages after the totals block are never requested.
+    assert requested == list(range(13))
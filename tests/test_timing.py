@@ -0,0 +1,18 @@
+import time
+
+from app.utils.timing import collect_stages, span
+
+
+def test_nested_spans_are_charged_exclusively() -> None:
+    with span("ignored"):
+        pass  # no collector: a no-op
+    with collect_stages() as timer, span("parser"):
+        time.sleep(0.02)
+        for _ in range(2):
+            with span("extract"):
+                time.sleep(0.01)
+    stages = timer.stages
+    assert set(stages) == {"parser", "extract"}
+    assert 0.015 <= stages["parser"] < 0.035
+    assert 0.015 <= stages["extract"] < 0.035
+    assert [s for s, _ in timer.ordered()] == ["extract", "parser"]